@@ -0,0 +1,6 @@
+"""
+Shared building blocks for the Rust analyzer scripts under skills/*/scripts.
+
+Analyzers add the repository's top-level `scripts/` directory to `sys.path`
+and import from here, so each skill script stays runnable on its own.
+"""
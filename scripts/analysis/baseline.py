@@ -0,0 +1,303 @@
+"""
+Finding baselines for new-findings-only gating.
+
+A baseline records one fingerprint per accepted finding. Fingerprints are
+line-independent, so they survive unrelated edits above a finding:
+
+    file key (64 bits)    = hash(analyzer, root- or cwd-relative path)
+    finding key (64 bits) = hash(rule, whitespace-normalized snippet,
+                                 enclosing item such as `net::Client::send`,
+                                 occurrence of that triple in the file)
+
+The baseline file is a small header followed by the sorted 128-bit
+fingerprints (16 bytes per finding). It loads into a set, so checking a
+finding is one hash lookup. Because the file key is the high half, updating
+a file replaces exactly that file's range and leaves the rest untouched;
+at 64 bits, two files of even a very large tree do not share a range.
+"""
+
+import hashlib
+import re
+import sys
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, TypeVar
+
+from .reader import read_source_text
+
+MAGIC = b'RSBASE2\n'
+OLD_MAGIC = b'RSBASE1\n'  # 32-bit file keys; fingerprints cannot be carried over
+
+T = TypeVar('T')
+# finding -> (rule, line, snippet or None for the source line), or None to never baseline it
+BaselineKey = Callable[[T], Optional[Tuple[str, int, Optional[str]]]]
+
+
+class BaselineError(ValueError):
+    """Raised when a baseline file is not in the expected format."""
+
+
+def _hash64(text: str) -> int:
+    digest = hashlib.blake2b(text.encode('utf-8', 'surrogateescape'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def file_key(analyzer: str, rel_path: str) -> int:
+    return _hash64(f"{analyzer}\0{rel_path}")
+
+
+def baseline_name(path) -> str:
+    """Baseline path of a file given on the command line: relative to the cwd when under it."""
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(Path.cwd().resolve()).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def normalize_snippet(snippet: str) -> str:
+    return ' '.join(snippet.split())
+
+
+def fingerprint_rows(analyzer: str, rel_path: str,
+                     rows: Iterable[Tuple[str, str, str]]) -> List[int]:
+    """Fingerprints for (rule, snippet, item) rows of one file, in order."""
+    high = file_key(analyzer, rel_path) << 64
+    seen: Dict[Tuple[str, str, str], int] = {}
+    result = []
+    for rule, snippet, item in rows:
+        key = (rule, normalize_snippet(snippet), item)
+        occurrence = seen.get(key, 0)
+        seen[key] = occurrence + 1
+        result.append(high | _hash64(f"{key[0]}\0{key[1]}\0{key[2]}\0{occurrence}"))
+    return result
+
+
+_ITEM = re.compile(
+    r'^\s*(?:pub(?:\s*\([^)]*\))?\s+)?(?:(?:default|async|const|unsafe|extern\s+"[^"]*")\s+)*'
+    r'(fn|mod|trait|struct|enum|union|impl)\b')
+_IDENT = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+
+def _strip_generics(text: str) -> str:
+    """Drop `<...>` groups with a depth counter (no backtracking)."""
+    out = []
+    depth = 0
+    for ch in text:
+        if ch == '<':
+            depth += 1
+        elif ch == '>' and depth:
+            depth -= 1
+        elif depth == 0:
+            out.append(ch)
+    return ''.join(out)
+
+
+def _item_name(kind: str, rest: str) -> str:
+    if kind != 'impl':
+        match = _IDENT.search(rest)
+        return match.group(0) if match else kind
+    head = _strip_generics(rest.split('{', 1)[0].split(' where ', 1)[0])
+    if ' for ' in head:
+        trait, _, target = head.partition(' for ')
+        names = _IDENT.findall(target)
+        trait_names = _IDENT.findall(trait)
+        return f"<{names[-1] if names else '?'} as {trait_names[-1] if trait_names else '?'}>"
+    names = [n for n in _IDENT.findall(head) if n not in ('dyn', 'mut', 'const')]
+    return names[-1] if names else 'impl'
+
+
+class ItemIndex:
+    """Enclosing item path (e.g. `net::<Client as Drop>::drop`) of every line."""
+
+    def __init__(self, lines: List[str], items: List[Tuple[int, str]], line_items: array):
+        self.lines = lines
+        self._items = items  # (parent item id, name); id 0 is module level
+        self._line_items = line_items
+        self._paths: Dict[int, str] = {0: ''}
+
+    @classmethod
+    def from_text(cls, text: str) -> 'ItemIndex':
+        lines = text.split('\n')
+        items: List[Tuple[int, str]] = [(0, '')]
+        line_items = array('I', [0]) * len(lines)
+        stack: List[Tuple[str, int, int]] = []  # (name, body depth, item id)
+        pending: Optional[str] = None
+        depth = 0
+        in_block_comment = False
+
+        for i, line in enumerate(lines):
+            code = line
+            if in_block_comment:
+                end = code.find('*/')
+                if end == -1:
+                    line_items[i] = stack[-1][2] if stack else 0
+                    continue
+                code = code[end + 2:]
+                in_block_comment = False
+            code = code.split('//', 1)[0]
+            if '/*' in code:
+                code, _, tail = code.partition('/*')
+                in_block_comment = '*/' not in tail
+            if '"' in code:
+                code = re.sub(r'"(?:[^"\\]|\\.)*"', '""', code)
+
+            match = _ITEM.match(code)
+            if match:
+                pending = _item_name(match.group(1), code[match.end():])
+            line_items[i] = stack[-1][2] if stack else 0
+
+            for ch in code:
+                if ch == '{':
+                    depth += 1
+                    if pending is not None:
+                        # Paths are joined lazily in `item_at`; building them
+                        # here would copy the parent path once per nesting level.
+                        items.append((stack[-1][2] if stack else 0, pending))
+                        stack.append((pending, depth, len(items) - 1))
+                        if match:
+                            line_items[i] = len(items) - 1
+                        pending = None
+                elif ch == '}':
+                    if stack and stack[-1][1] == depth:
+                        stack.pop()
+                    depth = max(0, depth - 1)
+                elif ch == ';' and pending is not None:
+                    pending = None  # `fn f();`, `struct S;`, `mod m;`
+        return cls(lines, items, line_items)
+
+    def item_at(self, line_number: int) -> str:
+        """Enclosing item of a 1-based line ('' at module level)."""
+        if 1 <= line_number <= len(self._line_items):
+            return self._path(self._line_items[line_number - 1])
+        return ''
+
+    def _path(self, item: int) -> str:
+        path = self._paths.get(item)
+        if path is None:
+            chain = []
+            while item not in self._paths:
+                chain.append(item)
+                item = self._items[item][0]
+            path = self._paths[item]
+            for link in reversed(chain):
+                name = self._items[link][1]
+                path = f"{path}::{name}" if path else name
+                self._paths[link] = path
+        return path
+
+    def line(self, line_number: int) -> str:
+        if 1 <= line_number <= len(self.lines):
+            return self.lines[line_number - 1]
+        return ''
+
+
+class Baseline:
+    """A set of accepted finding fingerprints, loaded from and saved to a baseline file."""
+
+    def __init__(self, fingerprints: Iterable[int] = ()):
+        self.fingerprints: Set[int] = set(fingerprints)
+        self._updates: Dict[int, List[int]] = {}
+
+    @classmethod
+    def load(cls, path, missing_ok: bool = False) -> 'Baseline':
+        path = Path(path)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            if missing_ok:
+                return cls()
+            raise
+        if data.startswith(OLD_MAGIC):
+            raise BaselineError(f"{path}: old baseline format; delete it and re-create it with --update-baseline")
+        if not data.startswith(MAGIC) or (len(data) - len(MAGIC)) % 16:
+            raise BaselineError(f"{path}: not a baseline file")
+        values = array('Q')
+        values.frombytes(data[len(MAGIC):])
+        if sys.byteorder == 'big':
+            values.byteswap()  # stored little-endian
+        return cls(values[i] << 64 | values[i + 1] for i in range(0, len(values), 2))
+
+    def __len__(self) -> int:
+        return len(self.fingerprints)
+
+    def __contains__(self, fingerprint: int) -> bool:
+        return fingerprint in self.fingerprints
+
+    def fingerprints_for(self, analyzer: str, rel_path: str, source_path, findings: Sequence[T],
+                         key: BaselineKey) -> List[Optional[int]]:
+        """
+        Fingerprint each finding (None where `key` declines). The source is
+        only read, to find enclosing items, if some finding needs one.
+        """
+        keyed = [key(f) for f in findings]
+        if all(k is None for k in keyed):
+            return [None] * len(findings)
+        index = ItemIndex.from_text(read_source_text(source_path))
+        rows = [(rule, snippet if snippet is not None else index.line(line), index.item_at(line))
+                for rule, line, snippet in (k for k in keyed if k is not None)]
+        fps = iter(fingerprint_rows(analyzer, rel_path, rows))
+        return [None if k is None else next(fps) for k in keyed]
+
+    def filter_new(self, fingerprints: Sequence[Optional[int]], findings: Sequence[T]) -> List[T]:
+        """Findings that are not fingerprinted or not in the baseline."""
+        return [f for f, fp in zip(findings, fingerprints) if fp is None or fp not in self.fingerprints]
+
+    def record(self, analyzer: str, rel_path: str, fingerprints: Iterable[Optional[int]]) -> None:
+        """Queue a file's current fingerprints; `save` replaces that file's entries."""
+        self._updates.setdefault(file_key(analyzer, rel_path), []).extend(
+            fp for fp in fingerprints if fp is not None)
+
+    def save(self, path) -> None:
+        if self._updates:
+            replaced = set(self._updates)
+            self.fingerprints = {fp for fp in self.fingerprints if fp >> 64 not in replaced}
+            for fps in self._updates.values():
+                self.fingerprints.update(fps)
+            self._updates.clear()
+        path = Path(path)
+        tmp = path.with_name(path.name + '.tmp')
+        values = array('Q')
+        for fp in sorted(self.fingerprints):
+            values.append(fp >> 64)
+            values.append(fp & 0xFFFFFFFFFFFFFFFF)
+        if sys.byteorder == 'big':
+            values.byteswap()
+        with open(tmp, 'wb') as f:
+            f.write(MAGIC)
+            values.tofile(f)
+        tmp.replace(path)
+
+
+class BaselineGate:
+    """
+    Per-run driver used by the analyzers' `--baseline FILE [--update-baseline]`.
+
+    `apply` returns only the findings missing from the baseline (counting the
+    rest in `suppressed`), or, when updating, records every finding and
+    returns them unchanged; `finish` then writes the updated baseline.
+    """
+
+    def __init__(self, path, analyzer: str, key: BaselineKey, update: bool = False):
+        self.path = Path(path)
+        self.analyzer = analyzer
+        self.key = key
+        self.update = update
+        self.baseline = Baseline.load(self.path, missing_ok=update)
+        self.suppressed = 0
+
+    def apply(self, rel_path: str, source_path, findings: List[T]) -> List[T]:
+        fps = self.baseline.fingerprints_for(self.analyzer, rel_path, source_path, findings, self.key)
+        if self.update:
+            self.baseline.record(self.analyzer, rel_path, fps)
+            return findings
+        new = self.baseline.filter_new(fps, findings)
+        self.suppressed += len(findings) - len(new)
+        return new
+
+    def finish(self) -> Optional[str]:
+        """Save an updated baseline; returns a one-line summary if it was written."""
+        if not self.update:
+            return None
+        self.baseline.save(self.path)
+        return f"Baseline {self.path}: {len(self.baseline)} findings"
@@ -0,0 +1,172 @@
+"""
+Library API: run the analyzers over in-memory sources.
+
+    sys.path.insert(0, '<repo>/scripts')
+    from analysis.batch import BatchAnalyzer
+
+    with BatchAnalyzer(['error-handling', 'async-programming'], jobs=8) as batch:
+        for result in batch.analyze_many([('src/lib.rs', text), ...]):
+            result.results['error-handling']   # List[Finding]
+            result.errors                      # analyzer -> "ValueError: ..."
+
+Each analyzer script is loaded once per process, and its rule pack is
+compiled before the first source is analyzed. A `BatchAnalyzer` keeps its
+loaded analyzers and worker pool across `analyze_many` calls, so only the
+first call pays for them. Results come back in input order and hold the
+analyzers' own result types (see `ANALYZERS`). An exception in one analyzer
+is recorded for that source instead of failing the batch.
+
+The crate-level blocking analyzer needs a whole crate and a call graph, so
+it is not available per source.
+
+For editors, `analyze_incrementally(name, text)` keeps one buffer's findings
+current across edits, re-scanning only around each edit (see
+analysis.incremental).
+"""
+
+import importlib.util
+import sys
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+SKILLS_DIR = Path(__file__).resolve().parents[2] / 'skills'
+
+# analyzer -> (script under skills/, text entry point, what it returns)
+ANALYZERS: Dict[str, Tuple[str, str, str]] = {
+    'error-handling': ('error-handling/scripts/error_analyzer.py', 'analyze_rust_file', 'List[Finding]'),
+    'async-programming': ('async-programming/scripts/async_analyzer.py', 'analyze_async_rust',
+                          'List[AsyncFinding]'),
+    'ownership-borrowing': ('ownership-borrowing/scripts/ownership_checker.py', 'analyze_code',
+                            'List[OwnershipIssue]'),
+    'rust-performance': ('rust-performance/scripts/alloc_analyzer.py', 'analyze_source',
+                         'List[AllocationIssue]'),
+    'trait-generics': ('trait-generics/scripts/trait_checker.py', 'analyze_content', 'TraitAnalysis'),
+}
+
+POOLS = ('thread', 'process')
+
+
+@dataclass(slots=True)
+class SourceResult:
+    name: str
+    results: Dict[str, object] = field(default_factory=dict)  # analyzer -> its result
+    errors: Dict[str, str] = field(default_factory=dict)      # analyzer -> "ExcType: message"
+
+
+_entry_points: Dict[str, Callable[[str], object]] = {}
+
+
+def load_analyzer(name: str) -> Callable[[str], object]:
+    """
+    Text entry point of an analyzer, loading its script on first use. The
+    module is registered under its file name (e.g. `error_analyzer`) so its
+    result types pickle across worker processes.
+    """
+    entry = _entry_points.get(name)
+    if entry is not None:
+        return entry
+    if name not in ANALYZERS:
+        raise ValueError(f"unknown analyzer '{name}' (choose from {', '.join(ANALYZERS)})")
+    script, function, _returns = ANALYZERS[name]
+    path = SKILLS_DIR / script
+    module = sys.modules.get(path.stem)
+    if module is None or getattr(module, '__file__', None) != str(path):
+        spec = importlib.util.spec_from_file_location(path.stem, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[path.stem] = module
+        spec.loader.exec_module(module)
+    get_pack = getattr(module, 'get_rule_pack', None)
+    if get_pack is not None:
+        get_pack()  # compile now; lazy compilation could race between threads
+    entry = _entry_points[name] = getattr(module, function)
+    return entry
+
+
+def analyze_incrementally(name: str, source: str):
+    """
+    `IncrementalAnalysis` of one editor buffer for analyzers that support it
+    (error-handling, async-programming); apply `TextEdit`s to keep it current.
+    """
+    load_analyzer(name)
+    module = sys.modules[Path(ANALYZERS[name][0]).stem]
+    start = getattr(module, 'analyze_incrementally', None)
+    if start is None:
+        raise ValueError(f"analyzer '{name}' has no incremental mode")
+    return start(source)
+
+
+def preload(analyzers: Sequence[str]) -> None:
+    """Load and compile analyzers up front (e.g. as a worker pool initializer)."""
+    for name in analyzers:
+        load_analyzer(name)
+
+
+def analyze_source(name: str, source: str, analyzers: Sequence[str]) -> SourceResult:
+    """Run the analyzers over one in-memory source."""
+    result = SourceResult(name)
+    for analyzer in analyzers:
+        try:
+            result.results[analyzer] = load_analyzer(analyzer)(source)
+        except Exception as e:  # reported per source rather than failing the batch
+            result.errors[analyzer] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def _analyze_chunk(items: List[Tuple[str, str]], analyzers: Sequence[str]) -> List[SourceResult]:
+    return [analyze_source(name, source, analyzers) for name, source in items]
+
+
+class BatchAnalyzer:
+    """Reusable analyzer set with an optional thread or process pool."""
+
+    def __init__(self, analyzers: Optional[Iterable[str]] = None, jobs: int = 1, pool: str = 'process'):
+        if pool not in POOLS:
+            raise ValueError(f"pool must be one of {', '.join(POOLS)}")
+        self.analyzers = tuple(analyzers) if analyzers is not None else tuple(ANALYZERS)
+        self.jobs = max(1, jobs)
+        self.pool = pool
+        preload(self.analyzers)  # worker results unpickle against these modules
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.pool == 'thread':
+                self._executor = ThreadPoolExecutor(max_workers=self.jobs)
+            else:
+                from concurrent.futures import ProcessPoolExecutor  # pulls in multiprocessing
+                self._executor = ProcessPoolExecutor(max_workers=self.jobs, initializer=preload,
+                                                     initargs=(self.analyzers,))
+        return self._executor
+
+    def analyze_many(self, sources: Iterable[Tuple[str, str]]) -> List[SourceResult]:
+        """Analyze `(name, source)` pairs; results are in input order."""
+        items = list(sources)
+        if self.jobs == 1 or len(items) < 2:
+            return _analyze_chunk(items, self.analyzers)
+        # A few chunks per worker: few round-trips, but a slow file doesn't
+        # hold up a whole worker's share.
+        size = max(1, -(-len(items) // (self.jobs * 4)))
+        executor = self._get_executor()
+        futures = [executor.submit(_analyze_chunk, items[i:i + size], self.analyzers)
+                   for i in range(0, len(items), size)]
+        return [result for future in futures for result in future.result()]
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> 'BatchAnalyzer':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def analyze_many(sources: Iterable[Tuple[str, str]], analyzers: Optional[Iterable[str]] = None,
+                 jobs: int = 1, pool: str = 'process') -> List[SourceResult]:
+    """One-off batch; keep a `BatchAnalyzer` instead to reuse its workers across calls."""
+    with BatchAnalyzer(analyzers, jobs, pool) as batch:
+        return batch.analyze_many(sources)
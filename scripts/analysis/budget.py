@@ -0,0 +1,192 @@
+"""
+Bounded scans for CI gating: fail-fast, a wall-clock budget and per-file
+timeouts.
+
+`bounded_scan` analyzes files in walk order (optionally in worker
+processes) and stops early when
+
+- `max_hits` gating findings (e.g. error-severity) have been seen; pending
+  files are cancelled;
+- the `budget` in seconds is used up; the outcome is then `incomplete`.
+
+Each file runs under `file_timeout`. The timeout is a SIGALRM timer, and
+`re` checks for signals while matching, so even a catastrophically
+backtracking regex on one file is interrupted; that file is reported as
+timed out instead of hanging the job. Platforms without SIGALRM run without
+per-file timeouts.
+"""
+
+import signal
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+from .shards import walk_order_key
+
+T = TypeVar('T')
+
+
+class FileTimeout(Exception):
+    """Raised inside an analysis that exceeded its per-file timeout."""
+
+
+@dataclass
+class ScanOutcome:
+    results: List[Tuple[str, list]] = field(default_factory=list)  # (rel path, findings), walk order
+    timed_out: List[str] = field(default_factory=list)
+    failed: List[Tuple[str, str]] = field(default_factory=list)    # (rel path, error)
+    stopped: Optional[str] = None       # 'max-errors' or 'budget'
+    cancelled: int = 0                  # in-flight files dropped by the stop
+    hits: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def incomplete(self) -> bool:
+        return self.stopped is not None or bool(self.timed_out) or bool(self.failed)
+
+    def findings(self) -> list:
+        return [f for _rel, findings in self.results for f in findings]
+
+    def report_lines(self) -> List[str]:
+        """Markdown bullet lines describing why the scan is incomplete."""
+        lines = []
+        if self.stopped == 'max-errors':
+            lines.append(f"- Stopped early after {self.hits} error-level finding(s) (--max-errors)")
+        elif self.stopped == 'budget':
+            lines.append(f"- Time budget exhausted after {self.elapsed:.1f}s (--budget)")
+        if self.stopped is not None:
+            cancelled = f" ({self.cancelled} in flight cancelled)" if self.cancelled else ""
+            lines.append(f"- Remaining files were not analyzed{cancelled}")
+        for rel in self.timed_out:
+            lines.append(f"- Timed out: {rel}")
+        for rel, error in self.failed:
+            lines.append(f"- Failed: {rel} ({error})")
+        return lines
+
+
+def _alarm_available() -> bool:
+    return hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+
+
+def _on_alarm(signum, frame):
+    raise FileTimeout()
+
+
+def call_with_timeout(fn: Callable[[Path], T], path: Path, seconds: Optional[float]) -> T:
+    """Run `fn(path)`, raising FileTimeout after `seconds` where SIGALRM is usable."""
+    if not seconds or not _alarm_available():
+        return fn(path)
+    previous = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        return fn(path)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _worker(analyze, path: Path, seconds: Optional[float]):
+    try:
+        return 'ok', call_with_timeout(analyze, path, seconds)
+    except FileTimeout:
+        return 'timeout', None
+    except Exception as e:  # reported per file rather than failing the whole scan
+        return 'failed', f"{type(e).__name__}: {e}"
+
+
+def bounded_scan(files: Iterable[Tuple[Path, str]], analyze: Callable[[Path], List[T]], *,
+                 jobs: int = 1, file_timeout: Optional[float] = None, budget: Optional[float] = None,
+                 max_hits: Optional[int] = None, hits: Callable[[List[T]], int] = len,
+                 post: Optional[Callable[[Path, str, List[T]], List[T]]] = None,
+                 sink: Optional[Callable[[Path, str, List[T]], None]] = None) -> ScanOutcome:
+    """
+    Analyze (path, rel) pairs. `post` may filter each file's findings (e.g.
+    a baseline) before `hits` counts the gating ones toward `max_hits`.
+    With a `sink` (e.g. `FindingStore.add_file`), each file's findings are
+    handed to it on completion instead of being kept in `results`.
+    """
+    started = time.monotonic()
+    deadline = started + budget if budget is not None else None
+    outcome = ScanOutcome()
+    done: Dict[str, list] = {}
+
+    def remaining() -> Optional[float]:
+        return None if deadline is None else deadline - time.monotonic()
+
+    def finish(path: Path, rel: str, status: str, value) -> bool:
+        """Record one file; True once the scan should stop."""
+        if status == 'timeout':
+            outcome.timed_out.append(rel)
+        elif status == 'failed':
+            outcome.failed.append((rel, value))
+        else:
+            findings = post(path, rel, value) if post is not None else value
+            if sink is not None:
+                sink(path, rel, findings)
+            else:
+                done[rel] = findings
+            outcome.hits += hits(findings)
+            if max_hits is not None and outcome.hits >= max_hits:
+                outcome.stopped = 'max-errors'
+                return True
+        return False
+
+    it = iter(files)
+    if jobs <= 1:
+        for path, rel in it:
+            left = remaining()
+            if left is not None and left <= 0:
+                outcome.stopped = 'budget'
+                break
+            seconds = min(filter(None, (file_timeout, left)), default=None)
+            status, value = _worker(analyze, path, seconds)
+            if status == 'timeout' and left is not None and seconds == left:
+                outcome.stopped = 'budget'
+                outcome.cancelled = 1
+                break
+            if finish(path, rel, status, value):
+                break
+    else:
+        # Only parallel scans pay for concurrent.futures and multiprocessing.
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        pending = {}
+        exhausted = False
+        try:
+            while True:
+                # Keep a small window in flight so a stop cancels little work.
+                while not exhausted and len(pending) < jobs * 2:
+                    try:
+                        path, rel = next(it)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending[executor.submit(_worker, analyze, path, file_timeout)] = (path, rel)
+                if not pending:
+                    break
+                left = remaining()
+                if left is not None and left <= 0:
+                    outcome.stopped = 'budget'
+                    break
+                completed, _ = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+                stop = False
+                for future in completed:
+                    path, rel = pending.pop(future)
+                    status, value = future.result()
+                    stop = finish(path, rel, status, value) or stop
+                if stop:
+                    break
+        finally:
+            outcome.cancelled = len(pending)
+            # Workers still running a cancelled file would delay the exit.
+            running = list((getattr(executor, '_processes', None) or {}).values()) if pending else []
+            executor.shutdown(wait=not pending, cancel_futures=True)
+            for process in running:
+                process.terminate()
+
+    outcome.results = sorted(done.items(), key=lambda item: walk_order_key(item[0]))
+    outcome.timed_out.sort(key=walk_order_key)
+    outcome.elapsed = time.monotonic() - started
+    return outcome
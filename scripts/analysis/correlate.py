@@ -0,0 +1,126 @@
+"""
+Cross-analyzer correlation: one compound finding per source location.
+
+The same line often trips several analyzers (`.lock().unwrap()` is an
+error-handling finding and an async one). Correlation turns each analyzer's
+results into a stream of `Located` findings sorted by (file, line) and
+merges the streams linearly with `heapq.merge`; consecutive entries with
+the same key form one `CompoundFinding`, whose severity is the most severe
+of its members. Nothing is compared pairwise, so k analyzers over n
+findings cost O(n log k).
+
+    for compound in correlate_results(batch.analyze_many(sources)):
+        compound.file, compound.line, compound.severity, compound.analyzers
+
+Analyzers report lines, not columns, so a location is a line: findings on
+the same line are merged.
+"""
+
+import heapq
+import sys
+from dataclasses import dataclass, field
+from itertools import groupby
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List
+
+from .batch import ANALYZERS, SourceResult
+
+SEVERITY_RANK = {'info': 0, 'warning': 1, 'error': 2}
+PRIORITY_SEVERITY = {'high': 'warning', 'medium': 'info', 'low': 'info'}  # trait-generics
+
+
+@dataclass(slots=True)
+class Located:
+    file: str
+    line: int
+    analyzer: str
+    rule: str
+    severity: str
+    message: str
+
+
+@dataclass(slots=True)
+class CompoundFinding:
+    file: str
+    line: int
+    severity: str
+    findings: List[Located] = field(default_factory=list)
+
+    @property
+    def analyzers(self) -> List[str]:
+        return sorted({f.analyzer for f in self.findings})
+
+    def to_dict(self) -> Dict[str, object]:
+        return {'file': self.file, 'line': self.line, 'severity': self.severity,
+                'findings': [{'analyzer': f.analyzer, 'rule': f.rule, 'severity': f.severity,
+                              'message': f.message} for f in self.findings]}
+
+
+def _rule_severity(analyzer: str, rule: str, default: str = 'warning') -> str:
+    """Severity an analyzer's rule pack gives a rule whose findings don't carry one."""
+    module = sys.modules.get(Path(ANALYZERS[analyzer][0]).stem)
+    get_pack = getattr(module, 'get_rule_pack', None)
+    rule_def = get_pack().by_id.get(rule) if get_pack is not None else None
+    return rule_def.severity if rule_def is not None else default
+
+
+def _error_handling(file: str, findings) -> Iterator[Located]:
+    for f in findings:
+        yield Located(file, f.line_number, 'error-handling', f.pattern.value, f.severity, f.suggestion)
+
+
+def _async(file: str, findings) -> Iterator[Located]:
+    for f in findings:
+        # "good" marks a pattern used well: worth keeping, never worth a comment of its own.
+        severity = 'info' if f.severity == 'good' else f.severity
+        yield Located(file, f.line_number, 'async-programming', f.pattern, severity, f.message)
+
+
+def _ownership(file: str, issues) -> Iterator[Located]:
+    for i in issues:
+        yield Located(file, i.line, 'ownership-borrowing', i.issue_type,
+                      _rule_severity('ownership-borrowing', i.issue_type), i.message)
+
+
+def _performance(file: str, issues) -> Iterator[Located]:
+    for i in issues:
+        yield Located(file, i.line, 'rust-performance', i.issue_type, 'warning', i.message)
+
+
+def _traits(file: str, analysis) -> Iterator[Located]:
+    for s in analysis.suggestions:
+        yield Located(file, s.line_number, 'trait-generics', 'suggestion',
+                      PRIORITY_SEVERITY.get(s.priority, 'info'), s.message)
+
+
+# analyzer -> (file, its result) -> Located findings
+ADAPTERS: Dict[str, Callable[[str, object], Iterable[Located]]] = {
+    'error-handling': _error_handling,
+    'async-programming': _async,
+    'ownership-borrowing': _ownership,
+    'rust-performance': _performance,
+    'trait-generics': _traits,
+}
+
+
+def located(analyzer: str, file: str, result) -> List[Located]:
+    """One analyzer's result for one file as a stream sorted by line."""
+    stream = list(ADAPTERS[analyzer](file, result))
+    stream.sort(key=lambda f: f.line)  # already in line order for most analyzers
+    return stream
+
+
+def correlate(streams: Iterable[Iterable[Located]]) -> Iterator[CompoundFinding]:
+    """Merge streams sorted by (file, line) into compound findings, in the same order."""
+    merged = heapq.merge(*streams, key=lambda f: (f.file, f.line))
+    for (file, line), group in groupby(merged, key=lambda f: (f.file, f.line)):
+        findings = list(group)
+        severity = max((f.severity for f in findings), key=lambda s: SEVERITY_RANK.get(s, 0))
+        yield CompoundFinding(file, line, severity, findings)
+
+
+def correlate_results(results: Iterable[SourceResult]) -> Iterator[CompoundFinding]:
+    """Compound findings of `analyze_many` results, source by source in their order."""
+    for result in results:
+        yield from correlate(located(analyzer, result.name, value)
+                             for analyzer, value in result.results.items())
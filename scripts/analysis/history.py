@@ -0,0 +1,477 @@
+"""
+Historical findings store (SQLite).
+
+Analyzers run with `--record DB` ingest their findings for one commit
+instead of printing a throwaway report. The store is delta-based:
+
+- a file version is identified by the hash of its bytes (salted with the
+  analyzer, its rules and the shared matching engine), and its findings are
+  stored once per version;
+- each file's presence across runs is one `spans` row covering a range of
+  runs, extended in place while the file is unchanged, so an unchanged file
+  costs no new rows and is not even re-analyzed;
+- per-run totals by crate and rule are aggregated at ingest time, so trend
+  queries read one small indexed table.
+
+    runs(id, series, commit, recorded_at)       series = (analyzer, root)
+    files(id, series, path, crate)
+    versions(id, file, digest)                  one per distinct content
+    findings(version, rule, line, severity, fingerprint)
+    spans(file, version, first_run, last_run)   version alive for those runs
+    run_totals(run, crate, rule, count)
+"""
+
+import hashlib
+import os
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    id INTEGER PRIMARY KEY,
+    analyzer TEXT NOT NULL,
+    root TEXT NOT NULL,
+    UNIQUE (analyzer, root)
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    series_id INTEGER NOT NULL REFERENCES series(id),
+    commit_id TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    files INTEGER NOT NULL DEFAULT 0,
+    reused INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (series_id, commit_id)
+);
+CREATE TABLE IF NOT EXISTS rules (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    series_id INTEGER NOT NULL REFERENCES series(id),
+    path TEXT NOT NULL,
+    crate TEXT NOT NULL,
+    UNIQUE (series_id, path)
+);
+CREATE TABLE IF NOT EXISTS versions (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    digest BLOB NOT NULL,
+    UNIQUE (file_id, digest)
+);
+CREATE TABLE IF NOT EXISTS findings (
+    version_id INTEGER NOT NULL REFERENCES versions(id),
+    rule_id INTEGER NOT NULL REFERENCES rules(id),
+    line INTEGER NOT NULL,
+    severity TEXT NOT NULL,
+    fingerprint INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS findings_version ON findings (version_id, fingerprint);
+CREATE TABLE IF NOT EXISTS version_counts (
+    version_id INTEGER NOT NULL,
+    rule_id INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (version_id, rule_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS spans (
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    version_id INTEGER NOT NULL REFERENCES versions(id),
+    first_run INTEGER NOT NULL,
+    last_run INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS spans_last_run ON spans (last_run, file_id);
+CREATE INDEX IF NOT EXISTS spans_file ON spans (file_id, first_run);
+CREATE TABLE IF NOT EXISTS run_totals (
+    run_id INTEGER NOT NULL,
+    crate TEXT NOT NULL,
+    rule_id INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (rule_id, crate, run_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS run_totals_run ON run_totals (run_id, crate);
+"""
+
+
+class HistoryError(ValueError):
+    """Raised for unknown commits/series or an incompatible database."""
+
+
+@dataclass
+class FindingRow:
+    rule: str
+    line: int
+    severity: str
+    snippet: str
+
+
+def _normalize(snippet: str) -> str:
+    return ' '.join(snippet.split())
+
+
+def fingerprints(path: str, rows: Sequence[FindingRow]) -> List[int]:
+    """
+    Line-independent fingerprints: file, rule and whitespace-normalized
+    snippet, plus an occurrence counter for identical snippets.
+    """
+    seen: Dict[Tuple[str, str], int] = {}
+    result = []
+    for row in rows:
+        key = (row.rule, _normalize(row.snippet))
+        occurrence = seen.get(key, 0)
+        seen[key] = occurrence + 1
+        h = hashlib.blake2b(f"{path}\0{key[0]}\0{key[1]}\0{occurrence}".encode('utf-8', 'surrogateescape'),
+                            digest_size=8)
+        result.append(int.from_bytes(h.digest(), 'big', signed=True))
+    return result
+
+
+def file_digest(path, salt: bytes = b'') -> bytes:
+    """Content hash of a file, salted with the analyzer's rules."""
+    h = hashlib.blake2b(salt, digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.digest()
+
+
+# Shared modules that decide a file's findings (matching, statements, decoding).
+ENGINE_MODULES = ('rulepack.py', 'prefilter.py', 'statements.py', 'reader.py')
+
+
+def rules_salt(*paths) -> bytes:
+    """Salt that changes whenever the analyzer, its rule pack or the shared matching engine changes."""
+    h = hashlib.blake2b(digest_size=16)
+    engine = Path(__file__).resolve().parent
+    for path in list(paths) + [engine / name for name in ENGINE_MODULES]:
+        h.update(Path(path).read_bytes())
+    return h.digest()
+
+
+def current_commit(root) -> str:
+    """`git rev-parse HEAD` for the tree containing `root`."""
+    root = Path(root)
+    cwd = root if root.is_dir() else root.parent
+    import subprocess  # only needed without --commit
+    try:
+        out = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=cwd, capture_output=True,
+                             text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        raise HistoryError(f"{root} is not in a git checkout; pass --commit") from None
+    return out.stdout.strip()
+
+
+_PACKAGE_NAME = re.compile(r'^\s*name\s*=\s*"([^"]+)"', re.MULTILINE)
+
+
+class CrateResolver:
+    """Map files to the package name of their nearest Cargo.toml (cached per directory)."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._cache: Dict[Path, Tuple[str, Path]] = {}
+
+    def crate_of(self, path: Path) -> str:
+        return self.locate(path)[0]
+
+    def locate(self, path: Path) -> Tuple[str, Path]:
+        """(package name, directory of its Cargo.toml) owning `path`; the root if none does."""
+        directory = path.parent
+        chain = []
+        found = None
+        while True:
+            if directory in self._cache:
+                found = self._cache[directory]
+                break
+            chain.append(directory)
+            manifest = directory / 'Cargo.toml'
+            if manifest.is_file():
+                found = (self._package_name(manifest, directory), directory)
+                break
+            if directory == self.root or directory.parent == directory:
+                found = (self.root.name or '.', self.root)
+                break
+            directory = directory.parent
+        for d in chain:
+            self._cache[d] = found
+        return found
+
+    @staticmethod
+    def _package_name(manifest: Path, directory: Path) -> str:
+        try:
+            text = manifest.read_text(encoding='utf-8', errors='replace')
+        except OSError:
+            return directory.name
+        section = text.split('[package]', 1)
+        if len(section) == 2:
+            match = _PACKAGE_NAME.search(section[1].split('\n[', 1)[0])
+            if match:
+                return match.group(1)
+        return directory.name
+
+
+class FindingsHistory:
+    """An open findings database. Use as a context manager."""
+
+    def __init__(self, path):
+        import sqlite3  # only needed when a history database is used
+        self.path = os.fspath(path)
+        # Transactions are managed explicitly by RunRecorder.
+        self.db = sqlite3.connect(self.path, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            raise HistoryError(f"{self.path}: schema version {version}, expected {SCHEMA_VERSION}")
+        self.db.executescript(SCHEMA)
+        self.db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self._rules: Dict[str, int] = dict(self.db.execute("SELECT name, id FROM rules"))
+
+    def __enter__(self) -> 'FindingsHistory':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def rule_id(self, name: str) -> int:
+        rid = self._rules.get(name)
+        if rid is None:
+            rid = self.db.execute("INSERT INTO rules (name) VALUES (?)", (name,)).lastrowid
+            self._rules[name] = rid
+        return rid
+
+    def series_id(self, analyzer: str, root: str, create: bool = False) -> int:
+        row = self.db.execute("SELECT id FROM series WHERE analyzer = ? AND root = ?",
+                              (analyzer, root)).fetchone()
+        if row:
+            return row[0]
+        if not create:
+            raise HistoryError(f"no runs recorded for {analyzer} on {root}")
+        return self.db.execute("INSERT INTO series (analyzer, root) VALUES (?, ?)",
+                               (analyzer, root)).lastrowid
+
+    def begin_run(self, analyzer: str, root: str, commit: str, crates: CrateResolver) -> 'RunRecorder':
+        return RunRecorder(self, self.series_id(analyzer, root, create=True), commit, crates)
+
+    # -- queries ---------------------------------------------------------
+
+    def list_series(self) -> List[Tuple[int, str, str]]:
+        return self.db.execute("SELECT id, analyzer, root FROM series ORDER BY id").fetchall()
+
+    def runs(self, series_id: int) -> List[Tuple[int, str, float, int, int]]:
+        """(run id, commit, recorded_at, files, reused) in recording order."""
+        return self.db.execute(
+            "SELECT id, commit_id, recorded_at, files, reused FROM runs WHERE series_id = ? ORDER BY id",
+            (series_id,)).fetchall()
+
+    def run_for(self, series_id: int, commit: Optional[str] = None) -> int:
+        """Run id for a commit (unique prefix accepted), or the latest run."""
+        if commit is None:
+            row = self.db.execute("SELECT MAX(id) FROM runs WHERE series_id = ?", (series_id,)).fetchone()
+            if row[0] is None:
+                raise HistoryError("no runs recorded")
+            return row[0]
+        rows = self.db.execute(
+            "SELECT id FROM runs WHERE series_id = ? AND commit_id >= ? AND commit_id < ?",
+            (series_id, commit, commit + '\uffff')).fetchall()
+        if len(rows) != 1:
+            raise HistoryError(f"commit '{commit}' {'is ambiguous' if rows else 'was not recorded'}")
+        return rows[0][0]
+
+    def trend(self, series_id: int, rules: Optional[Sequence[str]] = None,
+              crate: Optional[str] = None) -> List[Tuple[str, float, int]]:
+        """(commit, recorded_at, findings) per run, filtered by rule names and crate."""
+        where = ["t.run_id = r.id"]
+        params: list = []
+        if rules:
+            where.append(f"t.rule_id IN ({','.join('?' * len(rules))})")
+            params.extend(self._rules.get(r, -1) for r in rules)
+        if crate is not None:
+            where.append("t.crate = ?")
+            params.append(crate)
+        sql = (f"SELECT r.commit_id, r.recorded_at, "
+               f"(SELECT COALESCE(SUM(t.count), 0) FROM run_totals t WHERE {' AND '.join(where)}) "
+               f"FROM runs r WHERE r.series_id = ? ORDER BY r.id")
+        return self.db.execute(sql, params + [series_id]).fetchall()
+
+    def top(self, series_id: int, run_id: int, by: str = 'file',
+            rules: Optional[Sequence[str]] = None, limit: int = 20) -> List[Tuple[str, int]]:
+        """Largest finding counts at one run, grouped by 'file', 'crate' or 'rule'."""
+        rule_filter = ""
+        params: list = []
+        if rules:
+            rule_filter = f"AND rule_id IN ({','.join('?' * len(rules))})"
+            params.extend(self._rules.get(r, -1) for r in rules)
+        if by in ('crate', 'rule'):
+            key = "crate" if by == 'crate' else "(SELECT name FROM rules WHERE id = rule_id)"
+            sql = (f"SELECT {key}, SUM(count) AS n FROM run_totals "
+                   f"WHERE run_id = ? {rule_filter} GROUP BY {key} ORDER BY n DESC, 1 LIMIT ?")
+            return self.db.execute(sql, [run_id] + params + [limit]).fetchall()
+        if by != 'file':
+            raise HistoryError(f"cannot group by '{by}'")
+        sql = (f"SELECT f.path, SUM(c.count) AS n FROM spans s "
+               f"JOIN files f ON f.id = s.file_id "
+               f"JOIN version_counts c ON c.version_id = s.version_id "
+               f"WHERE s.last_run >= ? AND s.first_run <= ? AND f.series_id = ? {rule_filter} "
+               f"GROUP BY f.id ORDER BY n DESC, f.path LIMIT ?")
+        return self.db.execute(sql, [run_id, run_id, series_id] + params + [limit]).fetchall()
+
+    def new_since(self, series_id: int, base_run: int, run_id: int,
+                  rules: Optional[Sequence[str]] = None) -> List[Tuple[str, int, str, str]]:
+        """
+        (path, line, rule, severity) of findings at `run_id` whose fingerprint
+        did not exist in the same file at `base_run`. Only files whose version
+        differs between the two runs are inspected.
+        """
+        rule_filter = ""
+        params: list = []
+        if rules:
+            rule_filter = f"AND n.rule_id IN ({','.join('?' * len(rules))})"
+            params.extend(self._rules.get(r, -1) for r in rules)
+        sql = f"""
+            WITH head AS MATERIALIZED (
+                SELECT s.file_id, s.version_id FROM spans s JOIN files f ON f.id = s.file_id
+                WHERE f.series_id = ? AND s.first_run <= ? AND s.last_run >= ?
+            ), base AS MATERIALIZED (
+                SELECT s.file_id, s.version_id FROM spans s JOIN files f ON f.id = s.file_id
+                WHERE f.series_id = ? AND s.first_run <= ? AND s.last_run >= ?
+            ), changed AS MATERIALIZED (
+                SELECT head.file_id, head.version_id AS new_version, base.version_id AS old_version
+                FROM head LEFT JOIN base ON base.file_id = head.file_id
+                WHERE base.version_id IS NULL OR base.version_id != head.version_id
+            )
+            SELECT f.path, n.line, r.name, n.severity
+            FROM changed c
+            CROSS JOIN findings n ON n.version_id = c.new_version
+            JOIN files f ON f.id = c.file_id
+            JOIN rules r ON r.id = n.rule_id
+            WHERE NOT EXISTS (
+                SELECT 1 FROM findings o
+                WHERE o.version_id = c.old_version AND o.fingerprint = n.fingerprint
+            ) {rule_filter}
+            ORDER BY f.path, n.line
+        """
+        return self.db.execute(sql, [series_id, run_id, run_id,
+                                     series_id, base_run, base_run] + params).fetchall()
+
+
+class RunRecorder:
+    """
+    Ingest one analyzer run. For every file call `reuse(rel, digest)`; if it
+    returns False, analyze the file and call `add(rel, digest, rows)`.
+    """
+
+    def __init__(self, history: FindingsHistory, series_id: int, commit: str, crates: CrateResolver):
+        self.history = history
+        self.db = history.db
+        self.series_id = series_id
+        self.crates = crates
+        self.files = 0
+        self.reused = 0
+
+        self.db.execute("BEGIN")
+        if self.db.execute("SELECT 1 FROM runs WHERE series_id = ? AND commit_id = ?",
+                           (series_id, commit)).fetchone():
+            self.db.execute("ROLLBACK")
+            raise HistoryError(f"commit {commit} is already recorded")
+        row = self.db.execute("SELECT MAX(id) FROM runs WHERE series_id = ?", (series_id,)).fetchone()
+        self.previous_run = row[0]
+        self.run_id = self.db.execute(
+            "INSERT INTO runs (series_id, commit_id, recorded_at) VALUES (?, ?, ?)",
+            (series_id, commit, time.time())).lastrowid
+
+        # path -> (file id, version id, digest) of the files alive in the previous run
+        self._previous: Dict[str, Tuple[int, int, bytes]] = {}
+        if self.previous_run is not None:
+            for path, file_id, version_id, digest in self.db.execute(
+                    "SELECT f.path, f.id, v.id, v.digest FROM spans s "
+                    "JOIN files f ON f.id = s.file_id JOIN versions v ON v.id = s.version_id "
+                    "WHERE s.last_run = ? AND f.series_id = ?", (self.previous_run, series_id)):
+                self._previous[path] = (file_id, version_id, digest)
+        self._extend: List[Tuple[int, int]] = []
+
+    def reuse(self, rel: str, digest: bytes) -> bool:
+        """Carry an unchanged file's findings over; False if it must be analyzed."""
+        previous = self._previous.get(rel)
+        if previous is None or previous[2] != digest:
+            return False
+        self.files += 1
+        self.reused += 1
+        self._extend.append((previous[0], previous[1]))
+        return True
+
+    def add(self, rel: str, path: Path, digest: bytes, rows: Sequence[FindingRow]) -> None:
+        db = self.db
+        self.files += 1
+        row = db.execute("SELECT id FROM files WHERE series_id = ? AND path = ?",
+                         (self.series_id, rel)).fetchone()
+        file_id = row[0] if row else db.execute(
+            "INSERT INTO files (series_id, path, crate) VALUES (?, ?, ?)",
+            (self.series_id, rel, self.crates.crate_of(path))).lastrowid
+
+        row = db.execute("SELECT id FROM versions WHERE file_id = ? AND digest = ?",
+                         (file_id, digest)).fetchone()
+        if row:
+            # Reverted to content seen before: its findings are already stored.
+            version_id = row[0]
+        else:
+            version_id = db.execute("INSERT INTO versions (file_id, digest) VALUES (?, ?)",
+                                    (file_id, digest)).lastrowid
+            rule_ids = [self.history.rule_id(r.rule) for r in rows]
+            db.executemany(
+                "INSERT INTO findings (version_id, rule_id, line, severity, fingerprint) VALUES (?, ?, ?, ?, ?)",
+                [(version_id, rid, r.line, r.severity, fp)
+                 for rid, r, fp in zip(rule_ids, rows, fingerprints(rel, rows))])
+            counts: Dict[int, int] = {}
+            for rid in rule_ids:
+                counts[rid] = counts.get(rid, 0) + 1
+            db.executemany("INSERT INTO version_counts (version_id, rule_id, count) VALUES (?, ?, ?)",
+                           [(version_id, rid, n) for rid, n in counts.items()])
+        db.execute("INSERT INTO spans (file_id, version_id, first_run, last_run) VALUES (?, ?, ?, ?)",
+                   (file_id, version_id, self.run_id, self.run_id))
+
+    def finish(self) -> None:
+        db = self.db
+        if self._extend:
+            db.executemany(
+                "UPDATE spans SET last_run = ? WHERE file_id = ? AND version_id = ? AND last_run = ?",
+                [(self.run_id, file_id, version_id, self.previous_run) for file_id, version_id in self._extend])
+        db.execute(
+            "INSERT INTO run_totals (run_id, crate, rule_id, count) "
+            "SELECT ?, f.crate, c.rule_id, SUM(c.count) FROM spans s "
+            "JOIN files f ON f.id = s.file_id JOIN version_counts c ON c.version_id = s.version_id "
+            "WHERE s.last_run = ? AND f.series_id = ? GROUP BY f.crate, c.rule_id",
+            (self.run_id, self.run_id, self.series_id))
+        db.execute("UPDATE runs SET files = ?, reused = ? WHERE id = ?", (self.files, self.reused, self.run_id))
+        db.execute("COMMIT")
+
+    def abort(self) -> None:
+        self.db.execute("ROLLBACK")
+        self.history._rules = dict(self.db.execute("SELECT name, id FROM rules"))
+
+
+def record(history: FindingsHistory, analyzer: str, root: Path, title: str, commit: str,
+           files: Iterable[Tuple[Path, str]], salt: bytes, analyze) -> RunRecorder:
+    """
+    Record one run: `files` yields (path, relative name), `analyze(path)`
+    returns the FindingRows of a changed file.
+    """
+    recorder = history.begin_run(analyzer, title, commit, CrateResolver(root))
+    try:
+        for path, rel in files:
+            digest = file_digest(path, salt)
+            if not recorder.reuse(rel, digest):
+                recorder.add(rel, path, digest, analyze(path))
+        recorder.finish()
+    except BaseException:
+        recorder.abort()
+        raise
+    return recorder
@@ -0,0 +1,170 @@
+"""
+Hotspot summary of a directory scan: which crates, files and functions hold
+the findings that cost the score.
+
+    hotspots = HotspotAggregator(root, {'error': 10, 'warning': 5}, top=10)
+    hotspots.add_file(path, rel, [(line, severity), ...])   # as files finish
+    report.extend(hotspots.report_lines(score_from_counts))
+
+Files are aggregated in a single pass as the scan delivers them, in any
+order:
+
+- each file is mapped to its crate (nearest Cargo.toml) and module path
+  (`net_util::client::pool` for `crates/net-util/src/client/pool.rs`), and
+  its severity counts are added to the crate's counters;
+- its penalty (findings weighted by severity) competes for a bounded top-N
+  min-heap of the worst files;
+- for a file with a penalty, its enclosing items (`pool::Pool::checkout`)
+  are found with `ItemIndex`, and each item's penalty competes for the
+  top-N heap of the worst functions. Items never span files, so nothing
+  per item is kept once its file is done.
+
+Memory is the per-crate counters plus 2 x N heap entries, however many
+findings the scan produces. Ties rank by name, so the summary does not
+depend on the order files finished in.
+"""
+
+import heapq
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping, Tuple
+
+from .baseline import ItemIndex
+from .history import CrateResolver
+from .reader import read_source_text
+
+MODULE_ROOTS = ('lib', 'main', 'mod')   # files that are their directory's module
+HEADINGS = {'error': 'Errors', 'warning': 'Warnings', 'info': 'Info'}
+
+
+@dataclass(slots=True)
+class CrateTotals:
+    files: int = 0
+    flagged: int = 0   # files with at least one finding
+    counts: Counter = field(default_factory=Counter)
+    penalty: int = 0
+
+
+@dataclass(slots=True)
+class Hotspot:
+    penalty: int
+    name: str
+    detail: str
+    counts: Counter
+
+    def __lt__(self, other: 'Hotspot') -> bool:
+        # Heap order: the entry evicted first is the lightest, and among equal
+        # penalties the one that sorts last by name.
+        return (self.penalty, other.name) < (other.penalty, self.name)
+
+
+class TopN:
+    """The N heaviest entries pushed, kept in a bounded min-heap."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self._heap: List[Hotspot] = []
+
+    def push(self, entry: Hotspot) -> None:
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, entry)
+        elif self._heap and self._heap[0] < entry:
+            heapq.heapreplace(self._heap, entry)
+
+    def ranked(self) -> List[Hotspot]:
+        return sorted(self._heap, reverse=True)
+
+
+def module_path(crate: str, rel: Path) -> str:
+    """Rust module path of a file given its path relative to the crate directory."""
+    parts = list(rel.with_suffix('').parts)
+    if parts and parts[0] == 'src':
+        parts = parts[1:]
+    if parts and parts[-1] in MODULE_ROOTS and (parts[-1] == 'mod' or len(parts) == 1):
+        parts.pop()
+    return '::'.join([crate.replace('-', '_')] + parts)
+
+
+class HotspotAggregator:
+    """Per-crate counters and top-N worst files and functions, fed one file at a time."""
+
+    def __init__(self, root: Path, weights: Mapping[str, int], top: int = 10):
+        root = Path(root)
+        self.crates = CrateResolver(root if root.is_dir() else root.parent)
+        self.weights = dict(weights)
+        self.totals: Dict[str, CrateTotals] = {}
+        self.files = TopN(top)
+        self.functions = TopN(top)
+
+    def penalty(self, counts: Mapping[str, int]) -> int:
+        return sum(self.weights.get(severity, 0) * n for severity, n in counts.items())
+
+    def add_file(self, path: Path, rel: str, findings: Iterable[Tuple[int, str]]) -> None:
+        """Account one analyzed file's findings, given as (line, severity) pairs."""
+        findings = list(findings)
+        crate, crate_dir = self.crates.locate(path)
+        totals = self.totals.get(crate)
+        if totals is None:
+            totals = self.totals[crate] = CrateTotals()
+        counts = Counter(severity for _line, severity in findings)
+        totals.files += 1
+        totals.flagged += bool(findings)
+        totals.counts.update(counts)
+        penalty = self.penalty(counts)
+        totals.penalty += penalty
+        if penalty == 0:
+            return  # cannot rank among the worst, so skip indexing it
+
+        try:
+            module = module_path(crate, path.relative_to(crate_dir))
+        except ValueError:
+            module = module_path(crate, Path(rel))
+        self.files.push(Hotspot(penalty, rel, module, counts))
+
+        try:
+            index = ItemIndex.from_text(read_source_text(path))
+        except OSError:
+            return
+        items: Dict[str, Counter] = {}
+        for line, severity in findings:
+            if self.weights.get(severity, 0):
+                items.setdefault(index.item_at(line), Counter())[severity] += 1
+        for item, item_counts in items.items():
+            name = f"{module}::{item}" if item else f"{module} (module level)"
+            self.functions.push(Hotspot(self.penalty(item_counts), name, rel, item_counts))
+
+    def report_lines(self, score: Callable[[Mapping[str, int]], int]) -> List[str]:
+        """Markdown `## Hotspots` section; crates are ranked by `score` of their counts."""
+        severities = list(self.weights) + sorted(
+            {s for t in self.totals.values() for s in t.counts} - set(self.weights))
+        lines = ["## Hotspots\n", "### Crates\n"]
+        lines.extend(_table(["Crate", "Files", "Flagged"] + [HEADINGS.get(s, s) for s in severities] + ["Score"]))
+        ranked = sorted(self.totals.items(), key=lambda item: (score(item[1].counts), -item[1].penalty, item[0]))
+        for crate, t in ranked:
+            cells = [f"`{crate}`", t.files, t.flagged] + [t.counts[s] for s in severities] + [f"{score(t.counts)}/100"]
+            lines.append(_row(cells))
+        lines.append("")
+
+        for title, heap, columns in ((f"Worst Files (top {self.files.n})", self.files, ["File", "Module"]),
+                                     (f"Worst Functions (top {self.functions.n})", self.functions,
+                                      ["Function", "File"])):
+            lines.append(f"### {title}\n")
+            entries = heap.ranked()
+            if not entries:
+                lines.extend(["No findings that cost points.", ""])
+                continue
+            lines.extend(_table(["Penalty"] + columns + ["Findings"]))
+            for e in entries:
+                findings = ', '.join(f"{e.counts[s]} {s}" for s in severities if e.counts[s])
+                lines.append(_row([e.penalty, f"`{e.name}`", f"`{e.detail}`", findings]))
+            lines.append("")
+        return lines
+
+
+def _table(headings: List[str]) -> List[str]:
+    return [_row(headings), '|' + '|'.join('-' * (len(h) + 2) for h in headings) + '|']
+
+
+def _row(cells) -> str:
+    return '| ' + ' | '.join(str(c) for c in cells) + ' |'
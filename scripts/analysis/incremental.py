@@ -0,0 +1,191 @@
+"""
+Incremental re-analysis of an edited in-memory source, for editor
+integrations.
+
+    doc = IncrementalAnalysis(text, scan_region, line_of, moved)
+    doc.apply(TextEdit(12, 4, 12, 9, "expect(\\"no config\\")"))
+    doc.findings          # same as a full re-analysis of doc.text
+
+An analyzer plugs in with a region scanner: it analyzes lines `first..last`
+of the file, starting from a given scan state, and reports for every line
+the state code after it. Code 0 means "inside a scope" (e.g. an async fn
+body whose guards and brace depth carry over to the next line); any other
+code names a quiescent state the scan can be restarted from (e.g. "outside
+any async fn, `tokio::sync` already seen"). A stateless analyzer reports 1
+everywhere.
+
+On an edit only the region from the last quiescent line boundary before the
+edit is re-scanned, and only until the first boundary after it where the new
+scan reaches the same quiescent state the old scan had there. Findings past
+that point cannot have changed apart from their line numbers, and are
+shifted. A finding whose text mentions line numbers (`moved` returns None)
+has its scope re-scanned instead. The result is identical to analyzing the
+whole new text.
+"""
+
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Callable, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+# (text of lines first..last, first, last, state code before `first`)
+#   -> (findings on those lines in line order, state code after each line)
+ScanRegion = Callable[[str, int, int, int], Tuple[List[T], bytes]]
+
+INSIDE = 0
+INITIAL = 1          # the state before line 1
+MIN_WINDOW = 16      # lines scanned past the edit before the window doubles
+
+
+class EditError(ValueError):
+    """Raised for an edit range outside the current text."""
+
+
+@dataclass(slots=True)
+class TextEdit:
+    """Replace the text between two positions. Lines are 1-based, columns 0-based characters."""
+    start_line: int
+    start_col: int
+    end_line: int
+    end_col: int
+    text: str
+
+    @classmethod
+    def replace_lines(cls, first: int, last: int, text: str) -> 'TextEdit':
+        """Replace whole lines first..last (without their final newline) by `text`."""
+        return cls(first, 0, last, -1, text)
+
+
+class IncrementalAnalysis(Generic[T]):
+    """Findings of one in-memory source, kept current across edits."""
+
+    def __init__(self, text: str, scan: ScanRegion, line_of: Callable[[T], int],
+                 moved: Callable[[T, int], Optional[T]]):
+        self.scan = scan
+        self.line_of = line_of
+        self.moved = moved
+        self.lines = text.split('\n')
+        self.rescanned = 0  # lines scanned by the last apply()
+        findings, codes = self._scan(1, self.line_count, INITIAL)
+        self.findings: List[T] = findings
+        self.codes = bytearray([INITIAL]) + codes  # codes[k]: state after line k
+
+    @property
+    def text(self) -> str:
+        return '\n'.join(self.lines)
+
+    @property
+    def line_count(self) -> int:
+        """Lines as the analyzers count them: a final newline does not start another line."""
+        return len(self.lines) - (self.lines[-1] == '')
+
+    def _scan(self, first: int, last: int, state: int) -> Tuple[List[T], bytearray]:
+        if last < first:
+            return [], bytearray()
+        text = '\n'.join(self.lines[first - 1:last])
+        if last < len(self.lines):
+            text += '\n'
+        findings, codes = self.scan(text, first, last, state)
+        if len(codes) != last - first + 1:
+            raise ValueError(f"scanner returned {len(codes)} states for {last - first + 1} lines")
+        self.rescanned += last - first + 1
+        return findings, bytearray(codes)
+
+    def apply(self, edit: TextEdit) -> List[T]:
+        """Apply one edit to the text and update the findings; returns them."""
+        lines = self.lines
+        if not (1 <= edit.start_line <= edit.end_line <= len(lines)):
+            raise EditError(f"lines {edit.start_line}-{edit.end_line} outside 1-{len(lines)}")
+        head = lines[edit.start_line - 1]
+        tail = lines[edit.end_line - 1]
+        end_col = len(tail) if edit.end_col < 0 else edit.end_col
+        if not (0 <= edit.start_col <= len(head) and 0 <= end_col <= len(tail)) or \
+                (edit.start_line == edit.end_line and end_col < edit.start_col):
+            raise EditError(f"columns {edit.start_col}-{edit.end_col} outside the edited lines")
+        replacement = (head[:edit.start_col] + edit.text + tail[end_col:]).split('\n')
+
+        first, old_last = edit.start_line, edit.end_line
+        new_last = first + len(replacement) - 1
+        delta = new_last - old_last
+        old_codes, old_findings = self.codes, self.findings
+        old_count = self.line_count
+        lines[first - 1:old_last] = replacement
+        self.rescanned = 0
+        count = self.line_count
+
+        # Restart at the last quiescent boundary before the edit.
+        start = min(first, count + 1)
+        while start > 1 and old_codes[start - 1] == INSIDE:
+            start -= 1
+        kept = old_findings[:bisect_left(old_findings, start, key=self.line_of)]
+        codes = old_codes[:start]
+
+        # Scan until the state after a line past the edit matches the old
+        # state after the corresponding old line.
+        window = MIN_WINDOW
+        position = start
+        resume_old = None  # first old line whose findings are reused, shifted
+        while position <= count:
+            last = min(count, max(new_last, position) + window)
+            found, scanned = self._scan(position, last, codes[position - 1])
+            converged = cut = None
+            for k in range(max(position, new_last), last + 1):
+                code = scanned[k - position]
+                if code == INSIDE:
+                    continue
+                old = k - delta
+                if old_last <= old <= old_count and old_codes[old] == code:
+                    converged = k
+                    break
+            if converged is not None:
+                cut = converged
+            else:
+                cut = next((k for k in range(last, position - 1, -1) if scanned[k - position] != INSIDE), None)
+                if last == count:
+                    cut = count
+            if cut is None:
+                window *= 2  # no restart point in this window: scan it again, larger
+                continue
+            kept.extend(f for f in found if self.line_of(f) <= cut)
+            codes += scanned[:cut - position + 1]
+            position = cut + 1
+            if converged is not None:
+                resume_old = converged - delta + 1
+                break
+            window *= 2
+
+        self.codes = codes
+        self.findings = kept
+        if resume_old is not None:
+            codes += old_codes[resume_old:]
+            self._shift_into(old_findings[bisect_left(old_findings, resume_old, key=self.line_of):], delta)
+        return self.findings
+
+    def _shift_into(self, suffix: List[T], delta: int) -> None:
+        """Append untouched findings, re-scanning the scopes of line-dependent ones."""
+        pending: List[T] = []
+        covered = 0  # last line of the latest re-scanned scope
+        for f in suffix:
+            line = self.line_of(f) + delta
+            if line <= covered:
+                continue
+            moved = self.moved(f, delta) if delta else f
+            if moved is not None:
+                pending.append(moved)
+                continue
+            first, covered = self._scope(line)
+            del pending[bisect_left(pending, first, key=self.line_of):]
+            found, _codes = self._scan(first, covered, self.codes[first - 1])
+            pending.extend(found)
+        self.findings.extend(pending)
+
+    def _scope(self, line: int) -> Tuple[int, int]:
+        """Lines of the scope containing `line`, bounded by quiescent boundaries."""
+        first = line
+        while first > 1 and self.codes[first - 1] == INSIDE:
+            first -= 1
+        last = line
+        while last < self.line_count and self.codes[last] == INSIDE:
+            last += 1
+        return first, last
+
@@ -0,0 +1,107 @@
+"""
+Multi-literal prefilter for line-oriented analyzer rules.
+
+Most analyzer rules start with a cheap literal test (`'.unwrap()' in line`).
+Running every test on every line makes per-line cost grow with the number
+of rules. `LiteralPrefilter` compiles all literals into one alternation and
+finds every line containing any of them in a single scan of the buffer;
+only those candidate lines go on to the individual rule checks.
+"""
+
+import re
+from typing import Iterable, Iterator, Set, Tuple
+
+
+def trie_pattern(literals: Iterable[str]) -> str:
+    """
+    Build a regex that matches any of `literals`, factored as a prefix trie.
+
+    `a|ab|ac` becomes `a(?:b|c)?`: the regex engine tests each input
+    character against one branch set per trie level instead of retrying
+    every literal, which is the Aho-Corasick idea expressed with `re`.
+    """
+    trie: dict = {}
+    for literal in literals:
+        node = trie
+        for ch in literal:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            # A literal ends here; longer continuations are tried first.
+            body = '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+class LiteralPrefilter:
+    """Find lines containing at least one of a fixed set of literals."""
+
+    def __init__(self, literals: Iterable[str]):
+        self.literals = tuple(dict.fromkeys(l for l in literals if l))
+        if not self.literals:
+            raise ValueError("LiteralPrefilter needs at least one literal")
+        trie = trie_pattern(self.literals)
+        self.pattern = re.compile(trie)
+        self.byte_pattern = re.compile(trie.encode('utf-8'))
+        # Zero-width lookahead finds the longest literal at *every* offset,
+        # so overlapping literals are all reported by `literals_in`.
+        self._overlapping = re.compile(f'(?=({trie}))')
+        self._prefixes = {
+            literal: tuple(l for l in self.literals if literal.startswith(l))
+            for literal in self.literals
+        }
+
+    def iter_candidates(self, content) -> Iterator[Tuple[int, int, int]]:
+        """
+        Yield (line number, start, end) for each line containing any literal.
+
+        `content` may be a `str`, `bytes` or a memory-mapped buffer; byte
+        buffers are scanned with a bytes regex, without decoding.
+        """
+        if isinstance(content, str):
+            search, newline = self.pattern.search, '\n'
+            count = content.count
+        else:
+            search, newline = self.byte_pattern.search, b'\n'
+            count = getattr(content, 'count', None)
+            if count is None:  # mmap has find() but no count()
+                def count(sub, start, end):
+                    return content[start:end].count(sub)
+        find = content.find
+        size = len(content)
+
+        line_no = 1
+        pos = 0
+        match = search(content)
+        while match is not None:
+            line_no += count(newline, pos, match.start())
+            start = content.rfind(newline, pos, match.start()) + 1
+            # Resume at the next line: one hit is enough to make it a candidate.
+            eol = find(newline, match.end())
+            yield line_no, start, size if eol == -1 else eol
+            if eol == -1:
+                return
+            pos = eol
+            match = search(content, eol)
+
+    def candidate_lines(self, content) -> Set[int]:
+        """Return 1-based numbers of lines that contain any literal."""
+        return {line_no for line_no, _start, _end in self.iter_candidates(content)}
+
+    def matches(self, text: str) -> bool:
+        return self.pattern.search(text) is not None
+
+    def literals_in(self, text: str) -> Set[str]:
+        """Return every literal occurring in `text`, including overlapping ones."""
+        found = set()
+        for match in self._overlapping.finditer(text):
+            # Any shorter literal at the same offset is a prefix of the longest.
+            found.update(self._prefixes[match.group(1)])
+        return found
@@ -0,0 +1,101 @@
+"""
+Byte-level source reading for the analyzers.
+
+`Path.read_text()` decodes a whole file up front: it raises on non-UTF-8
+vendored sources and, once split into lines, keeps a second full copy in
+memory. `SourceBuffer` memory-maps the file instead. Prefilters run byte
+regexes directly on the mapped buffer and only the lines that are reported
+get decoded, with invalid UTF-8 replaced rather than raised.
+"""
+
+import io
+import mmap
+import os
+from typing import Iterator, Optional, Union
+
+Buffer = Union[bytes, mmap.mmap]
+
+
+def decode_line(raw: bytes) -> str:
+    """Decode one line of source, replacing invalid UTF-8 instead of failing."""
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw.decode('utf-8', errors='replace')
+
+
+class SourceBuffer:
+    """
+    Read-only bytes view of one source file.
+
+    Files are memory-mapped; empty files and in-memory sources (`from_text`)
+    use a plain `bytes` object. Use as a context manager to release the map.
+    """
+
+    def __init__(self, data: Buffer, name: str = "<memory>", mapped: Optional[mmap.mmap] = None):
+        self.data = data
+        self.name = name
+        self._mapped = mapped
+
+    @classmethod
+    def open(cls, path) -> 'SourceBuffer':
+        path = os.fspath(path)
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return cls(b'', path)
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # Special files (pipes, some network mounts) cannot be mapped.
+                return cls(f.read(), path)
+        return cls(mapped, path, mapped)
+
+    @classmethod
+    def from_text(cls, text: str, name: str = "<memory>") -> 'SourceBuffer':
+        return cls(text.encode('utf-8', errors='surrogateescape'), name)
+
+    def __enter__(self) -> 'SourceBuffer':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def find(self, sub: bytes, start: int = 0) -> int:
+        return self.data.find(sub, start)
+
+    def lines(self) -> Iterator[bytes]:
+        """
+        Iterate raw lines, each keeping its trailing b'\\n'.
+
+        Backed by the C-level `readline` of the map (or of a `BytesIO` that
+        shares the in-memory bytes), so no per-line Python frame is involved.
+        """
+        if self._mapped is not None:
+            self._mapped.seek(0)
+            return iter(self._mapped.readline, b'')
+        return iter(io.BytesIO(self.data).readline, b'')
+
+    def line_at(self, offset: int) -> bytes:
+        """Return the raw line containing byte `offset`."""
+        start = self.data.rfind(b'\n', 0, offset) + 1
+        end = self.data.find(b'\n', offset)
+        return self.data[start:end if end != -1 else len(self.data)]
+
+    def text(self) -> str:
+        """Decode the whole buffer (for analyzers that need full-text context)."""
+        return decode_line(self.data[:])
+
+
+def read_source_text(path) -> str:
+    """Read a whole source file as text, tolerating invalid UTF-8."""
+    with SourceBuffer.open(path) as buf:
+        return buf.text()
@@ -0,0 +1,131 @@
+"""
+Rendering of large finding lists into report sections.
+
+A report section lists findings one markdown block each, and a report has
+either one section in walk order or one per severity. `render_sections`
+builds all of them in one pass over the findings: each finding is rendered
+into the bucket of its section as it is read, instead of re-filtering the
+whole run once per severity (which, for a `FindingStore`, also re-read every
+source file's snippets once per severity).
+
+With `jobs > 1`, a store is rendered in chunks of a few files (CHUNK_ROWS
+findings) on a process pool; each worker reads its own files' snippets, and
+chunks are collected in walk order, so the output is identical to a
+sequential render. The analyzer's `make` and `render` functions must be
+module-level so they can be sent to the workers.
+
+Analyzers assemble a `ReportParts` (lines before the sections, the
+sections, lines after) and either write it to a stream line by line or,
+with `write_pages`, split the sections over numbered page files behind an
+index page, for reports too long to open in one piece.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from .store import FindingStore, Row, read_snippets
+
+CHUNK_ROWS = 5000
+
+# section key (a severity, or None for a single walk-order section) -> rendered findings
+Sections = Dict[Optional[str], List[str]]
+
+
+def _partition(findings, render: Callable, sections: Optional[Sequence[str]]) -> Sections:
+    buckets: Sections = {key: [] for key in (sections if sections is not None else (None,))}
+    for f in findings:
+        bucket = buckets.get(f.severity) if sections is not None else buckets[None]
+        if bucket is not None:
+            bucket.append(render(f))
+    return buckets
+
+
+def _render_chunk(chunk: List[Tuple[Optional[str], List[Row]]], make: Callable, render: Callable,
+                  sections: Optional[Sequence[str]], width: int) -> Sections:
+    """Render one chunk of store rows, reading the snippets of its files."""
+    def findings():
+        for path, rows in chunk:
+            snippets = read_snippets(path, (row[0] for row in rows), width) if path is not None else None
+            for line, rule, severity, message, snippet in rows:
+                yield make(line, rule, severity, message,
+                           snippet if snippets is None else snippets.get(line, ''))
+    return _partition(findings(), render, sections)
+
+
+def render_sections(findings, render: Callable, sections: Optional[Sequence[str]] = None,
+                    jobs: int = 1) -> Sections:
+    """
+    Rendered findings per section: per severity in `sections` (findings of
+    other severities are skipped), or all in walk order under None.
+    """
+    if not isinstance(findings, FindingStore):
+        return _partition(findings, render, sections)
+
+    chunks: Iterator = findings.chunks(CHUNK_ROWS, sections)
+    if jobs <= 1 or len(findings) <= CHUNK_ROWS:
+        results = (_render_chunk(chunk, findings.make, render, sections, findings.snippet_width)
+                   for chunk in chunks)
+        return _merge(results, sections)
+
+    from concurrent.futures import ProcessPoolExecutor  # only parallel renders pay for multiprocessing
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(_render_chunk, chunk, findings.make, render, sections,
+                                   findings.snippet_width) for chunk in chunks]
+        return _merge((future.result() for future in futures), sections)
+
+
+def _merge(results: Iterator[Sections], sections: Optional[Sequence[str]]) -> Sections:
+    merged: Sections = {key: [] for key in (sections if sections is not None else (None,))}
+    for result in results:
+        for key, rendered in result.items():
+            merged[key].extend(rendered)
+    return merged
+
+
+@dataclass(slots=True)
+class ReportParts:
+    """A markdown report as lines before the finding sections, the sections, and lines after."""
+    head: List[str]
+    sections: List[Tuple[str, List[str]]] = field(default_factory=list)  # (heading, rendered findings)
+    tail: List[str] = field(default_factory=list)
+
+    def lines(self) -> Iterator[str]:
+        yield from self.head
+        for heading, rendered in self.sections:
+            yield heading
+            yield from rendered
+        yield from self.tail
+
+    def text(self) -> str:
+        return '\n'.join(self.lines())
+
+    def write(self, out: TextIO) -> None:
+        """Write the report as `print(self.text())` would, without building the joined string."""
+        for line in self.lines():
+            out.write(line)
+            out.write('\n')
+
+    def write_pages(self, directory: Path, page_size: int) -> List[Path]:
+        """
+        Write the sections as pages of at most `page_size` findings
+        (`page-001.md`, ...) and `index.md`, the report with a list of the
+        pages in place of the sections. Returns the files written, index first.
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        written = []
+        listing = []
+        for heading, rendered in self.sections:
+            title = heading.strip().lstrip('#').strip()
+            for start in range(0, len(rendered), page_size):
+                end = min(start + page_size, len(rendered))
+                name = f"page-{len(written) + 1:03d}.md"
+                page = ReportParts([f"# {title} ({start + 1}-{end} of {len(rendered)})\n"], tail=rendered[start:end])
+                with open(directory / name, 'w', encoding='utf-8') as out:
+                    page.write(out)
+                listing.append(f"- [{title} {start + 1}-{end}]({name})")
+                written.append(directory / name)
+        index = ReportParts(self.head + (["## Pages\n"] + listing + [""] if listing else []), tail=self.tail)
+        with open(directory / 'index.md', 'w', encoding='utf-8') as out:
+            index.write(out)
+        return [directory / 'index.md'] + written
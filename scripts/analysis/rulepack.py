@@ -0,0 +1,257 @@
+"""
+Declarative rule packs for the line-oriented analyzers.
+
+A rule pack is a YAML file in a skill's `assets/` directory:
+
+    rule_pack: error-handling
+    rules:
+      - id: unwrap
+        literal: ".unwrap()"          # str or list; any one must occur
+        regex: '\\.unwrap\\(\\)'        # optional, confirms the literal hit
+        severity: warning
+        message: "..."                # may use {line}, {0} (match), {1}.. (groups)
+        suggestion: "..."
+        skip_comments: true           # ignore `//` lines
+        requires: [async_fn]          # contexts the analyzer must report active
+        unless: ["Mutex"]             # literals that suppress the rule
+        statement: true               # regex may run on into the statement's next lines
+
+All rules of a pack compile into one matcher: a single `LiteralPrefilter`
+over every rule literal selects candidate lines, and per line only the rules
+whose literals occur are evaluated. A `statement` rule whose regex does not
+match its candidate line alone is retried on the line's logical statement
+(see analysis.statements), when the analyzer provides one; the match must
+still start on the candidate line. The compiled pack is pickled under the
+YAML's `__pycache__/` keyed by the YAML's hash, so `yaml` is imported only
+when a pack changes.
+"""
+
+import hashlib
+import pickle
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .prefilter import LiteralPrefilter
+
+# Lazily returns the logical statement holding a line, as (text, start, end)
+# with text[start:end] being the line, or None if the line is a whole statement.
+StatementOf = Callable[[], Optional[Tuple[str, int, int]]]
+
+
+# Bump when the compiled representation changes to invalidate pickles.
+ENGINE_VERSION = 3
+
+RULE_KEYS = {'id', 'literal', 'regex', 'severity', 'message', 'suggestion',
+             'skip_comments', 'requires', 'unless', 'statement'}
+
+
+class RulePackError(ValueError):
+    """Raised when a rule pack YAML file is malformed."""
+
+
+@dataclass(frozen=True, eq=False)
+class Rule:
+    id: str
+    order: int
+    literals: Tuple[str, ...]
+    regex: Optional[re.Pattern]
+    severity: str
+    message: str
+    suggestion: str
+    skip_comments: bool
+    requires: FrozenSet[str]
+    unless: Tuple[str, ...]
+    statement: bool = False
+
+    def format_message(self, line_number: int, match: Optional[re.Match] = None) -> str:
+        return _format(self.message, line_number, match)
+
+    def format_suggestion(self, line_number: int, match: Optional[re.Match] = None) -> str:
+        return _format(self.suggestion, line_number, match)
+
+    @property
+    def mentions_line(self) -> bool:
+        """Whether the message or suggestion embeds the finding's line number."""
+        return '{line' in self.message or '{line' in self.suggestion
+
+
+def _format(template: str, line_number: int, match: Optional[re.Match]) -> str:
+    if '{' not in template:
+        return template
+    args = (match.group(0),) + match.groups() if match else ()
+    return template.format(*args, line=line_number)
+
+
+class CompiledRulePack:
+    """All rules of one pack behind a single literal prefilter."""
+
+    def __init__(self, name: str, rules: List[Rule]):
+        self.name = name
+        self.rules = rules
+        self.by_id: Dict[str, Rule] = {r.id: r for r in rules}
+        self.by_literal: Dict[str, List[Rule]] = {}
+        # Rules without literals cannot be prefiltered and run on every line.
+        self.unfiltered: List[Rule] = [r for r in rules if not r.literals]
+        for rule in rules:
+            for literal in rule.literals:
+                self.by_literal.setdefault(literal, []).append(rule)
+        self.prefilter = LiteralPrefilter(self.by_literal) if self.by_literal else None
+
+    def candidate_lines(self, content: str) -> Optional[Set[int]]:
+        """1-based candidate line numbers, or None if every line must be checked."""
+        if self.unfiltered or self.prefilter is None:
+            return None
+        return self.prefilter.candidate_lines(content)
+
+    def iter_candidates(self, content) -> Optional[Iterator[Tuple[int, int, int]]]:
+        """(line number, start, end) of candidate lines, or None if every line must be checked."""
+        if self.unfiltered or self.prefilter is None:
+            return None
+        return self.prefilter.iter_candidates(content)
+
+    def match_line(self, line: str, contexts: Iterable[str] = (),
+                   only: Optional[Set[str]] = None,
+                   statement: Optional[StatementOf] = None) -> List[Tuple[Rule, Optional[re.Match]]]:
+        """
+        Return (rule, regex match) for every rule firing on `line`, in pack
+        order. `statement` is only called for a `statement` rule the line
+        alone does not satisfy.
+        """
+        rules: Set[Rule] = set(self.unfiltered)
+        if self.prefilter is not None:
+            for literal in self.prefilter.literals_in(line):
+                rules.update(self.by_literal[literal])
+        if not rules:
+            return []
+
+        active = frozenset(contexts)
+        is_comment = line.lstrip().startswith('//')
+        hits = []
+        for rule in sorted(rules, key=lambda r: r.order):
+            if only is not None and rule.id not in only:
+                continue
+            if rule.skip_comments and is_comment:
+                continue
+            if not rule.requires <= active:
+                continue
+            if any(u in line for u in rule.unless):
+                continue
+            match = None
+            if rule.regex is not None:
+                match = rule.regex.search(line)
+                if match is None and rule.statement and statement is not None:
+                    match = _match_in_statement(rule.regex, statement())
+                if match is None:
+                    continue
+            hits.append((rule, match))
+        return hits
+
+
+def _match_in_statement(regex: re.Pattern, span: Optional[Tuple[str, int, int]]) -> Optional[re.Match]:
+    """First match starting on the line `span` locates within its statement."""
+    if span is None:
+        return None
+    text, start, end = span
+    match = regex.search(text, start)
+    return match if match is not None and match.start() < end else None
+
+
+def _as_tuple(value, field: str, rule_id: str) -> Tuple[str, ...]:
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        return (value,)
+    if isinstance(value, list) and all(isinstance(v, str) for v in value):
+        return tuple(value)
+    raise RulePackError(f"rule {rule_id}: '{field}' must be a string or list of strings")
+
+
+def compile_rule_pack(data: dict, source: str = "<rule pack>") -> CompiledRulePack:
+    """Validate parsed YAML and compile it into a `CompiledRulePack`."""
+    if not isinstance(data, dict) or not isinstance(data.get('rules'), list):
+        raise RulePackError(f"{source}: expected a mapping with a 'rules' list")
+
+    rules = []
+    seen = set()
+    for order, raw in enumerate(data['rules']):
+        if not isinstance(raw, dict) or 'id' not in raw:
+            raise RulePackError(f"{source}: rule #{order + 1} has no 'id'")
+        rule_id = str(raw['id'])
+        unknown = set(raw) - RULE_KEYS
+        if unknown:
+            raise RulePackError(f"rule {rule_id}: unknown keys {sorted(unknown)}")
+        if rule_id in seen:
+            raise RulePackError(f"rule {rule_id}: duplicate id")
+        seen.add(rule_id)
+        if 'severity' not in raw:
+            raise RulePackError(f"rule {rule_id}: missing 'severity'")
+        if 'literal' not in raw and 'regex' not in raw:
+            raise RulePackError(f"rule {rule_id}: needs 'literal' or 'regex'")
+        if raw.get('statement') and raw.get('regex') is None:
+            raise RulePackError(f"rule {rule_id}: 'statement' needs a 'regex' to match across lines")
+
+        regex = None
+        if raw.get('regex') is not None:
+            try:
+                regex = re.compile(raw['regex'])
+            except re.error as e:
+                raise RulePackError(f"rule {rule_id}: invalid regex: {e}") from e
+
+        rules.append(Rule(
+            id=rule_id,
+            order=order,
+            literals=_as_tuple(raw.get('literal'), 'literal', rule_id),
+            regex=regex,
+            severity=str(raw['severity']),
+            message=str(raw.get('message', '')),
+            suggestion=str(raw.get('suggestion', '')),
+            skip_comments=bool(raw.get('skip_comments', False)),
+            requires=frozenset(_as_tuple(raw.get('requires'), 'requires', rule_id)),
+            unless=_as_tuple(raw.get('unless'), 'unless', rule_id),
+            statement=bool(raw.get('statement', False)),
+        ))
+
+    return CompiledRulePack(str(data.get('rule_pack', source)), rules)
+
+
+def _cache_path(path: Path) -> Path:
+    return path.parent / '__pycache__' / f"{path.stem}.rulepack.pickle"
+
+
+def load_rule_pack(path, use_cache: bool = True) -> CompiledRulePack:
+    """Load a rule pack, reusing the pickled compile if the YAML is unchanged."""
+    path = Path(path)
+    raw = path.read_bytes()
+    key = f"{ENGINE_VERSION}:{hashlib.sha256(raw).hexdigest()}"
+    cache = _cache_path(path)
+
+    if use_cache:
+        try:
+            with open(cache, 'rb') as f:
+                cached_key, pack = pickle.load(f)
+            if cached_key == key:
+                return pack
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError, TypeError):
+            pass
+
+    import yaml  # only needed when the pack changed
+
+    try:
+        data = yaml.safe_load(raw)
+    except yaml.YAMLError as e:
+        raise RulePackError(f"{path}: YAML parse error: {e}") from e
+    pack = compile_rule_pack(data, str(path))
+
+    if use_cache:
+        try:
+            cache.parent.mkdir(exist_ok=True)
+            tmp = cache.with_suffix('.tmp')
+            with open(tmp, 'wb') as f:
+                pickle.dump((key, pack), f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(cache)
+        except OSError:
+            pass  # read-only install: compile every time
+
+    return pack
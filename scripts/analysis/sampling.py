@@ -0,0 +1,211 @@
+"""
+Stratified file sampling for quick repo-wide score estimates.
+
+`--sample 200` (or `--sample 5%`) analyzes a random sample of the walked
+files instead of all of them:
+
+- Files are stratified by crate (nearest Cargo.toml) and size class, since
+  finding density differs between crates and large files carry most of
+  the findings.
+- Every stratum gets at least two files (all of its files if it has fewer),
+  so its variance can be estimated; the rest of the sample is allocated in
+  proportion to each stratum's bytes.
+- Within a stratum, files are drawn with `random.Random(seed)` from walk
+  order, so a seed always picks the same files from the same tree.
+
+Per-severity totals are estimated with the stratified expansion estimator
+(`N_h` times the stratum's sample mean, summed). The 95% interval uses the
+finite population correction and a Student t quantile with Satterthwaite
+degrees of freedom, since strata hold only a few sampled files. A stratum
+analyzed in full contributes no uncertainty, so a sample covering every
+file gives the exact counts. Intervals for rare findings are optimistic: a
+stratum whose sampled files have none shows no variance.
+"""
+
+import math
+import random
+from dataclasses import dataclass, field
+from itertools import product
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .history import CrateResolver
+
+SIZE_CLASSES = (4 * 1024, 32 * 1024)   # bytes; small / medium / large files
+MIN_PER_STRATUM = 2
+Z_95 = 1.96
+
+
+class SampleError(ValueError):
+    """Raised for malformed --sample specs."""
+
+
+def parse_sample(spec: str) -> Tuple[Optional[int], Optional[float]]:
+    """Parse `N` (files) or `P%` (of the files) into (count, fraction)."""
+    try:
+        if spec.endswith('%'):
+            fraction = float(spec[:-1]) / 100
+            if not 0 < fraction <= 1:
+                raise ValueError
+            return None, fraction
+        count = int(spec)
+        if count < 1:
+            raise ValueError
+        return count, None
+    except ValueError:
+        raise SampleError(f"invalid sample '{spec}', expected a file count such as 200 "
+                          f"or a percentage such as 5%") from None
+
+
+@dataclass(slots=True)
+class Stratum:
+    crate: str
+    size_class: int
+    files: List[Tuple[Path, str]] = field(default_factory=list)  # (path, rel), walk order
+    sizes: List[int] = field(default_factory=list)
+    bytes: int = 0
+    sample: List[Tuple[Path, str]] = field(default_factory=list)
+    sample_bytes: int = 0
+
+
+@dataclass(slots=True)
+class Estimate:
+    value: float
+    low: float
+    high: float
+
+
+def size_class(size: int) -> int:
+    return sum(size >= bound for bound in SIZE_CLASSES)
+
+
+def stratify(files: Iterable[Tuple[Path, str]], root: Path) -> List[Stratum]:
+    """Group (path, rel) pairs by crate and size class."""
+    resolver = CrateResolver(root if root.is_dir() else root.parent)
+    strata: Dict[Tuple[str, int], Stratum] = {}
+    for path, rel in files:
+        try:
+            size = path.stat().st_size
+        except OSError:
+            continue
+        crate = resolver.crate_of(path)
+        cls = size_class(size)
+        stratum = strata.get((crate, cls))
+        if stratum is None:
+            stratum = strata[crate, cls] = Stratum(crate, cls)
+        stratum.files.append((path, rel))
+        stratum.sizes.append(size)
+        stratum.bytes += size
+    return [strata[key] for key in sorted(strata)]
+
+
+def allocate(strata: List[Stratum], size: int) -> List[int]:
+    """
+    Files to draw per stratum: at least MIN_PER_STRATUM (or all of a smaller
+    stratum), the remainder proportional to bytes by largest remainder.
+    """
+    counts = [min(len(s.files), MIN_PER_STRATUM) for s in strata]
+    left = size - sum(counts)
+    while left > 0:
+        open_ = [i for i, s in enumerate(strata) if counts[i] < len(s.files)]
+        if not open_:
+            break
+        total = sum(strata[i].bytes for i in open_) or len(open_)
+        shares = [(left * (strata[i].bytes or 1) / total, i) for i in open_]
+        given = 0
+        for share, i in shares:
+            extra = min(int(share), len(strata[i].files) - counts[i])
+            counts[i] += extra
+            given += extra
+        if given == 0:
+            # Hand out the last files by largest fractional share.
+            for _frac, i in sorted(((share - int(share), i) for share, i in shares), reverse=True)[:left]:
+                counts[i] += 1
+                given += 1
+        left -= given
+    return counts
+
+
+def draw(files: Iterable[Tuple[Path, str]], root: Path, count: Optional[int],
+         fraction: Optional[float], seed: int) -> List[Stratum]:
+    """Stratify the files and draw each stratum's sample reproducibly from `seed`."""
+    strata = stratify(files, root)
+    population = sum(len(s.files) for s in strata)
+    size = count if count is not None else math.ceil(population * fraction)
+    rng = random.Random(seed)
+    for stratum, n in zip(strata, allocate(strata, min(size, population))):
+        picked = sorted(rng.sample(range(len(stratum.files)), n))
+        stratum.sample = [stratum.files[i] for i in picked]
+        stratum.sample_bytes = sum(stratum.sizes[i] for i in picked)
+    return strata
+
+
+def estimate_totals(strata: List[Stratum], values: Mapping[str, Mapping[str, int]],
+                    keys: Iterable[str]) -> Dict[str, Estimate]:
+    """
+    Estimated totals of `keys` (e.g. severities) over all files, from the
+    per-file values of the sampled files (`rel -> key -> value`). Sampled
+    files missing from `values` (timed out, failed) are left out of their
+    stratum's sample; a stratum with nothing analyzed contributes nothing.
+    """
+    estimates = {}
+    for key in keys:
+        total = variance = observed = 0.0
+        parts = []  # (variance, degrees of freedom) per stratum
+        for stratum in strata:
+            ys = [values[rel].get(key, 0) for _path, rel in stratum.sample if rel in values]
+            n, big_n = len(ys), len(stratum.files)
+            if n == 0:
+                continue
+            mean = sum(ys) / n
+            total += big_n * mean
+            observed += sum(ys)
+            if 1 < n < big_n:
+                s2 = sum((y - mean) ** 2 for y in ys) / (n - 1)
+                part = big_n * big_n * (1 - n / big_n) * s2 / n
+                variance += part
+                parts.append((part, n - 1))
+        margin = 0.0
+        if variance > 0:
+            df = variance ** 2 / sum(part * part / dof for part, dof in parts)
+            margin = t_quantile_95(df) * math.sqrt(variance)
+        # The sampled files alone already hold `observed` findings.
+        estimates[key] = Estimate(total, max(observed, total - margin), total + margin)
+    return estimates
+
+
+def t_quantile_95(df: float) -> float:
+    """Two-sided 95% Student t quantile (Cornish-Fisher expansion; exact as df grows)."""
+    z = Z_95
+    return (z + (z ** 3 + z) / (4 * df) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3))
+
+
+def score_interval(score: Callable[[Mapping[str, float]], float],
+                   estimates: Mapping[str, Estimate]) -> Estimate:
+    """
+    Score at the estimated totals, with the range it takes over the counts'
+    intervals (every combination of bounds; scores are monotone in each count).
+    """
+    keys = list(estimates)
+    corners = [score(dict(zip(keys, bounds)))
+               for bounds in product(*((estimates[k].low, estimates[k].high) for k in keys))]
+    return Estimate(score({k: e.value for k, e in estimates.items()}), min(corners), max(corners))
+
+
+def report_lines(strata: List[Stratum], seed: int, analyzed: int) -> List[str]:
+    """Markdown bullet lines describing the sample."""
+    population = sum(len(s.files) for s in strata)
+    sampled = sum(len(s.sample) for s in strata)
+    total_bytes = sum(s.bytes for s in strata)
+    sample_bytes = sum(s.sample_bytes for s in strata)
+    lines = [f"- Files sampled: {sampled} of {population} (seed {seed}, "
+             f"{len(strata)} {'stratum' if len(strata) == 1 else 'strata'} by crate and size)",
+             f"- Bytes sampled: {sample_bytes / 1024:.0f} KB of {total_bytes / 1024:.0f} KB"]
+    if analyzed != sampled:
+        lines.append(f"- Files analyzed: {analyzed} (the rest timed out or failed)")
+    return lines
+
+
+def format_estimate(e: Estimate, unit: str = '') -> str:
+    return f"~{e.value:.0f}{unit} (95% CI {e.low:.0f}-{e.high:.0f})"
@@ -0,0 +1,154 @@
+"""
+Sharded analysis runs and mergeable partial results.
+
+A CI job split over N runners passes `--shard i/N` (1-based) to an
+analyzer. Every runner walks the same tree, but only analyzes the files
+whose path hash falls into its shard, and writes a JSONL partial result:
+
+    {"type": "header", "format": 1, "analyzer": "...", "root": "...", "shard": [i, N]}
+    {"type": "file", "path": "src/lib.rs", "findings": [{...}, ...]}
+    {"type": "stats", "walk": {...}}
+
+`merge_partials` recombines the shards in the order a single-node run
+visits files, so the merged report and score are identical to one made
+without sharding. Paths ending in `.gz` are read and written gzipped.
+"""
+
+import hashlib
+import json
+import sys
+from dataclasses import asdict
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .walker import WalkStats
+
+
+FORMAT_VERSION = 1
+
+
+class ShardError(ValueError):
+    """Raised for malformed shard specs or inconsistent partial results."""
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """Parse `i/N` (1 <= i <= N) into a tuple."""
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise ShardError(f"invalid shard '{spec}', expected i/N such as 1/4") from None
+    if count < 1 or not 1 <= index <= count:
+        raise ShardError(f"invalid shard '{spec}': need 1 <= i <= N")
+    return index, count
+
+
+def shard_of(rel_path: str, count: int) -> int:
+    """Deterministic 1-based shard for a root-relative posix path."""
+    digest = hashlib.blake2b(rel_path.encode('utf-8', 'surrogateescape'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % count + 1
+
+
+def walk_order_key(rel_path: str) -> tuple:
+    """Sort key reproducing `iter_source_files` order: files before subdirectories."""
+    parts = rel_path.split('/')
+    return tuple((1, d) for d in parts[:-1]) + ((0, parts[-1]),)
+
+
+def relative_name(path: Path, root: Path) -> str:
+    return path.name if path == root else path.relative_to(root).as_posix()
+
+
+def select_shard(files: Iterable[Path], root: Path,
+                 shard: Optional[Tuple[int, int]]) -> Iterator[Tuple[Path, str]]:
+    """Yield (path, relative name) for the files belonging to `shard` (all if None)."""
+    for path in files:
+        rel = relative_name(path, root)
+        if shard is None or shard_of(rel, shard[1]) == shard[0]:
+            yield path, rel
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path == '-':
+        return sys.stdout if 'w' in mode else sys.stdin
+    if path.endswith('.gz'):
+        import gzip
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class PartialWriter:
+    """Stream one shard's findings to a JSONL partial result."""
+
+    def __init__(self, path: str, analyzer: str, root: str, shard: Tuple[int, int]):
+        self._path = path
+        self._out = _open(path, 'w')
+        self._write({'type': 'header', 'format': FORMAT_VERSION, 'analyzer': analyzer,
+                     'root': root, 'shard': list(shard)})
+
+    def _write(self, record: dict) -> None:
+        self._out.write(json.dumps(record, separators=(',', ':'), ensure_ascii=False))
+        self._out.write('\n')
+
+    def add_file(self, rel_path: str, findings: List[dict]) -> None:
+        self._write({'type': 'file', 'path': rel_path, 'findings': findings})
+
+    def close(self, walk_stats: Optional[WalkStats] = None) -> None:
+        self._write({'type': 'stats', 'walk': asdict(walk_stats) if walk_stats else None})
+        if self._path != '-':
+            self._out.close()
+        else:
+            self._out.flush()
+
+
+def merge_partials(paths: List[str], analyzer: str) -> Tuple[str, List[Tuple[str, List[dict]]], Optional[WalkStats]]:
+    """
+    Combine partial results into (root, [(file, findings)] in walk order, walk stats).
+
+    Raises ShardError if the partials come from different analyzers or runs,
+    or if any shard is missing or duplicated.
+    """
+    root = None
+    count = None
+    seen_shards: Dict[int, str] = {}
+    files: Dict[str, List[dict]] = {}
+    walk = None
+
+    for path in paths:
+        with _open(path, 'r') as f:
+            header = json.loads(f.readline() or 'null')
+            if not isinstance(header, dict) or header.get('type') != 'header':
+                raise ShardError(f"{path}: not a partial result file")
+            if header.get('format') != FORMAT_VERSION:
+                raise ShardError(f"{path}: unsupported format {header.get('format')}")
+            if header.get('analyzer') != analyzer:
+                raise ShardError(f"{path}: produced by {header.get('analyzer')}, not {analyzer}")
+
+            index, shard_count = header['shard']
+            if count is None:
+                root, count = header['root'], shard_count
+            elif shard_count != count or header['root'] != root:
+                raise ShardError(f"{path}: belongs to a different run ({header['root']}, {shard_count} shards)")
+            if index in seen_shards:
+                raise ShardError(f"{path}: shard {index}/{count} already read from {seen_shards[index]}")
+            seen_shards[index] = path
+
+            complete = False
+            for line in f:
+                record = json.loads(line)
+                if record['type'] == 'file':
+                    files[record['path']] = record['findings']
+                elif record['type'] == 'stats':
+                    complete = True
+                    if record['walk'] is not None and walk is None:
+                        walk = WalkStats(**record['walk'])
+            if not complete:
+                raise ShardError(f"{path}: truncated (no stats record)")
+
+    if count is None:
+        raise ShardError("no partial results given")
+    missing = sorted(set(range(1, count + 1)) - set(seen_shards))
+    if missing:
+        raise ShardError(f"missing shard(s): {', '.join(f'{i}/{count}' for i in missing)}")
+
+    ordered = sorted(files.items(), key=lambda item: walk_order_key(item[0]))
+    return root, ordered, walk
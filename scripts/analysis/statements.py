@@ -0,0 +1,100 @@
+"""
+Logical statements over physical lines, for rules that must see a whole
+method chain.
+
+rustfmt splits long calls and chains over lines:
+
+    let config = parse(
+        read(path)?
+    );
+
+so a per-line regex such as `\\?\\s*[;}\\)]` never sees the `?` on one line
+followed by the `)` on the next. A statement runs until a line whose code
+(string literals and `//` comments removed) ends with `;`, `{` or `}`, or a
+blank line; comment-only lines inside a chain continue it. Whether a line
+ends a statement depends on that line alone, so the lines that do are
+restart points for incremental re-scans. In the assembled text, `//`
+comments are blanked to spaces of the same length, so a `?` in a comment
+never pairs with the `}` on the next line, and a comment-only line yields
+no match of its own.
+
+A match must start on the line that has the rule's literal, so only the
+rest of the statement from that line on is needed. `StatementIndex.span`
+assembles it on demand, looking at most MAX_STATEMENT_LINES ahead, and keeps
+the last assembled statement: analyzers ask for lines in increasing order,
+so each physical line is scanned and joined at most once per file.
+"""
+
+import re
+from typing import List, Optional, Sequence, Tuple
+
+MAX_STATEMENT_LINES = 32   # bounds a statement when the terminator heuristic fails (macros, raw strings)
+TERMINATORS = (';', '{', '}')
+
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"')
+
+
+def mask_comment(line: str) -> str:
+    """The line with its `//` comment (outside string literals) replaced by spaces."""
+    if '//' not in line:
+        return line
+    code = _STRING.sub(lambda m: '"' + ' ' * (len(m.group()) - 2) + '"', line) if '"' in line else line
+    cut = code.find('//')
+    return line if cut == -1 else line[:cut] + ' ' * (len(line) - cut)
+
+
+def ends_statement(line: str) -> bool:
+    """Whether a statement cannot continue past this line."""
+    code = line
+    if '"' in code:
+        code = _STRING.sub('""', code)
+    if '//' in code:
+        code = code.split('//', 1)[0]
+        if not code.strip():
+            return False  # comment-only line: part of the surrounding chain
+    code = code.rstrip()
+    return not code or code.endswith(TERMINATORS)
+
+
+class StatementIndex:
+    """Statements of a sequence of lines numbered from `first`, assembled on demand."""
+
+    def __init__(self, lines: Sequence[str], first: int = 1):
+        self.lines = lines
+        self.first = first
+        # Last assembled statement tail: (first index, last index, text, line offsets).
+        # A tail cut at MAX_STATEMENT_LINES is not reused, so a line's window
+        # never depends on which line was asked for first.
+        self._tail: Optional[Tuple[int, int, str, List[int]]] = None
+        self._tail_whole = False
+
+    @classmethod
+    def from_text(cls, text: str, first: int = 1) -> 'StatementIndex':
+        return cls(text.split('\n'), first)
+
+    def restart_codes(self) -> bytearray:
+        """1 for every line that ends its statement, 0 where the statement goes on."""
+        return bytearray(map(ends_statement, self.lines))
+
+    def span(self, line_number: int) -> Tuple[str, int, int]:
+        """
+        (text, start, end): the statement from line `line_number` (or an
+        earlier line of it) to its end, with text[start:end] being the line.
+        """
+        k = line_number - self.first
+        tail = self._tail
+        if tail is None or not (tail[0] == k or self._tail_whole and tail[0] < k <= tail[1]):
+            last = k
+            limit = min(len(self.lines), k + MAX_STATEMENT_LINES) - 1
+            while last < limit and not ends_statement(self.lines[last]):
+                last += 1
+            lines = [mask_comment(line) for line in self.lines[k:last + 1]]
+            offsets = []
+            offset = 0
+            for line in lines:
+                offsets.append(offset)
+                offset += len(line) + 1
+            tail = self._tail = (k, last, '\n'.join(lines), offsets)
+            self._tail_whole = last < limit or last == len(self.lines) - 1 or ends_statement(self.lines[last])
+        begin = tail[3][k - tail[0]]
+        return tail[2], begin, begin + len(self.lines[k])
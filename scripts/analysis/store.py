@@ -0,0 +1,193 @@
+"""
+Compact, columnar storage for the findings of a whole run.
+
+A list of finding dataclasses costs a few hundred bytes per finding: every
+object has a `__dict__` and its own snippet and message strings, although
+most messages and all rule ids repeat. `FindingStore` keeps one row per
+finding in typed arrays instead:
+
+    line (u32) | rule id (u16) | severity id (u8) | message id (u32)
+
+plus one (file, first row, end row) block per file.
+
+Rule ids, severities and messages are interned. Snippets are not stored at
+all for files read from disk; they are re-read from the source, one file
+at a time, when a report iterates the findings. Rows added without a source
+path (merged shards, in-memory text) keep their snippet in a side table.
+
+Iterating a store yields the analyzer's own finding objects, built on the
+fly by its `make` function, so report code written for lists keeps working.
+"""
+
+from array import array
+from collections import Counter
+from typing import Callable, Dict, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from .reader import SourceBuffer, decode_line
+from .shards import walk_order_key
+
+T = TypeVar('T')
+# (line, rule, severity, message, snippet) -> finding
+MakeFinding = Callable[[int, str, str, str, str], T]
+# finding -> (line, rule, severity, message, snippet)
+Row = Tuple[int, str, str, str, str]
+
+
+class Interner:
+    """Maps repeated strings to small integer ids and back."""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def intern(self, value: str) -> int:
+        found = self._ids.get(value)
+        if found is None:
+            found = self._ids[value] = len(self.values)
+            self.values.append(value)
+        return found
+
+    def __getitem__(self, index: int) -> str:
+        return self.values[index]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __contains__(self, value: str) -> bool:
+        return value in self._ids
+
+
+def read_snippets(path, lines: Iterable[int], width: int) -> Dict[int, str]:
+    """`line.strip()[:width]` for the given 1-based lines of a file."""
+    wanted = set(lines)
+    last = max(wanted, default=0)
+    snippets = {}
+    try:
+        with SourceBuffer.open(path) as buf:
+            for i, raw in enumerate(buf.lines(), 1):
+                if i in wanted:
+                    snippets[i] = decode_line(raw).strip()[:width]
+                if i >= last:
+                    break
+    except OSError:
+        pass  # file removed since the run: snippets come back empty
+    return snippets
+
+
+class FindingStore(Generic[T]):
+    """Columnar findings of many files, in walk order when iterated."""
+
+    def __init__(self, make: MakeFinding, snippet_width: int):
+        self.make = make
+        self.snippet_width = snippet_width
+        self.rules = Interner()
+        self.severities = Interner()
+        self.messages = Interner()
+        self._rels: List[str] = []
+        self._paths: List[Optional[str]] = []
+        self._blocks: List[Tuple[int, int, int]] = []  # (file id, first row, end row)
+        self._line = array('I')
+        self._rule = array('H')
+        self._severity = array('B')
+        self._message = array('I')
+        self._snippets: Dict[int, str] = {}  # row -> snippet, for rows without a source path
+
+    def add_file(self, rel: str, path, rows: Iterable[Row]) -> None:
+        """
+        Append one file's findings. With a `path`, snippets are dropped and
+        re-read from it later; they must be `line.strip()[:snippet_width]`.
+        """
+        file_id = len(self._rels)
+        self._rels.append(rel)
+        self._paths.append(None if path is None else str(path))
+        start = len(self._line)
+        for line, rule, severity, message, snippet in rows:
+            if path is None:
+                self._snippets[len(self._line)] = snippet
+            self._line.append(line)
+            self._rule.append(self.rules.intern(rule))
+            self._severity.append(self.severities.intern(severity))
+            self._message.append(self.messages.intern(message))
+        self._blocks.append((file_id, start, len(self._line)))
+
+    def __len__(self) -> int:
+        return len(self._line)
+
+    def severity_counts(self) -> Counter:
+        """Findings per severity, without building any finding."""
+        counts = Counter()
+        for severity_id, count in Counter(self._severity).items():
+            counts[self.severities[severity_id]] = count
+        return counts
+
+    def _ordered_blocks(self) -> List[Tuple[int, int, int]]:
+        return sorted(self._blocks, key=lambda block: walk_order_key(self._rels[block[0]]))
+
+    def _iter_rows(self, severity: Optional[str] = None) -> Iterator[T]:
+        wanted = None
+        if severity is not None:
+            if severity not in self.severities:
+                return
+            wanted = self.severities.intern(severity)
+        for file_id, start, end in self._ordered_blocks():
+            rows = range(start, end) if wanted is None else \
+                [r for r in range(start, end) if self._severity[r] == wanted]
+            if not rows:
+                continue
+            path = self._paths[file_id]
+            snippets = None
+            if path is not None:
+                snippets = read_snippets(path, (self._line[r] for r in rows), self.snippet_width)
+            for r in rows:
+                line = self._line[r]
+                snippet = self._snippets[r] if snippets is None else snippets.get(line, '')
+                yield self.make(line, self.rules[self._rule[r]], self.severities[self._severity[r]],
+                                self.messages[self._message[r]], snippet)
+
+    def chunks(self, size: int, severities: Optional[Iterable[str]] = None) -> Iterator[List[Tuple[Optional[str], List[Row]]]]:
+        """
+        Rows as plain tuples, in walk order, grouped per file as (source path,
+        rows) and a few files (about `size` rows) per chunk, optionally only of
+        some severities. Rows of files on disk come without their snippet.
+        """
+        wanted = None
+        if severities is not None:
+            wanted = {self.severities.intern(s) for s in severities if s in self.severities}
+        chunk: List[Tuple[Optional[str], List[Row]]] = []
+        count = 0
+        for file_id, start, end in self._ordered_blocks():
+            path = self._paths[file_id]
+            rows = [(self._line[r], self.rules[self._rule[r]], self.severities[self._severity[r]],
+                     self.messages[self._message[r]], self._snippets[r] if path is None else '')
+                    for r in range(start, end) if wanted is None or self._severity[r] in wanted]
+            if not rows:
+                continue
+            chunk.append((path, rows))
+            count += len(rows)
+            if count >= size:
+                yield chunk
+                chunk = []
+                count = 0
+        if chunk:
+            yield chunk
+
+    def __iter__(self) -> Iterator[T]:
+        return self._iter_rows()
+
+    def select(self, severity: str) -> Iterator[T]:
+        """Findings of one severity, in walk order."""
+        return self._iter_rows(severity)
+
+
+def severity_counts(findings) -> Counter:
+    """Findings per severity, for a FindingStore or a plain list."""
+    if isinstance(findings, FindingStore):
+        return findings.severity_counts()
+    return Counter(f.severity for f in findings)
+
+
+def by_severity(findings, severity: str) -> Iterable:
+    """Findings of one severity, for a FindingStore (built lazily) or a plain list."""
+    if isinstance(findings, FindingStore):
+        return findings.select(severity)
+    return [f for f in findings if f.severity == severity]
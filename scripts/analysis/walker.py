@@ -0,0 +1,301 @@
+"""
+Pruning directory walker for Rust sources.
+
+`Path.rglob("*.rs")` descends into `target/` (including build-script
+`OUT_DIR` output), `vendor/` and everything `.gitignore` excludes, and then
+analyzes bindgen/prost output as if it were hand-written. `iter_source_files`
+prunes those directories before entering them, honours nested `.gitignore`
+files, and classifies generated files by sniffing only their first bytes.
+Everything skipped is counted in a `WalkStats` for the report.
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+ALWAYS_PRUNED = {'.git', '.hg', '.svn'}
+BUILD_DIRS = {'target'}
+VENDOR_DIRS = {'vendor', 'third_party'}
+
+SNIFF_BYTES = 512
+GENERATED_MARKERS = (
+    b'@generated',
+    b'automatically generated by rust-bindgen',
+    b'This file is generated',
+    b'This file was generated',
+    b'Code generated by',
+    b'DO NOT EDIT',
+)
+# Files this large are only analyzed if they look hand-written.
+LARGE_FILE_BYTES = 1024 * 1024
+LONG_LINE_CHARS = 1000
+LINE_SAMPLE_BYTES = 16 * 1024
+
+
+@dataclass
+class WalkStats:
+    files: int = 0
+    bytes: int = 0
+    skipped: Dict[str, int] = field(default_factory=dict)        # reason -> files
+    skipped_bytes: Dict[str, int] = field(default_factory=dict)  # reason -> bytes
+    pruned_dirs: Dict[str, int] = field(default_factory=dict)    # reason -> dirs
+
+    def skip(self, reason: str, size: int) -> None:
+        self.skipped[reason] = self.skipped.get(reason, 0) + 1
+        self.skipped_bytes[reason] = self.skipped_bytes.get(reason, 0) + size
+
+    def prune(self, reason: str) -> None:
+        self.pruned_dirs[reason] = self.pruned_dirs.get(reason, 0) + 1
+
+    def report_lines(self) -> List[str]:
+        """Markdown bullet lines summarizing what the walk skipped."""
+        lines = [f"- Files analyzed: {self.files} ({_human(self.bytes)})"]
+        for reason in sorted(self.skipped):
+            lines.append(f"- Skipped ({reason}): {self.skipped[reason]} files, "
+                         f"{_human(self.skipped_bytes[reason])}")
+        for reason in sorted(self.pruned_dirs):
+            lines.append(f"- Directories pruned ({reason}): {self.pruned_dirs[reason]}")
+        return lines
+
+
+def _human(size: int) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class GitIgnore:
+    """The subset of gitignore syntax used in practice: globs, `**`, `!`, `/`."""
+
+    def __init__(self):
+        # (compiled regex, negated, dir_only); later rules win
+        self.rules: List[Tuple[re.Pattern, bool, bool]] = []
+
+    def add_file(self, path: str, base: str) -> None:
+        """Add rules from a .gitignore located in `base` (relative, posix, '' for root)."""
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return
+        for line in lines:
+            self.add_pattern(line, base)
+
+    def add_pattern(self, line: str, base: str = '') -> None:
+        line = line.rstrip()
+        if not line or line.startswith('#'):
+            return
+        negated = line.startswith('!')
+        if negated:
+            line = line[1:]
+        if line.startswith('\\'):
+            line = line[1:]  # escaped leading '#' or '!'
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            return
+
+        anchored = '/' in line
+        line = line.lstrip('/')
+        body = _glob_to_regex(line)
+        prefix = re.escape(base + '/') if base else ''
+        if anchored:
+            regex = f'^{prefix}{body}$'
+        else:
+            regex = f'^{prefix}(?:.*/)?{body}$'
+        self.rules.append((re.compile(regex), negated, dir_only))
+
+    def ignored(self, rel_path: str, is_dir: bool) -> bool:
+        result = False
+        for regex, negated, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                result = not negated
+        return result
+
+
+def _glob_to_regex(glob: str) -> str:
+    out = []
+    i = 0
+    while i < len(glob):
+        if glob.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+        elif glob.startswith('/**', i) and i + 3 == len(glob):
+            out.append('/.*')
+            i += 3
+        elif glob.startswith('**', i):
+            out.append('.*')
+            i += 2
+        elif glob[i] == '*':
+            out.append('[^/]*')
+            i += 1
+        elif glob[i] == '?':
+            out.append('[^/]')
+            i += 1
+        elif glob[i] == '[':
+            end = glob.find(']', i + 1)
+            if end == -1:
+                out.append(re.escape('['))
+                i += 1
+            else:
+                out.append('[' + glob[i + 1:end].replace('!', '^', 1) + ']')
+                i = end + 1
+        else:
+            out.append(re.escape(glob[i]))
+            i += 1
+    return ''.join(out)
+
+
+def classify_generated(path: str, size: int) -> Optional[str]:
+    """
+    Return why a file looks generated, or None if it looks hand-written.
+
+    Only the first `SNIFF_BYTES` are read for the header check; large files
+    additionally get a line-length check on the first `LINE_SAMPLE_BYTES`.
+    """
+    sample_size = LINE_SAMPLE_BYTES if size >= LARGE_FILE_BYTES else SNIFF_BYTES
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(sample_size)
+    except OSError:
+        return 'unreadable'
+
+    if any(marker in head[:SNIFF_BYTES] for marker in GENERATED_MARKERS):
+        return 'generated header'
+    if size >= LARGE_FILE_BYTES:
+        lines = head.split(b'\n')
+        if len(lines) > 1:
+            lines = lines[:-1]  # last one is likely cut off by the sample
+        if max(len(l) for l in lines) >= LONG_LINE_CHARS:
+            return 'generated (long lines)'
+    return None
+
+
+def _pruned_dir(name: str, rel: str, ignore: Optional[GitIgnore],
+                include_build: bool, include_vendor: bool) -> Optional[str]:
+    """Why the walker does not enter directory `rel`, or None."""
+    if name in ALWAYS_PRUNED:
+        return 'vcs'
+    if name in BUILD_DIRS and not include_build:
+        return 'build output'
+    if name in VENDOR_DIRS and not include_vendor:
+        return 'vendored'
+    if ignore is not None and ignore.ignored(rel, True):
+        return 'gitignore'
+    return None
+
+
+def excluded(root, rel_path: str) -> Optional[str]:
+    """
+    Why `iter_source_files(root)` (with its defaults) would not reach the
+    file at `rel_path` by pruning or `.gitignore`, or None. Reads only the
+    `.gitignore` files of the directories on the way, for callers that get
+    single changed paths instead of walking.
+    """
+    parts = rel_path.split('/')
+    directory = os.fspath(root)
+    ignore = GitIgnore()
+    if os.path.isfile(os.path.join(directory, '.gitignore')):
+        ignore = _scoped(ignore, directory, '')
+    for depth, name in enumerate(parts[:-1]):
+        rel_dir = '/'.join(parts[:depth + 1])
+        reason = _pruned_dir(name, rel_dir, ignore, False, False)
+        if reason:
+            return reason
+        directory = os.path.join(directory, name)
+        if os.path.isfile(os.path.join(directory, '.gitignore')):
+            ignore = _scoped(ignore, directory, rel_dir)
+    return 'gitignore' if ignore.ignored(rel_path, False) else None
+
+
+def _scoped(ignore: GitIgnore, directory: str, rel_dir: str) -> GitIgnore:
+    """`ignore` extended with the .gitignore of `directory`; child rules may override the parent's."""
+    scoped = GitIgnore()
+    scoped.rules = list(ignore.rules)
+    scoped.add_file(os.path.join(directory, '.gitignore'), rel_dir)
+    return scoped
+
+
+def iter_source_files(root, extensions: Sequence[str] = ('.rs',),
+                      stats: Optional[WalkStats] = None,
+                      respect_gitignore: bool = True,
+                      include_build: bool = False,
+                      include_vendor: bool = False,
+                      include_generated: bool = False) -> Iterator[Path]:
+    """
+    Yield source files under `root` in a deterministic (sorted) order.
+
+    A file `root` is yielded as-is. Pruned directories are never entered.
+    """
+    root = Path(root)
+    stats = stats if stats is not None else WalkStats()
+    if root.is_file():
+        size = root.stat().st_size
+        stats.files += 1
+        stats.bytes += size
+        yield root
+        return
+
+    ignore = GitIgnore()
+    exts = tuple(extensions)
+    # (absolute dir, relative posix path, gitignore in effect)
+    stack: List[Tuple[str, str, GitIgnore]] = [(os.fspath(root), '', ignore)]
+
+    while stack:
+        directory, rel_dir, ignore = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            stats.prune('unreadable')
+            continue
+
+        if respect_gitignore and any(e.name == '.gitignore' for e in entries):
+            ignore = _scoped(ignore, directory, rel_dir)
+
+        subdirs = []
+        for entry in entries:
+            rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+
+            if is_dir:
+                reason = _pruned_dir(entry.name, rel, ignore if respect_gitignore else None,
+                                     include_build, include_vendor)
+                if reason:
+                    if reason != 'vcs':
+                        stats.prune(reason)
+                    continue
+                subdirs.append((entry.path, rel, ignore))
+                continue
+
+            if not entry.name.endswith(exts):
+                continue
+            try:
+                size = entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+            if respect_gitignore and ignore.ignored(rel, False):
+                stats.skip('gitignore', size)
+                continue
+            if not include_generated:
+                reason = classify_generated(entry.path, size)
+                if reason:
+                    stats.skip(reason, size)
+                    continue
+
+            stats.files += 1
+            stats.bytes += size
+            yield Path(entry.path)
+
+        # Reverse so the stack pops directories in sorted order.
+        stack.extend(reversed(subdirs))
@@ -0,0 +1,301 @@
+"""
+Filesystem watching for the analyzers' `--watch` mode.
+
+On Linux the crate is watched with inotify (through ctypes, no extra
+dependency); elsewhere, or if inotify is unavailable or out of watches,
+an mtime/size snapshot is polled instead. Bursts of events (editors write a
+temp file, rename it, touch metadata) are debounced into one batch of
+changed paths. Directories the walker always prunes (`target/`, `vendor/`,
+VCS metadata) are never watched, and `LiveResults.update` drops changed
+files the walker would not reach (`walker.excluded`, which includes
+`.gitignore`), so live results stay those of a fresh scan.
+"""
+
+import os
+from collections import Counter
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Callable, Dict, Generic, Iterable, List, Optional, Set, Tuple, TypeVar
+
+from .shards import walk_order_key
+from .walker import ALWAYS_PRUNED, BUILD_DIRS, VENDOR_DIRS, classify_generated, excluded, iter_source_files
+
+WATCHED_SUFFIXES = ('.rs', 'Cargo.toml')
+DEFAULT_DEBOUNCE = 0.025
+POLL_INTERVAL = 0.5
+
+_PRUNED = ALWAYS_PRUNED | BUILD_DIRS | VENDOR_DIRS
+
+# <sys/inotify.h>
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+               | IN_DELETE_SELF)
+_EVENT = struct.Struct('iIII')
+
+
+def _watched_dirs(root: str) -> Iterable[str]:
+    for directory, dirnames, _files in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in _PRUNED]
+        yield directory
+
+
+class PollingWatcher:
+    """Portable fallback: compare (mtime, size) snapshots every `interval` seconds."""
+
+    kind = 'polling'
+
+    def __init__(self, root: str, suffixes=WATCHED_SUFFIXES, interval: float = POLL_INTERVAL):
+        self.root = root
+        self.suffixes = tuple(suffixes)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for directory in _watched_dirs(self.root):
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.name.endswith(self.suffixes):
+                            try:
+                                st = entry.stat(follow_symlinks=False)
+                            except OSError:
+                                continue
+                            snapshot[entry.path] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                continue
+        return snapshot
+
+    def read(self, timeout: Optional[float]) -> Set[str]:
+        """Changed paths, waiting up to `timeout` seconds (None: until something changes)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self._scan()
+            changed = {p for p in current.keys() | self._snapshot.keys()
+                       if current.get(p) != self._snapshot.get(p)}
+            self._snapshot = current
+            if changed:
+                return changed
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return set()
+                time.sleep(min(self.interval, remaining))
+            else:
+                time.sleep(self.interval)
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Recursive inotify watch on every non-pruned directory under `root`."""
+
+    kind = 'inotify'
+
+    def __init__(self, root: str, suffixes=WATCHED_SUFFIXES):
+        import ctypes.util  # only needed once a watch starts
+        libc_name = ctypes.util.find_library('c')
+        if libc_name is None:
+            raise OSError("libc not found")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.root = root
+        self.suffixes = tuple(suffixes)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, str] = {}
+        try:
+            for directory in _watched_dirs(root):
+                self._add(directory)
+        except OSError:
+            self.close()
+            raise
+
+    def _add(self, directory: str) -> None:
+        import ctypes
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch({directory}) failed")
+        self._dirs[wd] = directory
+
+    def read(self, timeout: Optional[float]) -> Set[str]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed: Set[str] = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                self._handle(wd, mask, name, changed)
+        return changed
+
+    def _handle(self, wd: int, mask: int, name: str, changed: Set[str]) -> None:
+        if mask & IN_Q_OVERFLOW:
+            # Events were dropped: report every watched file as changed.
+            for directory in list(self._dirs.values()):
+                changed.update(os.path.join(directory, f) for f in _listdir(directory)
+                               if f.endswith(self.suffixes))
+            return
+        if mask & (IN_IGNORED | IN_DELETE_SELF):
+            self._dirs.pop(wd, None)
+            return
+        directory = self._dirs.get(wd)
+        if directory is None or not name:
+            return
+        path = os.path.join(directory, name)
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO) and name not in _PRUNED:
+                # New subtree: watch it and treat its files as created.
+                for sub in _watched_dirs(path):
+                    try:
+                        self._add(sub)
+                    except OSError:
+                        continue
+                    changed.update(os.path.join(sub, f) for f in _listdir(sub) if f.endswith(self.suffixes))
+            return
+        if name.endswith(self.suffixes):
+            changed.add(path)
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def _listdir(directory: str) -> List[str]:
+    try:
+        return os.listdir(directory)
+    except OSError:
+        return []
+
+
+def open_watcher(root, suffixes=WATCHED_SUFFIXES, polling: bool = False):
+    """inotify where available, otherwise (or if `polling`) a PollingWatcher."""
+    root = os.fspath(root)
+    if not polling and hasattr(select, 'select') and os.name == 'posix':
+        try:
+            return InotifyWatcher(root, suffixes)
+        except (OSError, AttributeError):
+            pass  # no inotify (macOS, BSD) or fs.inotify.max_user_watches exhausted
+    return PollingWatcher(root, suffixes)
+
+
+def watch(root, on_change: Callable[[Set[str]], None], suffixes=WATCHED_SUFFIXES,
+          debounce: float = DEFAULT_DEBOUNCE, polling: bool = False,
+          on_start: Optional[Callable[[str], None]] = None) -> None:
+    """
+    Call `on_change(paths)` for every debounced batch of changed files
+    until interrupted. A batch closes once no event arrived for `debounce`
+    seconds.
+    """
+    watcher = open_watcher(root, suffixes, polling)
+    if on_start is not None:
+        on_start(watcher.kind)
+    try:
+        while True:
+            batch = watcher.read(None)
+            while True:
+                more = watcher.read(debounce)
+                if not more:
+                    break
+                batch |= more
+            on_change(batch)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+T = TypeVar('T')
+
+
+class LiveResults(Generic[T]):
+    """
+    Per-file findings kept in memory across a watch session. `update`
+    re-analyzes only the changed files and returns what changed.
+    """
+
+    def __init__(self, root, analyze: Callable[[Path], List[T]], suffix: str = '.rs'):
+        self.root = Path(root)
+        self.analyze = analyze
+        self.suffix = suffix
+        self.results: Dict[str, List[T]] = {}
+
+    def _rel(self, path: Path) -> str:
+        return path.relative_to(self.root).as_posix()
+
+    def scan(self) -> None:
+        for path in iter_source_files(self.root, extensions=(self.suffix,)):
+            self.results[self._rel(path)] = self.analyze(path)
+
+    def update(self, paths: Iterable[str]) -> List[Tuple[str, Optional[List[T]], Optional[List[T]]]]:
+        """Re-analyze changed files; returns (path, old findings, new findings), None if absent."""
+        changes = []
+        for raw in sorted(paths):
+            path = Path(raw)
+            if not raw.endswith(self.suffix):
+                continue
+            rel = self._rel(path)
+            old = self.results.get(rel)
+            try:
+                size = path.stat().st_size
+            except OSError:
+                size = None
+            # The walker's rules (pruned dirs, .gitignore), so live totals match a fresh scan.
+            if size is None or excluded(self.root, rel) or classify_generated(raw, size):
+                new = None
+                self.results.pop(rel, None)
+            else:
+                new = self.analyze(path)
+                self.results[rel] = new
+            if old is not None or new is not None:
+                changes.append((rel, old, new))
+        return changes
+
+    def findings(self) -> List[T]:
+        """All findings, in walk order of their files."""
+        return [f for rel in sorted(self.results, key=walk_order_key) for f in self.results[rel]]
+
+
+def diff_findings(old: Optional[List[T]], new: Optional[List[T]],
+                  key: Callable[[T], tuple]) -> Tuple[List[T], List[T]]:
+    """(added, removed) between two versions of a file, ignoring line moves via `key`."""
+    old = old or []
+    new = new or []
+    old_keys = Counter(key(f) for f in old)
+    new_keys = Counter(key(f) for f in new)
+    added, removed = [], []
+    for f in new:
+        k = key(f)
+        if old_keys[k] > 0:
+            old_keys[k] -= 1
+        else:
+            added.append(f)
+    for f in old:
+        k = key(f)
+        if new_keys[k] > 0:
+            new_keys[k] -= 1
+        else:
+            removed.append(f)
+    return added, removed
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Analysis Server
+Serves the Rust analyzers over local HTTP/JSON for IDE plugins, next to
+scripts/content-server.js.
+
+    analysis_server.py [--port 3334] [-j 4] [--max-queue 64]
+    analysis_server.py loadtest [--url http://127.0.0.1:3334] [-c 32] [-n 2000] [--files DIR]
+
+Endpoints:
+
+    GET  /api/health      -> {"success": true, "inflight": 0, "queued": 0, ...}
+    GET  /api/analyzers   -> {"success": true, "data": ["error-handling", ...]}
+    POST /api/analyze     <- {"name": "src/lib.rs", "source": "...", "analyzers": [...]}
+                          -> {"success": true, "name": ..., "results": {...}, "errors": {...}}
+
+Analysis is CPU-bound and runs in a process pool of `-j` workers, which
+load and compile every analyzer once. At most `-j` analyses are dispatched
+at a time (a semaphore); up to `--max-queue` more wait for a slot, and
+beyond that the server answers 429 with Retry-After instead of queueing
+without bound. Concurrent requests for the same content and analyzers share
+one analysis (keyed by a hash of the source), so an IDE re-sending a file
+while the first analysis runs costs nothing extra.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields, is_dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from analysis.batch import ANALYZERS, analyze_source, preload  # noqa: E402
+
+DEFAULT_PORT = 3334
+MAX_BODY = 8 * 1024 * 1024
+MAX_HEADER = 64 * 1024
+REASONS = {200: 'OK', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 429: 'Too Many Requests', 500: 'Internal Server Error'}
+
+
+def to_json(value):
+    """Analyzer results (dataclasses, enums, sets) as JSON-ready values."""
+    if is_dataclass(value):
+        return {f.name: to_json(getattr(value, f.name)) for f in fields(value)}
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, dict):
+        return {str(k): to_json(v) for k, v in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return sorted(to_json(v) for v in value)
+    if isinstance(value, (list, tuple)):
+        return [to_json(v) for v in value]
+    return value
+
+
+def analyze_to_json(source: str, analyzers: Tuple[str, ...]) -> bytes:
+    """
+    Worker side: analyze and encode `{"results": ..., "errors": ...}`, so the
+    event loop only splices in the request's name.
+    """
+    result = analyze_source('', source, analyzers)
+    return json.dumps({'results': to_json(result.results), 'errors': result.errors}).encode('utf-8')
+
+
+def _with_name(payload: bytes, name: str) -> bytes:
+    return b'{"success": true, "name": ' + json.dumps(name).encode('utf-8') + b', ' + payload[1:]
+
+
+class Overloaded(Exception):
+    """Raised when the wait queue is full; answered with 429."""
+
+
+class AnalysisService:
+    """Process pool dispatch with a concurrency semaphore, a bounded queue and coalescing."""
+
+    def __init__(self, jobs: int, max_queue: int):
+        self.jobs = jobs
+        self.max_queue = max_queue
+        self.executor = ProcessPoolExecutor(max_workers=jobs, initializer=preload, initargs=(tuple(ANALYZERS),))
+        self.slots = asyncio.Semaphore(jobs)
+        self.inflight: Dict[Tuple[str, Tuple[str, ...]], asyncio.Future] = {}
+        self.running = 0
+        self.queued = 0
+        self.stats = {'analyzed': 0, 'coalesced': 0, 'rejected': 0}
+
+    async def analyze(self, name: str, source: str, analyzers: Tuple[str, ...]) -> bytes:
+        # JSON may carry lone surrogates ("\ud800"); surrogatepass hashes them instead of raising.
+        digest = hashlib.blake2b(source.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+        key = (digest, analyzers)
+        pending = self.inflight.get(key)
+        if pending is not None:
+            self.stats['coalesced'] += 1
+            return _with_name(await asyncio.shield(pending), name)
+        if self.queued >= self.max_queue and self.slots.locked():
+            self.stats['rejected'] += 1
+            raise Overloaded()
+
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            self.queued += 1
+            try:
+                await self.slots.acquire()
+            finally:
+                self.queued -= 1
+            self.running += 1
+            try:
+                payload = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, analyze_to_json, source, analyzers)
+            finally:
+                self.running -= 1
+                self.slots.release()
+            self.stats['analyzed'] += 1
+            future.set_result(payload)
+            return _with_name(payload, name)
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            elif not future.done():
+                future.set_exception(e)
+                future.exception()  # mark retrieved: there may be no coalesced waiter
+            raise
+        finally:
+            del self.inflight[key]
+
+    def health(self) -> dict:
+        return {'success': True, 'jobs': self.jobs, 'inflight': self.running, 'queued': self.queued,
+                'maxQueue': self.max_queue, **self.stats}
+
+    def close(self) -> None:
+        self.executor.shutdown(cancel_futures=True)
+
+
+def _response(status: int, body: bytes, keep_alive: bool, extra: str = '') -> bytes:
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            "Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n{extra}\r\n")
+    return head.encode('latin-1') + body
+
+
+def _error(status: int, message: str, keep_alive: bool, extra: str = '') -> bytes:
+    return _response(status, json.dumps({'error': message}).encode('utf-8'), keep_alive, extra)
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    """(method, path, headers, body), or None at EOF. Raises ValueError on malformed input."""
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None
+        raise ValueError("truncated request") from None
+    except asyncio.LimitOverrunError:
+        raise ValueError("request header too large") from None
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, target, _version = lines[0].split(' ', 2)
+    except ValueError:
+        raise ValueError("malformed request line") from None
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            key, value = line.split(':', 1)
+            headers[key.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', '0') or 0)
+    if length > MAX_BODY:
+        raise OverflowError()
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), target.split('?', 1)[0], headers, body
+
+
+async def handle(service: AnalysisService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except OverflowError:
+                writer.write(_error(413, f"Body larger than {MAX_BODY} bytes", False))
+                break
+            except (ValueError, asyncio.IncompleteReadError) as e:
+                writer.write(_error(400, str(e) or "Bad request", False))
+                break
+            if request is None:
+                break
+            method, path, headers, body = request
+            keep_alive = headers.get('connection', '').lower() != 'close'
+            writer.write(await route(service, method, path, body, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+async def route(service: AnalysisService, method: str, path: str, body: bytes, keep_alive: bool) -> bytes:
+    if method == 'OPTIONS':
+        return _response(204, b'', keep_alive)
+    if path == '/api/health':
+        return _response(200, json.dumps(service.health()).encode('utf-8'), keep_alive)
+    if path == '/api/analyzers':
+        return _response(200, json.dumps({'success': True, 'data': list(ANALYZERS)}).encode('utf-8'), keep_alive)
+    if path != '/api/analyze':
+        return _error(404, "Not found", keep_alive)
+    if method != 'POST':
+        return _error(405, "POST required", keep_alive)
+
+    try:
+        request = json.loads(body)
+        source = request['source']
+        name = str(request.get('name', '<memory>'))
+        analyzers = request.get('analyzers') or list(ANALYZERS)
+    except (ValueError, KeyError, TypeError):
+        return _error(400, "Expected JSON {\"source\": ..., \"name\"?: ..., \"analyzers\"?: [...]}", keep_alive)
+    if not isinstance(source, str):
+        return _error(400, "'source' must be a string", keep_alive)
+    if not isinstance(analyzers, (list, tuple)) or not all(isinstance(a, str) for a in analyzers):
+        return _error(400, "'analyzers' must be a list of analyzer names", keep_alive)
+    analyzers = tuple(analyzers)
+    unknown = [a for a in analyzers if a not in ANALYZERS]
+    if unknown:
+        return _error(400, f"Unknown analyzer(s): {', '.join(map(str, unknown))}", keep_alive)
+
+    try:
+        return _response(200, await service.analyze(name, source, analyzers), keep_alive)
+    except Overloaded:
+        return _error(429, "Analysis queue is full, retry later", keep_alive, "Retry-After: 1\r\n")
+    except Exception as e:  # a dead worker process must not take the server down
+        return _error(500, f"{type(e).__name__}: {e}", keep_alive)
+
+
+async def serve(host: str, port: int, jobs: int, max_queue: int) -> None:
+    service = AnalysisService(jobs, max_queue)
+    server = await asyncio.start_server(lambda r, w: handle(service, r, w), host, port, limit=MAX_HEADER)
+    print(f"Analysis Server running on {host}:{port} ({jobs} workers, queue {max_queue})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+# ---------------------------------------------------------------------------
+# Load test
+
+
+async def _client(host: str, port: int, payloads: List[bytes], counter: List[int], total: int,
+                  latencies: List[float], statuses: Dict[int, int]) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while counter[0] < total:
+            payload = payloads[counter[0] % len(payloads)]
+            counter[0] += 1
+            started = time.perf_counter()
+            writer.write(b"POST /api/analyze HTTP/1.1\r\nHost: x\r\nContent-Type: application/json\r\n"
+                         + f"Content-Length: {len(payload)}\r\n\r\n".encode('latin-1') + payload)
+            await writer.drain()
+            head = await reader.readuntil(b'\r\n\r\n')
+            status = int(head.split(b' ', 2)[1])
+            length = int(head.lower().split(b'content-length:', 1)[1].split(b'\r\n', 1)[0])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def loadtest(url: str, concurrency: int, total: int, files: List[Path], unique: bool) -> int:
+    """Run the load test and print its summary; returns the number of successful (200) responses."""
+    host, _, port = url.split('://', 1)[-1].rstrip('/').partition(':')
+    sources = [(str(p), p.read_text(errors='replace')) for p in files]
+    if unique:
+        # Distinct content per request defeats coalescing: worst case for the pool.
+        payloads = [json.dumps({'name': n, 'source': f"{s}\n// {i}"}).encode('utf-8')
+                    for i, (n, s) in enumerate(sources * max(1, -(-total // len(sources))))][:total]
+    else:
+        payloads = [json.dumps({'name': n, 'source': s}).encode('utf-8') for n, s in sources]
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    counter = [0]
+    started = time.perf_counter()
+    await asyncio.gather(*(_client(host, int(port or DEFAULT_PORT), payloads, counter, total, latencies, statuses)
+                           for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    ok = statuses.get(200, 0)
+    print(f"{total} requests, concurrency {concurrency}, {len(sources)} distinct file(s)"
+          f"{' (unique content per request)' if unique else ''}")
+    print(f"  {total / elapsed:.0f} req/s total, {ok / elapsed:.0f} successful req/s, in {elapsed:.2f}s")
+    print(f"  status: {', '.join(f'{k}={v}' for k, v in sorted(statuses.items()))}")
+    print(f"  latency ms: p50 {_percentile(latencies, 0.50) * 1000:.1f}  p95 {_percentile(latencies, 0.95) * 1000:.1f}"
+          f"  p99 {_percentile(latencies, 0.99) * 1000:.1f}  max {max(latencies, default=0) * 1000:.1f}")
+    return ok
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'loadtest':
+        parser = argparse.ArgumentParser(prog="analysis_server.py loadtest")
+        parser.add_argument("--url", default=f"http://127.0.0.1:{DEFAULT_PORT}")
+        parser.add_argument("-c", "--concurrency", type=int, default=32)
+        parser.add_argument("-n", "--requests", type=int, default=2000)
+        parser.add_argument("--files", type=Path, default=Path(__file__).resolve().parent.parent / 'skills',
+                            help="Directory of .rs files to send (default: the skills' example sources)")
+        parser.add_argument("--unique", action="store_true",
+                            help="Make every request's content distinct (no coalescing)")
+        args = parser.parse_args(sys.argv[2:])
+        files = sorted(args.files.rglob('*.rs')) if args.files.is_dir() else [args.files]
+        if not files:
+            print(f"Error: no .rs files under {args.files}")
+            sys.exit(1)
+        if not asyncio.run(loadtest(args.url, args.concurrency, args.requests, files, args.unique)):
+            print("Error: no request succeeded; the numbers above do not measure analysis")
+            sys.exit(1)
+        return
+
+    parser = argparse.ArgumentParser(prog="analysis_server.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.environ.get('ANALYSIS_PORT', DEFAULT_PORT)))
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="Analysis worker processes")
+    parser.add_argument("--max-queue", type=int, default=64,
+                        help="Analyses allowed to wait for a worker before answering 429")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, max(1, args.jobs), max(0, args.max_queue)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
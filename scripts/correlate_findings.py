@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Correlated Findings
+Runs several analyzers over a file or directory and reports one compound
+finding per line, merging what the analyzers found there (see
+analysis.correlate), so a review bot posts one comment per location.
+
+    correlate_findings.py <path> [--analyzers error-handling,async-programming]
+                          [--min-analyzers 2] [--format markdown|jsonl] [-j N]
+
+`--format jsonl` writes one compound finding per line:
+{"file", "line", "severity", "findings": [{"analyzer", "rule", "severity", "message"}]}.
+"""
+
+import argparse
+import json
+import sys
+from itertools import islice
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from analysis.batch import ANALYZERS, BatchAnalyzer  # noqa: E402
+from analysis.correlate import correlate_results  # noqa: E402
+from analysis.reader import read_source_text  # noqa: E402
+from analysis.shards import select_shard  # noqa: E402
+from analysis.walker import iter_source_files  # noqa: E402
+
+CHUNK = 256  # files analyzed per batch; bounds the sources held in memory
+
+ICONS = {"error": "🔴", "warning": "🟡", "info": "🟢"}
+
+
+def iter_sources(path: Path):
+    for source, rel in select_shard(iter_source_files(path), path, None):
+        try:
+            yield rel, read_source_text(source)
+        except OSError as e:
+            print(f"Warning: skipping {rel}: {e}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="correlate_findings.py")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--analyzers", default=",".join(ANALYZERS),
+                        help=f"Comma-separated analyzers (default: {','.join(ANALYZERS)})")
+    parser.add_argument("--min-analyzers", type=int, default=1, metavar="N",
+                        help="Only report lines flagged by at least N analyzers")
+    parser.add_argument("--format", choices=("markdown", "jsonl"), default="markdown")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Worker processes")
+    args = parser.parse_args()
+
+    if not args.path.exists():
+        print(f"Error: {args.path} not found")
+        sys.exit(1)
+    analyzers = [a for a in args.analyzers.split(",") if a]
+    unknown = [a for a in analyzers if a not in ANALYZERS]
+    if unknown or not analyzers:
+        print(f"Error: unknown analyzer(s) {', '.join(unknown) or '(none given)'} "
+              f"(choose from {', '.join(ANALYZERS)})")
+        sys.exit(1)
+
+    title = args.path.name if args.path.is_file() else str(args.path)
+    report = [f"# Correlated Findings: {title}\n"]
+    body = []
+    files = locations = findings = merged = 0
+    failures = []
+    sources = iter_sources(args.path)
+    with BatchAnalyzer(analyzers, jobs=args.jobs) as batch:
+        while True:
+            chunk = list(islice(sources, CHUNK))
+            if not chunk:
+                break
+            results = batch.analyze_many(chunk)
+            files += len(results)
+            failures.extend((r.name, a, e) for r in results for a, e in r.errors.items())
+            for compound in correlate_results(results):
+                findings += len(compound.findings)
+                if len(compound.analyzers) < args.min_analyzers:
+                    continue
+                locations += 1
+                merged += len(compound.findings) > 1
+                if args.format == "jsonl":
+                    print(json.dumps(compound.to_dict()))
+                    continue
+                body.append(f"### {ICONS.get(compound.severity, '⚪')} {compound.file}:{compound.line} "
+                            f"({', '.join(compound.analyzers)})\n")
+                body.extend(f"- **{f.analyzer}** `{f.rule}` ({f.severity}): {f.message}"
+                            for f in compound.findings)
+                body.append("")
+
+    for name, analyzer, error in failures:
+        print(f"Warning: {analyzer} failed on {name}: {error}", file=sys.stderr)
+    if args.format == "jsonl":
+        return
+
+    report.append("## Summary\n")
+    report.append(f"- Files: {files}")
+    report.append(f"- Findings: {findings}")
+    report.append(f"- Locations reported: {locations} ({merged} merging several findings)")
+    report.append("")
+    if body:
+        report.append("## Findings\n")
+        report.extend(body)
+    print('\n'.join(report))
+
+
+if __name__ == "__main__":
+    main()
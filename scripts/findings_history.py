@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Findings History
+Queries the SQLite store written by `error_analyzer.py --record` and
+`async_analyzer.py --record`.
+
+    findings_history.py history.db series
+    findings_history.py history.db runs [--analyzer A] [--root R]
+    findings_history.py history.db trend [--rule unwrap,panic] [--crate NAME]
+    findings_history.py history.db top [--by file|crate|rule] [--commit SHA] [-n 20]
+    findings_history.py history.db new-since BASE_SHA [--commit SHA]
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from analysis.history import FindingsHistory, HistoryError  # noqa: E402
+
+
+def _series(db: FindingsHistory, args) -> int:
+    series = db.list_series()
+    if args.analyzer:
+        series = [s for s in series if s[1] == args.analyzer]
+    if args.root:
+        series = [s for s in series if s[2] == args.root]
+    if len(series) != 1:
+        choices = ', '.join(f"{a} on {r}" for _, a, r in db.list_series()) or 'none recorded'
+        raise HistoryError(f"select one series with --analyzer/--root ({choices})")
+    return series[0][0]
+
+
+def _rules(args):
+    return [r for r in args.rule.split(',') if r] if args.rule else None
+
+
+def _when(ts: float) -> str:
+    return datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M')
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="findings_history.py")
+    parser.add_argument("db", type=Path)
+    parser.add_argument("--analyzer", help="Series analyzer (error-handling, async-programming)")
+    parser.add_argument("--root", help="Series root as passed to the analyzer")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("series", help="List recorded analyzer/root series")
+    sub.add_parser("runs", help="List recorded commits")
+
+    trend = sub.add_parser("trend", help="Finding counts per recorded commit")
+    trend.add_argument("--rule", help="Comma-separated rule ids")
+    trend.add_argument("--crate")
+
+    top = sub.add_parser("top", help="Top offenders at one commit")
+    top.add_argument("--by", choices=("file", "crate", "rule"), default="file")
+    top.add_argument("--rule", help="Comma-separated rule ids")
+    top.add_argument("--commit", help="Commit (default: latest run)")
+    top.add_argument("-n", type=int, default=20)
+
+    new = sub.add_parser("new-since", help="Findings introduced after a commit")
+    new.add_argument("base")
+    new.add_argument("--rule", help="Comma-separated rule ids")
+    new.add_argument("--commit", help="Commit (default: latest run)")
+
+    args = parser.parse_args()
+    if not args.db.exists():
+        print(f"Error: {args.db} not found")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    try:
+        with FindingsHistory(args.db) as db:
+            if args.command == "series":
+                for _, analyzer, root in db.list_series():
+                    print(f"{analyzer}\t{root}")
+                return
+
+            series = _series(db, args)
+            if args.command == "runs":
+                print("| Commit | Recorded | Files | Re-analyzed |")
+                print("|--------|----------|-------|-------------|")
+                for _, commit, ts, files, reused in db.runs(series):
+                    print(f"| {commit[:12]} | {_when(ts)} | {files} | {files - reused} |")
+            elif args.command == "trend":
+                print("| Commit | Recorded | Findings | Δ |")
+                print("|--------|----------|----------|---|")
+                previous = None
+                for commit, ts, count in db.trend(series, _rules(args), args.crate):
+                    delta = '' if previous is None else f"{count - previous:+d}"
+                    print(f"| {commit[:12]} | {_when(ts)} | {count} | {delta} |")
+                    previous = count
+            elif args.command == "top":
+                run = db.run_for(series, args.commit)
+                print(f"| {args.by.capitalize()} | Findings |")
+                print("|------|----------|")
+                for key, count in db.top(series, run, args.by, _rules(args), args.n):
+                    print(f"| {key} | {count} |")
+            elif args.command == "new-since":
+                base = db.run_for(series, args.base)
+                run = db.run_for(series, args.commit)
+                rows = db.new_since(series, base, run, _rules(args))
+                for path, line, rule, severity in rows:
+                    print(f"{path}:{line}: {severity}: {rule}")
+                print(f"{len(rows)} new finding(s) since {args.base}")
+    except HistoryError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(f"\n_query took {(time.perf_counter() - started) * 1000:.1f} ms_", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
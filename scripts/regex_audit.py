@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Regex Audit
+Benchmarks every analyzer regex, and each analyzer's text entry point,
+against adversarial single-line inputs and fails if any of them is
+superlinear or slower than a per-byte limit.
+
+Patterns are collected automatically: module-level `re.Pattern` objects
+(also inside lists/tuples such as `BLOCKING_CALLS`) of every
+skills/*/scripts analyzer, plus the regexes and prefilters of every rule
+pack. Each is run with `finditer` over inputs built by repeating "pump"
+strings (`<`, `a`, `for `, `#[derive(`, ...) behind prefixes taken from the
+pattern's own literals, at two sizes. Linear matching grows ~4x between
+the sizes; quadratic backtracking grows ~16x.
+
+Every pair is first screened with quick best-of-2 timings. A pair that
+fails the screen is measured again with each call looped for at least
+CONFIRM_TIMED and the median of CONFIRM_REPEAT samples, and fails the
+audit only if it still fails then, so one noisy timing does not fail a CI run.
+
+    regex_audit.py [--max-ns-per-byte 1000] [--size 4096] [-v]
+
+Exit status 1 lists the offending pattern/input pairs.
+"""
+
+import argparse
+import gc
+import importlib.util
+import re
+import statistics
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Iterator, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from analysis.budget import FileTimeout, call_with_timeout  # noqa: E402
+
+REPO = Path(__file__).resolve().parent.parent
+
+PUMPS = ['a', ' ', '<', '>', '<a', 'a>', '<a>', 'a ', 'a,', ':', '::', 'a::', '(', ')', '()',
+         '"', '\\', '&', '.', 'a.', '=', ';', '{', '}', '#', '/', '*', "'", 'x: ', 'mut ']
+GROWTH_LIMIT = 8.0        # 4x the input; linear ~4, quadratic ~16
+MIN_TIMED = 0.002         # ratios of faster runs are noise
+CONFIRM_TIMED = 0.05      # each confirming sample loops the call for at least this long
+CONFIRM_REPEAT = 5
+CALL_TIMEOUT = 2.0
+
+
+def load_analyzers() -> List[Tuple[str, object]]:
+    modules = []
+    for path in sorted(REPO.glob('skills/*/scripts/*.py')):
+        if path.name == 'validate.py':
+            continue
+        spec = importlib.util.spec_from_file_location(f"audit_{path.stem}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        modules.append((path.stem, module))
+    return modules
+
+
+def collect_patterns(modules) -> Iterator[Tuple[str, re.Pattern]]:
+    for name, module in modules:
+        for attr, value in sorted(vars(module).items()):
+            if isinstance(value, re.Pattern):
+                yield f"{name}.{attr}", value
+            elif isinstance(value, (list, tuple)):
+                for i, item in enumerate(value):
+                    for part in (item if isinstance(item, tuple) else (item,)):
+                        if isinstance(part, re.Pattern):
+                            yield f"{name}.{attr}[{i}]", part
+        get_pack = getattr(module, 'get_rule_pack', None)
+        if get_pack is not None:
+            pack = get_pack()
+            for rule in pack.rules:
+                if rule.regex is not None:
+                    yield f"{pack.name}:{rule.id}", rule.regex
+            if pack.prefilter is not None:
+                yield f"{pack.name}:prefilter", pack.prefilter.pattern
+                yield f"{pack.name}:prefilter-overlapping", pack.prefilter._overlapping
+
+
+def pattern_literals(pattern: re.Pattern) -> List[str]:
+    """Literal words/punctuation of a pattern's source, used as input prefixes."""
+    source = pattern.pattern if isinstance(pattern.pattern, str) else pattern.pattern.decode('latin-1')
+    source = re.sub(r'\\[sSwWdDbB]|\[[^\]]*\]|[?*+]|\{\d*,?\d*\}|\(\?[:=!<]*', ' ', source)
+    source = re.sub(r'\\(.)', r'\1', source)
+    return sorted({tok for tok in re.split(r'[\s()|^$]+', source) if tok})
+
+
+def adversarial_cases(pattern: re.Pattern) -> List[Tuple[str, str]]:
+    """(prefix, pump) pairs; the input is `prefix + pump * n`."""
+    literals = pattern_literals(pattern)
+    pumps = PUMPS + literals + [lit + ' ' for lit in literals]
+    return [(prefix, pump) for prefix in [''] + [lit + ' ' for lit in literals] for pump in pumps]
+
+
+def timed(fn: Callable[[], object], confirm: bool = False) -> float:
+    gc.disable()  # as timeit does; collections triggered by match objects are noise
+    try:
+        return _median_of(fn, CONFIRM_REPEAT) if confirm else _best_of(fn, 2)
+    finally:
+        gc.enable()
+
+
+def _best_of(fn: Callable[[], object], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        try:
+            call_with_timeout(lambda _: fn(), None, CALL_TIMEOUT)
+        except FileTimeout:
+            return float('inf')
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _median_of(fn: Callable[[], object], repeat: int) -> float:
+    """Median time per call, each sample looping the call for at least CONFIRM_TIMED."""
+    once = _best_of(fn, 1)
+    if once == float('inf'):
+        return once
+    loops = max(1, int(CONFIRM_TIMED / once) + 1) if once > 0 else 1000
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - started) / loops)
+    return statistics.median(samples)
+
+
+def measure(run: Callable[[str], object], make: Callable[[int], str], size: int,
+            confirm: bool = False) -> Tuple[float, float]:
+    """(ns per byte at 4*size, growth ratio from size to 4*size)."""
+    small, large = make(size), make(size * 4)
+    t_small = timed(lambda: run(small), confirm)
+    t_large = timed(lambda: run(large), confirm) if t_small != float('inf') else float('inf')
+    ns_per_byte = t_large / len(large) * 1e9
+    if t_large == float('inf'):
+        return float('inf'), float('inf')  # timed out: fails both the per-byte and the growth check
+    ratio = t_large / t_small if t_small > 0 and (confirm or t_large >= MIN_TIMED) else 1.0
+    return ns_per_byte, ratio
+
+
+def confirmed_measure(run: Callable[[str], object], make: Callable[[int], str], size: int,
+                      failed: Callable[[float, float], bool]) -> Tuple[float, float]:
+    """`measure`, repeated with confirming timings when the quick screen `failed`."""
+    ns, ratio = measure(run, make, size)
+    if failed(ns, ratio):
+        ns, ratio = measure(run, make, size, confirm=True)
+    return ns, ratio
+
+
+def entry_points(modules) -> List[Tuple[str, Callable[[str], object]]]:
+    """Whole-file analyzer entry points, run on the same adversarial text."""
+    by_name = dict(modules)
+    points = []
+    if 'error_analyzer' in by_name:
+        points.append(('error_analyzer.analyze_rust_file', by_name['error_analyzer'].analyze_rust_file))
+    if 'async_analyzer' in by_name:
+        points.append(('async_analyzer.analyze_async_rust', by_name['async_analyzer'].analyze_async_rust))
+    if 'ownership_checker' in by_name:
+        points.append(('ownership_checker.run_rule_pack', by_name['ownership_checker'].run_rule_pack))
+    if 'alloc_analyzer' in by_name:
+        points.append(('alloc_analyzer.analyze_source', by_name['alloc_analyzer'].analyze_source))
+    if 'trait_checker' in by_name:
+        points.append(('trait_checker.generate_report', lambda text: by_name['trait_checker'].generate_report(text, 'x.rs')))
+    if 'blocking_analyzer' in by_name:
+        points.append(('blocking_analyzer.summarize_file', lambda text: by_name['blocking_analyzer'].summarize_file(text, 'x.rs')))
+    from analysis.baseline import ItemIndex
+    points.append(('baseline.ItemIndex.from_text', ItemIndex.from_text))
+    return points
+
+
+ENTRY_PUMPS = ['a', ' ', '<', '<a>', '#[derive(', '#[derive(A)]\n', 'impl<', 'impl<a> ', 'for ', 'let ',
+               'let mut a: ', 'let a = m', '.lock()', 'a.into()', 'a::', 'fn a(', '"', '{', '{\n', '}\n',
+               'struct A;\n', 'async fn a() {\n', '.await\n', 'loop {\n']
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="regex_audit.py")
+    parser.add_argument("--max-ns-per-byte", type=float, default=1000.0,
+                        help="Fail if any pattern/input exceeds this time per input byte")
+    parser.add_argument("--size", type=int, default=4096, help="Small input size in bytes (large is 4x)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print every measurement")
+    args = parser.parse_args()
+
+    modules = load_analyzers()
+    failures = []
+    worst: List[Tuple[float, str, str]] = []
+
+    patterns = list(collect_patterns(modules))
+    for label, pattern in patterns:
+        pattern_worst = (0.0, '')
+        for prefix, pump in adversarial_cases(pattern):
+            desc = f"{prefix!r} + {pump!r}*n"
+            ns, ratio = confirmed_measure(lambda text: deque(pattern.finditer(text), maxlen=0),
+                                          lambda n: prefix + pump * (n // len(pump)), args.size,
+                                          lambda ns, ratio: ns > args.max_ns_per_byte or ratio > GROWTH_LIMIT)
+            if ns > pattern_worst[0]:
+                pattern_worst = (ns, desc)
+            if ns > args.max_ns_per_byte or ratio > GROWTH_LIMIT:
+                failures.append(f"{label}: {desc}: {ns:.0f} ns/byte, x{ratio:.1f} for 4x input")
+        worst.append((pattern_worst[0], label, pattern_worst[1]))
+        if args.verbose:
+            print(f"{pattern_worst[0]:8.1f} ns/byte  {label}  ({pattern_worst[1]})")
+
+    for label, run in entry_points(modules):
+        entry_worst = (0.0, '')
+        for pump in ENTRY_PUMPS:
+            ns, ratio = confirmed_measure(run, lambda n: pump * (n // len(pump)), args.size * 4,
+                                          lambda ns, ratio: ratio > GROWTH_LIMIT)
+            if ns > entry_worst[0]:
+                entry_worst = (ns, pump)
+            # Entry points do real work per byte; only their growth is checked.
+            if ratio > GROWTH_LIMIT:
+                failures.append(f"{label}: {pump!r}*n: x{ratio:.1f} for 4x input")
+        if args.verbose:
+            print(f"{entry_worst[0]:8.1f} ns/byte  {label}  ({entry_worst[1]!r}*n)")
+
+    worst.sort(reverse=True)
+    print(f"Audited {len(patterns)} patterns and {len(entry_points(modules))} entry points")
+    print("Slowest patterns (ns/byte at worst input):")
+    for ns, label, desc in worst[:5]:
+        print(f"  {ns:8.1f}  {label}  ({desc})")
+    if failures:
+        print(f"\n{len(failures)} superlinear or slow case(s):")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("OK: all patterns linear and under the per-byte limit")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+Guards the cold-start cost of every skills/*/scripts entry point.
+
+Each script is loaded (its module body run, `main()` not called) in a fresh
+interpreter under `python -X importtime`, best of a few runs. A script fails
+if loading it takes longer than the budget, or if it imports at startup a
+module that only some code paths need (`yaml`, `multiprocessing`,
+`sqlite3`, ...); those belong inside the function that uses them.
+
+    startup_bench.py [--budget-ms 90] [--runs 5] [-v]
+
+Exit status 1 lists the offending scripts and their heaviest imports.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+REPO = Path(__file__).resolve().parent.parent
+
+# Modules no script may import just by being loaded.
+DEFERRED_MODULES = ('yaml', 'tomllib', 'multiprocessing', 'concurrent.futures', 'sqlite3',
+                    'subprocess', 'ctypes', 'gzip', 'asyncio')
+
+# Loads a script without running main(), printing the wall time of the load.
+DRIVER = """
+import importlib.util, sys, time
+path = sys.argv[1]
+sys.argv = [path]
+started = time.perf_counter()
+spec = importlib.util.spec_from_file_location('__startup__', path)
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+print((time.perf_counter() - started) * 1000)
+"""
+
+IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def load_once(script: Path) -> Tuple[float, Dict[str, int], List[str]]:
+    """(load ms, cumulative µs per top-level import, every module imported)."""
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)  # measure with warm bytecode caches, as users run
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', DRIVER, str(script)],
+                          capture_output=True, text=True, env=env, cwd=script.parent)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'failed')
+    # Imports the driver needed before timing started are not the script's.
+    lines = proc.stderr.splitlines()
+    start = next((i for i, line in enumerate(lines) if line.endswith('| importlib.util')), -1) + 1
+    top: Dict[str, int] = {}
+    imported = []
+    for line in lines[start:]:
+        match = IMPORT_LINE.match(line)
+        if match:
+            imported.append(match.group(4))
+            if len(match.group(3)) == 1:
+                top[match.group(4)] = int(match.group(2))
+    return float(proc.stdout.strip().splitlines()[-1]), top, imported
+
+
+def bench(script: Path, runs: int) -> Tuple[float, Dict[str, int], List[str]]:
+    best = None
+    for _ in range(runs):
+        result = load_once(script)
+        if best is None or result[0] < best[0]:
+            best = result
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="startup_bench.py")
+    parser.add_argument("--budget-ms", type=float, default=90.0,
+                        help="Fail if loading any script takes longer than this (best of --runs)")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per script")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print the heaviest imports of every script")
+    args = parser.parse_args()
+
+    failures = []
+    for script in sorted(REPO.glob('skills/*/scripts/*.py')):
+        label = str(script.relative_to(REPO))
+        try:
+            ms, top, imported = bench(script, max(1, args.runs))
+        except RuntimeError as e:
+            failures.append(f"{label}: could not be loaded ({e})")
+            continue
+        heaviest = sorted(top.items(), key=lambda item: -item[1])[:5]
+        print(f"{ms:7.1f} ms  {label}")
+        if args.verbose or ms > args.budget_ms:
+            for module, us in heaviest:
+                print(f"             {us / 1000:6.1f} ms  {module}")
+        deferred = sorted({root for root in DEFERRED_MODULES for m in imported
+                           if m == root or m.startswith(root + '.')})
+        if ms > args.budget_ms:
+            failures.append(f"{label}: {ms:.1f} ms > {args.budget_ms:.0f} ms budget")
+        if deferred:
+            failures.append(f"{label}: imports {', '.join(deferred)} at startup")
+
+    if failures:
+        print(f"\n{len(failures)} startup regression(s):")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print(f"OK: every script loads within {args.budget_ms:.0f} ms without deferred imports")
+
+
+if __name__ == "__main__":
+    main()
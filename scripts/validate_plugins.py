@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Plugin Validator
+Checks the skill structure of many plugins shaped like this repository
+(`plugin.json` + `skills/*`), with the rules of skills/*/scripts/validate.py:
+every skill has SKILL.md and non-empty assets/, scripts/ and references/.
+
+    validate_plugins.py <plugin-or-marketplace-dir>... [--cache FILE] [-j 8] [-v]
+
+A directory holding `plugin.json` (or `.claude-plugin/plugin.json`) is one
+plugin; any other directory is a marketplace whose subdirectories are
+plugins. Each plugin is validated from a snapshot taken with one
+`os.scandir` per directory it needs (the plugin root, .claude-plugin/,
+skills/, each skill and its required directories, and the directories of
+the skill files plugin.json declares), not per-skill exists/listdir calls.
+
+With `--cache`, results are kept per plugin together with the mtimes of the
+directories in its snapshot and of its manifests. Adding, removing or
+renaming an entry changes its directory's mtime, so a plugin whose mtimes
+all match is reported from the cache after one `stat` per directory.
+Plugins are validated on a thread pool; the work is system calls, which
+release the GIL.
+
+Exit status 1 if any plugin is invalid.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+MANIFESTS = ('plugin.json', '.claude-plugin/plugin.json')
+REQUIRED_DIRS = ('assets', 'scripts', 'references')
+REQUIRED_FILES = ('SKILL.md',)
+CACHE_VERSION = 2
+
+
+@dataclass(slots=True)
+class Snapshot:
+    """The directory listings a plugin's validation needs, and their mtimes."""
+    root: str
+    entries: Dict[str, Dict[str, bool]] = field(default_factory=dict)  # rel dir -> name -> is dir
+    mtimes: Dict[str, int] = field(default_factory=dict)               # rel path -> st_mtime_ns
+
+    def scan(self, rel: str) -> Optional[Dict[str, bool]]:
+        """List one directory (relative to the root) into the snapshot; None if it is missing."""
+        path = os.path.join(self.root, rel) if rel else self.root
+        try:
+            # Stat before listing: a change during the scan then invalidates the cached result.
+            mtime = os.stat(path).st_mtime_ns
+            listing = {}
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        listing[entry.name] = entry.is_dir()
+                    except OSError:
+                        listing[entry.name] = False
+        except OSError:
+            return None
+        self.mtimes[rel] = mtime
+        self.entries[rel] = listing
+        return listing
+
+    def listing(self, rel: str) -> Optional[Dict[str, bool]]:
+        """A directory's listing, scanning it (and its parents) on first use; None if it is missing."""
+        if rel in self.entries:
+            return self.entries[rel]
+        parent, _, name = rel.rpartition('/')
+        if rel and not (self.listing(parent) or {}).get(name):
+            return None
+        return self.scan(rel)
+
+    def is_file(self, rel: str) -> bool:
+        parent, _, name = rel.rpartition('/')
+        return (self.listing(parent) or {}).get(name) is False
+
+    def stamp(self, rel: str) -> None:
+        """Record a file's mtime, so editing it invalidates a cached result."""
+        try:
+            self.mtimes[rel] = os.stat(os.path.join(self.root, rel)).st_mtime_ns
+        except OSError:
+            pass
+
+
+def snapshot_plugin(root: str) -> Tuple[Snapshot, Optional[str]]:
+    """Scan the directories the structure checks need; returns the snapshot and manifest path."""
+    snap = Snapshot(root)
+    top = snap.scan('') or {}
+    # Every manifest location is recorded, so adding one where another was missing is noticed:
+    # the root's mtime covers plugin.json, .claude-plugin/'s mtime covers the other.
+    if top.get('.claude-plugin'):
+        snap.scan('.claude-plugin')
+    present = [m for m in MANIFESTS if snap.is_file(m)]
+    for manifest in present:
+        snap.stamp(manifest)
+    skills = snap.scan('skills') if top.get('skills') else None
+    for name, is_dir in sorted((skills or {}).items()):
+        if not is_dir:
+            continue
+        listing = snap.scan(f"skills/{name}") or {}
+        for required in REQUIRED_DIRS:
+            if listing.get(required):
+                snap.scan(f"skills/{name}/{required}")
+    return snap, present[0] if present else None
+
+
+def validate_skill(snap: Snapshot, name: str) -> dict:
+    """`validate_skill_structure` of validate.py, answered from the snapshot."""
+    rel = f"skills/{name}"
+    listing = snap.entries.get(rel, {})
+    errors = []
+    for file in REQUIRED_FILES:
+        if file not in listing:
+            errors.append(f"Missing required file: {file}")
+    for required in REQUIRED_DIRS:
+        if not listing.get(required):
+            errors.append(f"Missing required directory: {required}/")
+        elif not [f for f in snap.entries.get(f"{rel}/{required}", {}) if f != '.gitkeep']:
+            errors.append(f"Directory {required}/ has no real content")
+    return {"valid": not errors, "errors": errors, "skill_name": name}
+
+
+def declared_skills(data: dict) -> List[str]:
+    """Skill files a manifest lists, as plain paths (`"./skills/x/SKILL.md"`) or `{"file": ...}` entries."""
+    declared = []
+    for entry in data.get('skills', []) or []:
+        file = entry.get('file') if isinstance(entry, dict) else entry
+        if isinstance(file, str) and file:
+            declared.append(file)
+    return declared
+
+
+def plugin_path(file: str) -> Optional[str]:
+    """A declared path relative to the plugin root, or None if it points outside it."""
+    rel = os.path.normpath(file).replace(os.sep, '/')
+    if os.path.isabs(file) or rel == '.' or rel == '..' or rel.startswith('../'):
+        return None
+    return rel
+
+
+def validate_plugin(root: str) -> dict:
+    """Structure result of one plugin, plus the mtimes it was derived from."""
+    snap, manifest = snapshot_plugin(root)
+    errors = []
+    declared: List[str] = []
+    if manifest is None:
+        errors.append("Missing plugin.json")
+    else:
+        try:
+            with open(os.path.join(root, manifest), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if not isinstance(data, dict) or not data.get('name'):
+                errors.append(f"{manifest}: missing 'name'")
+            else:
+                declared = declared_skills(data)
+        except (OSError, ValueError) as e:
+            errors.append(f"{manifest}: {e}")
+
+    skill_dirs = sorted(n for n, is_dir in snap.entries.get('skills', {}).items() if is_dir)
+    for file in declared:
+        rel = plugin_path(file)
+        if rel is None or not snap.is_file(rel):
+            errors.append(f"Declared skill file missing: {file}")
+    if not skill_dirs:
+        errors.append("No skills/ directories")
+
+    skills = [validate_skill(snap, name) for name in skill_dirs]
+    return {
+        "plugin": os.path.basename(os.path.normpath(root)),
+        "valid": not errors and all(s["valid"] for s in skills),
+        "errors": errors,
+        "skills": skills,
+        "mtimes": snap.mtimes,
+    }
+
+
+def unchanged(root: str, mtimes: Dict[str, int]) -> bool:
+    """Whether every directory (and manifest) a cached result was derived from is untouched."""
+    for rel, mtime in mtimes.items():
+        try:
+            if os.stat(os.path.join(root, rel) if rel else root).st_mtime_ns != mtime:
+                return False
+        except OSError:
+            return False
+    return bool(mtimes)
+
+
+def discover(paths: List[str]) -> List[str]:
+    """Plugin roots: the paths that are plugins, and the plugin subdirectories of the others."""
+    roots = []
+    for path in paths:
+        if any(os.path.isfile(os.path.join(path, m)) for m in MANIFESTS):
+            roots.append(os.path.abspath(path))
+            continue
+        with os.scandir(path) as it:
+            roots.extend(sorted(os.path.abspath(e.path) for e in it
+                                if e.is_dir() and not e.name.startswith('.')))
+    return roots
+
+
+def load_cache(path: Optional[str]) -> Dict[str, dict]:
+    if path is None:
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data.get('plugins', {}) if data.get('version') == CACHE_VERSION else {}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def save_cache(path: str, results: Dict[str, dict]) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'plugins': results}, f)
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="validate_plugins.py")
+    parser.add_argument("paths", nargs="+", help="Plugin directories or directories of plugins")
+    parser.add_argument("--cache", metavar="FILE", help="Reuse results of plugins whose directories are unchanged")
+    parser.add_argument("-j", "--jobs", type=int, default=8, help="Plugins validated concurrently (default: 8)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="List valid plugins too")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    missing = [p for p in args.paths if not os.path.isdir(p)]
+    if missing:
+        print(f"Error: {', '.join(missing)} not found")
+        sys.exit(1)
+    roots = discover(args.paths)
+    cache = load_cache(args.cache)
+
+    def check(root: str) -> Tuple[dict, bool]:
+        cached = cache.get(root)
+        if cached is not None and unchanged(root, cached.get("mtimes", {})):
+            return cached, True
+        return validate_plugin(root), False
+
+    if args.jobs > 1 and len(roots) > 1:
+        from concurrent.futures import ThreadPoolExecutor  # only parallel runs pay for the pool
+        with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+            outcomes = list(executor.map(check, roots))
+    else:
+        outcomes = [check(root) for root in roots]
+
+    invalid = 0
+    for root, (result, _hit) in zip(roots, outcomes):
+        if result["valid"]:
+            if args.verbose:
+                print(f"PASS {result['plugin']} ({len(result['skills'])} skills)")
+            continue
+        invalid += 1
+        print(f"FAIL {result['plugin']} ({root})")
+        for error in result["errors"]:
+            print(f"  - {error}")
+        for skill in result["skills"]:
+            for error in skill["errors"]:
+                print(f"  - {skill['skill_name']}: {error}")
+
+    if args.cache:
+        try:
+            save_cache(args.cache, {root: result for root, (result, _hit) in zip(roots, outcomes)})
+        except OSError as e:
+            print(f"Warning: could not write cache: {e}", file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    hits = sum(hit for _result, hit in outcomes)
+    rate = len(roots) / elapsed * 60 if elapsed > 0 else 0
+    print(f"\n{len(roots)} plugins, {invalid} invalid, {hits} from cache "
+          f"in {elapsed:.2f}s ({rate:,.0f} plugins/min)")
+    sys.exit(1 if invalid else 0)
+
+
+if __name__ == "__main__":
+    main()
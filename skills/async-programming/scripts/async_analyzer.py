@@ -4,14 +4,52 @@ Rust Async Code Analyzer
 Analyzes Rust async code for common patterns and anti-patterns.
 """
 
+import argparse
+import time
 import re
 import sys
 from pathlib import Path
-from dataclasses import dataclass
-from typing import List
-
-
-@dataclass
+from dataclasses import dataclass, asdict, replace
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'scripts'))
+from analysis.prefilter import LiteralPrefilter  # noqa: E402
+from analysis.baseline import BaselineError, BaselineGate  # noqa: E402
+from analysis.history import FindingRow, FindingsHistory, HistoryError, current_commit, record, rules_salt  # noqa: E402
+from analysis.incremental import IncrementalAnalysis  # noqa: E402
+from analysis.reader import SourceBuffer, decode_line  # noqa: E402
+from analysis.render import ReportParts, render_sections  # noqa: E402
+from analysis.rulepack import load_rule_pack  # noqa: E402
+from analysis.sampling import SampleError, draw, estimate_totals, format_estimate, parse_sample, score_interval  # noqa: E402
+from analysis.sampling import report_lines as sample_lines  # noqa: E402
+from analysis.shards import PartialWriter, ShardError, merge_partials, parse_shard, select_shard  # noqa: E402
+from analysis.store import FindingStore, severity_counts  # noqa: E402
+from analysis.watch import LiveResults, diff_findings, watch  # noqa: E402
+from analysis.walker import WalkStats, iter_source_files  # noqa: E402
+
+RULE_PACK_PATH = Path(__file__).resolve().parent.parent / 'assets' / 'async-rules.yaml'
+
+
+# `let guard = m.lock().unwrap();` - a binding that keeps a sync guard alive.
+# A trailing method call (`.lock().unwrap().clone()`) or `.await` (tokio's
+# Mutex) means no std guard outlives the statement.
+GUARD_BINDING = re.compile(
+    r'\blet\s+(?:mut\s+)?(\w+)\s*(?::[^=]+)?=\s*[^;]*?'
+    r'\.(lock|read|write|borrow|borrow_mut)\(\)'
+    r'(?:\s*\.(?:unwrap|expect)\([^)]*\))?\s*;'
+)
+GUARD_DROP = re.compile(r'\bdrop\s*\(\s*(\w+)\s*\)')
+
+# Literals the scope/guard bookkeeping below reacts to, on top of the rule
+# pack's own literals. Lines with none of them skip straight to brace counting.
+STRUCTURE_LITERALS = ['async fn', '.await', '.lock()', '.read()', '.write()', '.borrow', 'drop']
+
+# Incremental scan states after a line (see analysis.incremental): inside an
+# async fn, or outside one before/after the first `tokio::sync`.
+SCOPE_OPEN, NO_TOKIO, TOKIO_SEEN = 0, 1, 2
+
+
+@dataclass(slots=True)
 class AsyncFinding:
     line_number: int
     pattern: str
@@ -20,186 +58,451 @@ class AsyncFinding:
     severity: str  # "good", "warning", "error"
 
 
+_rule_pack = None
+_line_filter = None
+
+
+def get_rule_pack():
+    """Load (once) the compiled rules from assets/async-rules.yaml."""
+    global _rule_pack, _line_filter
+    if _rule_pack is None:
+        _rule_pack = load_rule_pack(RULE_PACK_PATH)
+        _line_filter = LiteralPrefilter(list(_rule_pack.by_literal) + STRUCTURE_LITERALS)
+    return _rule_pack
+
+
 def analyze_async_rust(content: str) -> List[AsyncFinding]:
     """Analyze Rust async code for patterns."""
+    return analyze_async_buffer(SourceBuffer.from_text(content))
+
+
+def analyze_async_buffer(buf: SourceBuffer, first: int = 1, tokio_seen: bool = False,
+                         states: Optional[bytearray] = None) -> List[AsyncFinding]:
+    """
+    Analyze a (memory-mapped) source buffer; only candidate lines are decoded.
+
+    `first` is the line number of the buffer's first line and `tokio_seen`
+    whether `tokio::sync` occurs before it. With `states`, the incremental
+    scan state after each line is appended to it (see `scan_region`).
+    """
     findings = []
-    lines = content.split('\n')
+    pack = get_rule_pack()
 
     in_async_fn = False
     brace_depth = 0
+    live_guards = []  # (name, kind, line, brace depth of the binding's block)
+    candidates = _line_filter.candidate_lines(buf.data)
+    if first != 1:
+        candidates = {c + first - 1 for c in candidates}
+    tokio_sync_at = buf.find(b'tokio::sync')
 
-    for i, line in enumerate(lines, 1):
-        stripped = line.strip()
+    offset = 0
+
+    for i, raw in enumerate(buf.lines(), first):
+        line_offset = offset
+        offset += len(raw)
+        is_candidate = i in candidates
+        line = decode_line(raw).rstrip('\n') if is_candidate else None
 
         # Track async function context
-        if 'async fn' in line:
+        if is_candidate and 'async fn' in line:
             in_async_fn = True
             brace_depth = 0
+            live_guards = []
 
         if in_async_fn:
-            brace_depth += line.count('{') - line.count('}')
+            brace_depth += raw.count(b'{') - raw.count(b'}')
             if brace_depth <= 0:
                 in_async_fn = False
+                live_guards = []
 
-        # Check for std::thread::sleep in async context
-        if in_async_fn and 'thread::sleep' in line:
-            findings.append(AsyncFinding(
-                line_number=i,
-                pattern="blocking_sleep",
-                code=stripped[:60],
-                message="Use tokio::time::sleep instead of std::thread::sleep in async context",
-                severity="error"
-            ))
+        if live_guards and b'}' in raw:
+            live_guards = [g for g in live_guards if g[3] <= brace_depth]
 
-        # Check for .await usage (positive)
-        if '.await' in line:
-            findings.append(AsyncFinding(
-                line_number=i,
-                pattern="await_point",
-                code=stripped[:60],
-                message="Await point found",
-                severity="good"
-            ))
+        if states is not None:
+            seen = tokio_seen or -1 < tokio_sync_at < offset
+            states.append(SCOPE_OPEN if in_async_fn else TOKIO_SEEN if seen else NO_TOKIO)
 
-        # Check for tokio::spawn (positive)
-        if 'tokio::spawn' in line:
-            findings.append(AsyncFinding(
-                line_number=i,
-                pattern="spawn_task",
-                code=stripped[:60],
-                message="Task spawning - ensure JoinHandle is handled",
-                severity="good"
-            ))
+        if not is_candidate:
+            continue
+        stripped = line.strip()
 
-        # Check for spawn_blocking (positive)
-        if 'spawn_blocking' in line:
-            findings.append(AsyncFinding(
-                line_number=i,
-                pattern="spawn_blocking",
-                code=stripped[:60],
-                message="Good: Using spawn_blocking for blocking operations",
-                severity="good"
-            ))
+        # Check for sync guards still alive at an .await in the same scope
+        if in_async_fn and not stripped.startswith('//'):
+            if live_guards and 'drop' in line:
+                dropped = set(GUARD_DROP.findall(line))
+                live_guards = [g for g in live_guards if g[0] not in dropped]
+            if live_guards and '.await' in line:
+                for name, kind, guard_line, _depth in live_guards:
+                    is_refcell = kind.startswith('borrow')
+                    findings.append(AsyncFinding(
+                        line_number=i,
+                        pattern="lock_across_await",
+                        code=stripped[:60],
+                        message=(f"`{name}` from .{kind}() on line {guard_line} is still held "
+                                 f"at .await on line {i} - "
+                                 + ("drop the RefCell borrow before awaiting" if is_refcell
+                                    else "drop the guard before awaiting or use tokio::sync")),
+                        severity="warning" if is_refcell else "error"
+                    ))
+            guard = GUARD_BINDING.search(line)
+            if guard:
+                live_guards.append((guard.group(1), guard.group(2), i, brace_depth))
+
+        contexts = []
+        if in_async_fn:
+            contexts.append('async_fn')
+        if not tokio_seen and (tokio_sync_at == -1 or tokio_sync_at >= line_offset):
+            contexts.append('no_tokio_sync_yet')
 
-        # Check for mutex lock in async
-        if in_async_fn and '.lock()' in line and 'Mutex' not in line:
-            if 'tokio::sync' not in content[:content.find(line)]:
-                findings.append(AsyncFinding(
-                    line_number=i,
-                    pattern="sync_mutex",
-                    code=stripped[:60],
-                    message="Possible std::sync::Mutex in async - consider tokio::sync::Mutex",
-                    severity="warning"
-                ))
-
-        # Check for join! macro (positive)
-        if 'tokio::join!' in line or 'join!' in line:
+        for rule, match in pack.match_line(line, contexts):
             findings.append(AsyncFinding(
                 line_number=i,
-                pattern="concurrent_join",
+                pattern=rule.id,
                 code=stripped[:60],
-                message="Good: Using join! for concurrent execution",
-                severity="good"
+                message=rule.format_message(i, match),
+                severity=rule.severity
             ))
 
-        # Check for select! macro (positive)
-        if 'tokio::select!' in line or 'select!' in line:
-            findings.append(AsyncFinding(
-                line_number=i,
-                pattern="select_macro",
-                code=stripped[:60],
-                message="Good: Using select! for racing futures",
-                severity="good"
-            ))
+    return findings
 
-        # Check for timeout usage (positive)
-        if 'timeout(' in line or 'timeout::' in line:
-            findings.append(AsyncFinding(
-                line_number=i,
-                pattern="timeout",
-                code=stripped[:60],
-                message="Good: Using timeout for async operations",
-                severity="good"
-            ))
 
-        # Check for unbounded channel
-        if 'unbounded_channel' in line:
-            findings.append(AsyncFinding(
-                line_number=i,
-                pattern="unbounded_channel",
-                code=stripped[:60],
-                message="Consider using bounded channel to prevent memory issues",
-                severity="warning"
-            ))
+def scan_region(text: str, first: int, last: int, state: int) -> Tuple[List[AsyncFinding], bytes]:
+    """
+    Incremental scanner. Async fn bodies are scopes (guards and brace depth
+    carry across lines); elsewhere the scan restarts knowing only whether
+    `tokio::sync` was seen.
+    """
+    states = bytearray()
+    findings = analyze_async_buffer(SourceBuffer.from_text(text), first, state == TOKIO_SEEN, states)
+    return findings, states
 
-        # Check for block_on in async context
-        if in_async_fn and 'block_on' in line:
-            findings.append(AsyncFinding(
-                line_number=i,
-                pattern="nested_runtime",
-                code=stripped[:60],
-                message="Avoid block_on inside async context - causes deadlock",
-                severity="error"
-            ))
 
-    return findings
+def moved_finding(f: AsyncFinding, delta: int) -> Optional[AsyncFinding]:
+    """`f` shifted by `delta` lines, or None if its message names line numbers."""
+    if f.pattern == "lock_across_await":
+        return None
+    rule = get_rule_pack().by_id.get(f.pattern)
+    if rule is not None and rule.mentions_line:
+        return None
+    return replace(f, line_number=f.line_number + delta)
+
 
+def analyze_incrementally(content: str) -> IncrementalAnalysis[AsyncFinding]:
+    """Findings of an editor buffer, updated per edit with `.apply(TextEdit(...))`."""
+    return IncrementalAnalysis(content, scan_region, lambda f: f.line_number, moved_finding)
 
-def generate_report(findings: List[AsyncFinding], filename: str) -> str:
+
+SEVERITIES = ("good", "warning", "error")
+
+
+def score_from_counts(counts) -> int:
+    score = 100 - (counts["error"] * 15) - (counts["warning"] * 5) + min(counts["good"] * 2, 20)
+    return max(0, min(100, score))
+
+
+def async_score(findings: List[AsyncFinding]) -> int:
+    return score_from_counts(severity_counts(findings))
+
+
+def summary_line(findings: List[AsyncFinding]) -> str:
+    counts = severity_counts(findings)
+    return (f"Good: {counts['good']} | Warnings: {counts['warning']} | Errors: {counts['error']} | "
+            f"Score: {async_score(findings)}/100")
+
+
+def render_finding(f: AsyncFinding) -> str:
+    """Markdown block of one error or warning."""
+    return f"**Line {f.line_number}:** {f.message}\n```rust\n{f.code}\n```\n"
+
+
+def generate_report(findings: List[AsyncFinding], filename: str,
+                    walk_stats: Optional[WalkStats] = None,
+                    baselined: Optional[int] = None) -> str:
     """Generate markdown report."""
+    return report_parts(findings, filename, walk_stats, baselined).text()
+
+
+def report_parts(findings: List[AsyncFinding], filename: str,
+                 walk_stats: Optional[WalkStats] = None,
+                 baselined: Optional[int] = None,
+                 jobs: int = 1) -> ReportParts:
+    """The report of `generate_report`, with the findings rendered on `jobs` processes."""
     report = [f"# Async Analysis: {filename}\n"]
 
-    goods = [f for f in findings if f.severity == "good"]
-    warnings = [f for f in findings if f.severity == "warning"]
-    errors = [f for f in findings if f.severity == "error"]
+    counts = severity_counts(findings)
 
     report.append("## Summary\n")
-    report.append(f"- Good patterns: {len(goods)} 🟢")
-    report.append(f"- Warnings: {len(warnings)} 🟡")
-    report.append(f"- Errors: {len(errors)} 🔴\n")
+    report.append(f"- Good patterns: {counts['good']} 🟢")
+    report.append(f"- Warnings: {counts['warning']} 🟡")
+    report.append(f"- Errors: {counts['error']} 🔴")
+    if baselined is not None:
+        report.append(f"- Baselined (suppressed): {baselined}")
+    report.append("")
+
+    if walk_stats is not None:
+        report.append("## Files\n")
+        report.extend(walk_stats.report_lines())
+        report.append("")
 
     # Score
-    score = 100 - (len(errors) * 15) - (len(warnings) * 5) + min(len(goods) * 2, 20)
-    score = max(0, min(100, score))
+    score = async_score(findings)
     report.append(f"**Async Code Score: {score}/100**\n")
 
-    if errors:
-        report.append("## 🔴 Errors\n")
-        for f in errors:
-            report.append(f"**Line {f.line_number}:** {f.message}")
-            report.append(f"```rust\n{f.code}\n```\n")
-
-    if warnings:
-        report.append("## 🟡 Warnings\n")
-        for f in warnings:
-            report.append(f"**Line {f.line_number}:** {f.message}")
-            report.append(f"```rust\n{f.code}\n```\n")
+    # Errors and warnings are bucketed in one pass; good patterns are only counted.
+    parts = ReportParts(report)
+    if counts["error"] or counts["warning"]:
+        sections = render_sections(findings, render_finding, ("error", "warning"), jobs)
+        if counts["error"]:
+            parts.sections.append(("## 🔴 Errors\n", sections["error"]))
+        if counts["warning"]:
+            parts.sections.append(("## 🟡 Warnings\n", sections["warning"]))
 
+    report = parts.tail
     report.append("## Async Best Practices\n")
     report.append("1. Use `tokio::time::sleep`, not `std::thread::sleep`")
     report.append("2. Use `spawn_blocking` for CPU-intensive work")
     report.append("3. Use `tokio::sync::Mutex` instead of `std::sync::Mutex`")
+    report.append("   - never hold a `std::sync::MutexGuard` across `.await`")
     report.append("4. Always add timeouts to network operations")
     report.append("5. Use bounded channels to prevent memory leaks")
     report.append("6. Handle `JoinHandle` from spawned tasks\n")
 
+    return parts
+
+
+def generate_sample_report(filename: str, strata, seed: int, counts) -> str:
+    """Markdown report of a --sample run: estimated counts and score with 95% intervals."""
+    report = [f"# Async Analysis: {filename} (sampled)\n"]
+
+    report.append("## Sample\n")
+    report.extend(sample_lines(strata, seed, len(counts)))
+    report.append("")
+
+    estimates = estimate_totals(strata, counts, SEVERITIES)
+    report.append("## Estimated Summary\n")
+    report.append(f"- Good patterns: {format_estimate(estimates['good'])} 🟢")
+    report.append(f"- Warnings: {format_estimate(estimates['warning'])} 🟡")
+    report.append(f"- Errors: {format_estimate(estimates['error'])} 🔴")
+    report.append("")
+
+    score = score_interval(score_from_counts, estimates)
+    report.append(f"**Estimated Async Code Score: {format_estimate(score, '/100')}**\n")
     return '\n'.join(report)
 
 
+def analyze_path(path: Path) -> List[AsyncFinding]:
+    """Analyze a file on disk without decoding it as a whole."""
+    with SourceBuffer.open(path) as buf:
+        return analyze_async_buffer(buf)
+
+
+def finding_row(f: AsyncFinding) -> tuple:
+    """FindingStore row; the snippet is re-read from the source when reporting."""
+    return f.line_number, f.pattern, f.severity, f.message, f.code
+
+
+def make_finding(line: int, pattern: str, severity: str, message: str, code: str) -> AsyncFinding:
+    return AsyncFinding(line_number=line, pattern=pattern, code=code, message=message, severity=severity)
+
+
+def new_store() -> FindingStore:
+    return FindingStore(make_finding, snippet_width=60)
+
+
+def baseline_key(f: AsyncFinding):
+    """Baseline fingerprint key; good patterns are never baselined."""
+    if f.severity == "good":
+        return None
+    return f.pattern, f.line_number, None
+
+
+def watch_main(root: Path, polling: bool = False) -> None:
+    """Re-analyze only saved .rs files and print a live summary until Ctrl-C."""
+    live = LiveResults(root, analyze_path)
+    live.scan()
+    print(f"{root}: {len(live.results)} files | {summary_line(live.findings())}")
+
+    def on_change(paths):
+        started = time.perf_counter()
+        changes = live.update(paths)
+        if not changes:
+            return
+        elapsed = (time.perf_counter() - started) * 1000
+        stamp = time.strftime('%H:%M:%S')
+        for rel, old, new in changes:
+            added, removed = diff_findings(old, new, lambda f: (f.pattern, f.code))
+            state = "removed" if new is None else f"{len(new)} findings"
+            print(f"[{stamp}] {rel}: {state} (+{len(added)} -{len(removed)})")
+            for f in added:
+                if f.severity != "good":
+                    print(f"  + Line {f.line_number} [{f.pattern}] {f.code}")
+        print(f"  {summary_line(live.findings())} ({len(changes)} file(s) in {elapsed:.1f} ms)")
+
+    watch(root, on_change, suffixes=('.rs',), polling=polling,
+          on_start=lambda kind: print(f"Watching {root} ({kind}), Ctrl-C to stop"))
+
+
+def sample_main(path: Path, title: str, files, sample: Tuple, seed: int) -> None:
+    """Analyze a stratified sample of the files and print estimates for the whole tree."""
+    strata = draw(select_shard(files, path, None), path, *sample, seed)
+    counts = {rel: severity_counts(analyze_path(rust_file))
+              for stratum in strata for rust_file, rel in stratum.sample}
+    print(generate_sample_report(title, strata, seed, counts))
+
+
+def merge_main(partials: List[str]) -> None:
+    """Combine --shard partial results into the single-node report."""
+    try:
+        title, files, walk_stats = merge_partials(partials, "async-programming")
+    except (ShardError, OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    findings = [AsyncFinding(**d) for _path, records in files for d in records]
+    print(generate_report(findings, title, walk_stats))
+
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: async_analyzer.py <rust_file.rs>")
+        print("       async_analyzer.py <directory> [--shard i/N] [-o part.jsonl]")
+        print("       async_analyzer.py <path> --record history.db [--commit SHA]")
+        print("       async_analyzer.py merge <part.jsonl>...")
+        print("       async_analyzer.py <directory> --watch [--poll]")
+        print("       async_analyzer.py <directory> --sample N|P% [--seed S]")
+        print("       async_analyzer.py <directory> --report-dir DIR [--page-size N]")
         sys.exit(1)
 
-    path = Path(sys.argv[1])
-    if path.is_file():
-        content = path.read_text()
-        findings = analyze_async_rust(content)
-        print(generate_report(findings, path.name))
-    else:
+    if sys.argv[1] == 'merge':
+        merge_main(sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(prog="async_analyzer.py")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--shard", metavar="I/N",
+                        help="Analyze only shard I of N and write a partial result")
+    parser.add_argument("-o", "--output", default="-",
+                        help="Partial result file for --shard (default: stdout)")
+    parser.add_argument("--record", metavar="DB", type=Path,
+                        help="Store findings in a SQLite history database instead of printing a report")
+    parser.add_argument("--commit", help="Commit to record under (default: git HEAD)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Watch a directory and re-analyze files as they are saved")
+    parser.add_argument("--poll", action="store_true", help="With --watch, poll instead of using inotify")
+    parser.add_argument("--baseline", metavar="FILE", type=Path,
+                        help="Report only findings missing from this baseline")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Record the current findings into --baseline instead of reporting")
+    parser.add_argument("--sample", metavar="N|P%",
+                        help="Analyze a stratified random sample of N files (or P%%) and estimate the totals")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for --sample (default: 0)")
+    parser.add_argument("--report-dir", metavar="DIR", type=Path,
+                        help="Write the report as DIR/index.md plus pages of --page-size findings")
+    parser.add_argument("--page-size", type=int, default=1000, metavar="N",
+                        help="Findings per page with --report-dir (default: 1000)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Worker processes for rendering the report")
+    args = parser.parse_args()
+
+    path = args.path
+    if not path.exists():
         print(f"Error: {path} not found")
         sys.exit(1)
 
+    try:
+        shard = parse_shard(args.shard) if args.shard else None
+    except ShardError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    try:
+        sample = parse_sample(args.sample) if args.sample else None
+    except SampleError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if sample is not None and (shard is not None or args.record or args.watch or args.baseline):
+        print("Error: --sample cannot be combined with --shard, --record, --watch or --baseline")
+        sys.exit(1)
+
+    if args.report_dir is not None:
+        if args.page_size < 1:
+            print("Error: --page-size must be at least 1")
+            sys.exit(1)
+        if sample is not None or shard is not None or args.record or args.watch or args.update_baseline:
+            print("Error: --report-dir cannot be combined with --sample, --shard, --record, --watch or --update-baseline")
+            sys.exit(1)
+
+    if args.watch:
+        if not path.is_dir():
+            print("Error: --watch needs a directory")
+            sys.exit(1)
+        watch_main(path, args.poll)
+        return
+
+    gate = None
+    if args.update_baseline and not args.baseline:
+        print("Error: --update-baseline needs --baseline FILE")
+        sys.exit(1)
+    if args.baseline and (args.record or (args.update_baseline and shard is not None)):
+        print("Error: --baseline cannot be combined with --record, --update-baseline with --shard")
+        sys.exit(1)
+    if args.baseline:
+        try:
+            gate = BaselineGate(args.baseline, "async-programming", baseline_key, update=args.update_baseline)
+        except (OSError, BaselineError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+    title = path.name if path.is_file() else str(path)
+    walk_stats = WalkStats() if path.is_dir() else None
+    files = iter_source_files(path, stats=walk_stats)
+
+    if args.record:
+        if shard is not None:
+            print("Error: --record cannot be combined with --shard")
+            sys.exit(1)
+        try:
+            commit = args.commit or current_commit(path)
+            with FindingsHistory(args.record) as db:
+                run = record(db, "async-programming", path if path.is_dir() else path.parent, title, commit,
+                             select_shard(files, path, None), rules_salt(__file__, RULE_PACK_PATH),
+                             lambda p: [FindingRow(f.pattern, f.line_number, f.severity, f.code) for f in analyze_path(p)])
+        except HistoryError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"Recorded {commit[:12]}: {run.files} files, {run.files - run.reused} analyzed")
+        return
+
+    if sample is not None:
+        sample_main(path, title, files, sample, args.seed)
+        return
+
+    if shard is not None:
+        writer = PartialWriter(args.output, "async-programming", title, shard)
+        for rust_file, rel in select_shard(files, path, shard):
+            findings = analyze_path(rust_file)
+            if gate is not None:
+                findings = gate.apply(rel, rust_file, findings)
+            writer.add_file(rel, [asdict(f) for f in findings])
+        writer.close(walk_stats)
+        return
+
+    findings = new_store()
+    for rust_file, rel in select_shard(files, path, None):
+        file_findings = analyze_path(rust_file)
+        if gate is not None:
+            file_findings = gate.apply(rel, rust_file, file_findings)
+        findings.add_file(rel, rust_file, map(finding_row, file_findings))
+    if gate is not None and gate.update:
+        print(gate.finish())
+        return
+    parts = report_parts(findings, title, walk_stats, gate.suppressed if gate is not None else None,
+                         jobs=args.jobs)
+    if args.report_dir is not None:
+        written = parts.write_pages(args.report_dir, args.page_size)
+        print(f"Wrote {args.report_dir / 'index.md'} and {len(written) - 1} page(s) of findings")
+    else:
+        parts.write(sys.stdout)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+"""
+Rust Async Blocking-Call Analyzer
+Finds async functions that reach blocking calls through synchronous helpers,
+across every file of a crate.
+
+Each function gets a local summary (does it block directly, which functions
+does it call). Summaries are cached per file by content hash, then combined
+over a name-based call graph to decide which async fns may block.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'scripts'))
+from analysis.baseline import BaselineError, BaselineGate  # noqa: E402
+from analysis.reader import read_source_text  # noqa: E402
+from analysis.walker import WalkStats, iter_source_files  # noqa: E402
+
+
+CACHE_VERSION = 1
+DEFAULT_CACHE = Path('target') / 'async-analyzer' / 'blocking-summaries.json'
+
+# (label, pattern) - matched on comment/string-stripped lines that do not
+# `.await`, since tokio/async-std equivalents are always awaited.
+BLOCKING_CALLS = [
+    ("std::thread::sleep", re.compile(r'\bthread::sleep\s*\(')),
+    ("std::fs", re.compile(r'(?<![\w:])(?:std::)?fs::(?:read|read_to_string|read_dir|write|copy|rename|'
+                           r'remove_file|remove_dir_all|create_dir_all|metadata|canonicalize)\s*\(')),
+    ("std::fs::File", re.compile(r'(?<![\w:])(?:std::fs::)?File::(?:open|create)\s*\(')),
+    ("reqwest::blocking", re.compile(r'\breqwest::blocking\b|\bblocking::(?:Client|get)\b')),
+    ("std::net", re.compile(r'(?<![\w:])(?:std::net::)?(?:TcpStream::connect|TcpListener::bind|'
+                            r'UdpSocket::bind)\s*\(')),
+    ("std::io::stdin", re.compile(r'\bstdin\(\)\s*\.(?:read_line|read_to_string|lines)\b')),
+    ("std::process::Command", re.compile(r'\.(?:output|status)\s*\(\s*\)')),
+    ("block_on", re.compile(r'\bblock_on\s*\(')),
+    ("std::sync::mpsc::recv", re.compile(r'\.recv(?:_timeout)?\s*\(')),
+]
+
+# Non-blocking crates whose `fs::`/`File::`/`net::` names shadow std's.
+ASYNC_IO_IMPORT = re.compile(r'^\s*use\s+(?:tokio|async_std|smol)::(?:fs|net|process|io)\b')
+STD_PROCESS_IMPORT = re.compile(r'\bstd::process\b')
+STD_MPSC_IMPORT = re.compile(r'\bstd::sync::mpsc\b')
+
+FN_HEADER = re.compile(
+    r'^\s*(?:pub(?:\([^)]*\))?\s+)?(?:default\s+)?(?:const\s+)?(async\s+)?'
+    r'(?:unsafe\s+)?(?:extern\s+"[^"]*"\s+)?fn\s+(\w+)'
+)
+# Trait paths are whitespace-separated tokens with no `for` token among them,
+# so the `for` split is unambiguous and matching stays linear.
+IMPL_HEADER = re.compile(r'^\s*(?:unsafe\s+)?impl\b(?:\s*<[^{]*?>)?\s+'
+                         r'(?:[\w:<>,]+(?:\s+(?!for\b)[\w:<>,]+)*\s+for\s+)?(?:\w+::)*(\w+)')
+CALL = re.compile(r'(?:(\bself)\s*\.\s*|\b(\w+)\s*::\s*|\.\s*)?\b(\w+)\s*(?:::<[^>]*>\s*)?\(')
+SPAWN_BLOCKING = re.compile(r'\bspawn_blocking\s*\(')
+STRING_LITERAL = re.compile(r'"(?:\\.|[^"\\])*"')
+
+KEYWORDS = {'if', 'while', 'for', 'match', 'loop', 'return', 'fn', 'Some', 'Ok', 'Err',
+            'Box', 'Vec', 'move', 'async', 'await', 'in', 'as', 'let', 'mut', 'ref'}
+
+
+@dataclass
+class BlockingCall:
+    line: int
+    label: str
+    code: str
+
+
+@dataclass
+class FunctionSummary:
+    name: str
+    owner: Optional[str]  # impl type for methods
+    file: str
+    line: int
+    is_async: bool
+    blocking: List[BlockingCall] = field(default_factory=list)
+    calls: List[Tuple[Optional[str], str, int]] = field(default_factory=list)  # (qualifier, name, line)
+
+
+@dataclass
+class BlockingPath:
+    function: FunctionSummary
+    chain: List[str]
+    call: BlockingCall
+    call_file: str
+
+
+def _strip_line(line: str) -> str:
+    """Drop string literal contents and trailing `//` comments."""
+    line = STRING_LITERAL.sub('""', line)
+    comment = line.find('//')
+    return line if comment == -1 else line[:comment]
+
+
+def summarize_file(content: str, filename: str) -> List[FunctionSummary]:
+    """Build local (non-transitive) summaries for every fn in a file."""
+    lines = content.split('\n')
+    async_io = any(ASYNC_IO_IMPORT.match(l) for l in lines)
+    std_process = bool(STD_PROCESS_IMPORT.search(content))
+    std_mpsc = bool(STD_MPSC_IMPORT.search(content))
+
+    summaries: List[FunctionSummary] = []
+    fn_stack: List[Tuple[FunctionSummary, int]] = []    # (summary, body depth)
+    impl_stack: List[Tuple[str, int]] = []              # (type name, body depth)
+    pending_fn: Optional[FunctionSummary] = None
+    pending_impl: Optional[str] = None
+    blocking_ctx_depth: Optional[int] = None            # paren depth of spawn_blocking(...)
+    depth = 0
+    paren_depth = 0
+    in_block_comment = False
+
+    for i, raw in enumerate(lines, 1):
+        line = raw
+        if in_block_comment:
+            end = line.find('*/')
+            if end == -1:
+                continue
+            line = line[end + 2:]
+            in_block_comment = False
+        start = line.find('/*')
+        if start != -1 and line.find('*/', start) == -1:
+            line = line[:start]
+            in_block_comment = True
+        line = _strip_line(line)
+
+        header = FN_HEADER.match(line)
+        if header:
+            owner = impl_stack[-1][0] if impl_stack else None
+            pending_fn = FunctionSummary(
+                name=header.group(2), owner=owner, file=filename, line=i,
+                is_async=bool(header.group(1)),
+            )
+            summaries.append(pending_fn)
+        else:
+            impl_match = IMPL_HEADER.match(line)
+            if impl_match:
+                pending_impl = impl_match.group(1)
+
+        current = fn_stack[-1][0] if fn_stack else None
+        if current is not None and '.await' not in line:
+            in_spawn_blocking = blocking_ctx_depth is not None
+            if not in_spawn_blocking and not SPAWN_BLOCKING.search(line):
+                for label, pattern in BLOCKING_CALLS:
+                    if label in ("std::fs", "std::fs::File", "std::net") and async_io:
+                        continue
+                    if label == "std::process::Command" and not std_process:
+                        continue
+                    if label == "std::sync::mpsc::recv" and not std_mpsc:
+                        continue
+                    if pattern.search(line):
+                        current.blocking.append(BlockingCall(i, label, raw.strip()[:80]))
+                        break
+
+        if current is not None and blocking_ctx_depth is None and not header:
+            for match in CALL.finditer(line):
+                name = match.group(3)
+                if name in KEYWORDS or name == current.name and not match.group(2):
+                    continue
+                qualifier = 'self' if match.group(1) else match.group(2)
+                current.calls.append((qualifier, name, i))
+
+        spawn_parens = {m.end() - 1 for m in SPAWN_BLOCKING.finditer(line)}
+        for col, ch in enumerate(line):
+            if ch == '(':
+                paren_depth += 1
+                if blocking_ctx_depth is None and col in spawn_parens:
+                    blocking_ctx_depth = paren_depth
+            elif ch == ')':
+                if blocking_ctx_depth is not None and paren_depth <= blocking_ctx_depth:
+                    blocking_ctx_depth = None
+                paren_depth = max(0, paren_depth - 1)
+            elif ch == '{':
+                depth += 1
+                if pending_fn is not None:
+                    fn_stack.append((pending_fn, depth))
+                    pending_fn = None
+                elif pending_impl is not None:
+                    impl_stack.append((pending_impl, depth))
+                    pending_impl = None
+            elif ch == '}':
+                while fn_stack and fn_stack[-1][1] >= depth:
+                    fn_stack.pop()
+                while impl_stack and impl_stack[-1][1] >= depth:
+                    impl_stack.pop()
+                depth = max(0, depth - 1)
+            elif ch == ';' and pending_fn is not None and paren_depth == 0:
+                # Trait method declaration without a body
+                summaries.remove(pending_fn)
+                pending_fn = None
+
+    return summaries
+
+
+class SummaryCache:
+    """Per-file summaries keyed by content hash, persisted as JSON."""
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self.entries: Dict[str, dict] = {}
+        self.hits = 0
+        self.misses = 0
+        if path is not None and path.is_file():
+            try:
+                data = json.loads(path.read_text())
+                if data.get('version') == CACHE_VERSION:
+                    self.entries = data.get('files', {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def summaries_for(self, rel_path: str, content: str) -> List[FunctionSummary]:
+        digest = hashlib.sha256(content.encode('utf-8', 'surrogateescape')).hexdigest()
+        entry = self.entries.get(rel_path)
+        if entry is not None and entry.get('sha256') == digest:
+            self.hits += 1
+            return [_summary_from_dict(d) for d in entry['functions']]
+
+        self.misses += 1
+        summaries = summarize_file(content, rel_path)
+        self.entries[rel_path] = {
+            'sha256': digest,
+            'functions': [asdict(s) for s in summaries],
+        }
+        return summaries
+
+    def save(self, keep: Set[str]) -> None:
+        if self.path is None:
+            return
+        files = {k: v for k, v in self.entries.items() if k in keep}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps({'version': CACHE_VERSION, 'files': files}))
+        except OSError as e:
+            print(f"Warning: could not write cache {self.path}: {e}", file=sys.stderr)
+
+
+def _summary_from_dict(data: dict) -> FunctionSummary:
+    return FunctionSummary(
+        name=data['name'],
+        owner=data['owner'],
+        file=data['file'],
+        line=data['line'],
+        is_async=data['is_async'],
+        blocking=[BlockingCall(**b) for b in data['blocking']],
+        calls=[tuple(c) for c in data['calls']],
+    )
+
+
+class CallGraph:
+    """Name-based call graph with "may block" propagated over its strongly connected components."""
+
+    def __init__(self, summaries: List[FunctionSummary]):
+        self.summaries = summaries
+        self.by_name: Dict[str, List[FunctionSummary]] = {}
+        for s in summaries:
+            self.by_name.setdefault(s.name, []).append(s)
+        self._callees: Dict[int, List[FunctionSummary]] = {}
+        self._memo: Dict[int, Optional[Tuple[List[str], BlockingCall, str]]] = {}
+        self._solved = False
+
+    def resolve(self, caller: FunctionSummary, qualifier: Optional[str], name: str) -> List[FunctionSummary]:
+        candidates = self.by_name.get(name, [])
+        if not candidates:
+            return []
+        if qualifier == 'self' and caller.owner:
+            owned = [c for c in candidates if c.owner == caller.owner]
+            return owned or candidates
+        if qualifier and qualifier[0].isupper():
+            if qualifier == 'Self' and caller.owner:
+                qualifier = caller.owner
+            owned = [c for c in candidates if c.owner == qualifier]
+            return owned
+        if qualifier is None:
+            free = [c for c in candidates if c.owner is None]
+            return free or candidates
+        return candidates
+
+    def callees(self, fn: FunctionSummary) -> List[FunctionSummary]:
+        """Synchronous functions fn may call, in call order."""
+        found = self._callees.get(id(fn))
+        if found is None:
+            found = []
+            for qualifier, name, _line in fn.calls:
+                for callee in self.resolve(fn, qualifier, name):
+                    # Awaited async callees are reported on their own.
+                    if not callee.is_async and callee is not fn:
+                        found.append(callee)
+            self._callees[id(fn)] = found
+        return found
+
+    def components(self) -> Iterator[List[FunctionSummary]]:
+        """Strongly connected components of the call graph, callees before callers (Tarjan)."""
+        index: Dict[int, int] = {}
+        low: Dict[int, int] = {}
+        stack: List[FunctionSummary] = []
+        on_stack: Set[int] = set()
+        for root in self.summaries:
+            if id(root) in index:
+                continue
+            index[id(root)] = low[id(root)] = len(index)
+            stack.append(root)
+            on_stack.add(id(root))
+            work = [(root, iter(self.callees(root)))]
+            while work:
+                fn, pending = work[-1]
+                for callee in pending:
+                    key = id(callee)
+                    if key not in index:
+                        index[key] = low[key] = len(index)
+                        stack.append(callee)
+                        on_stack.add(key)
+                        work.append((callee, iter(self.callees(callee))))
+                        break
+                    if key in on_stack:
+                        low[id(fn)] = min(low[id(fn)], index[key])
+                else:
+                    work.pop()
+                    if work:
+                        parent = id(work[-1][0])
+                        low[parent] = min(low[parent], low[id(fn)])
+                    if low[id(fn)] == index[id(fn)]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(id(member))
+                            component.append(member)
+                            if member is fn:
+                                break
+                        component.reverse()
+                        yield component
+
+    def _solve(self) -> None:
+        """
+        Decide every function's blocking path, component by component. A
+        function blocks if it calls a blocking function itself, or reaches
+        one through a blocking callee outside its component (the first in
+        call order). Within a cycle, the others take the first callee one
+        step closer to such an exit, so chains stay finite and the answer
+        does not depend on which function is asked about first.
+        """
+        for component in self.components():
+            members = {id(fn) for fn in component}
+            distance: Dict[int, int] = {}
+            for fn in component:
+                result = None
+                if fn.blocking:
+                    result = ([], fn.blocking[0], fn.file)
+                else:
+                    for callee in self.callees(fn):
+                        sub = self._memo.get(id(callee)) if id(callee) not in members else None
+                        if sub is not None:
+                            result = ([_display_name(callee)] + sub[0], sub[1], sub[2])
+                            break
+                self._memo[id(fn)] = result
+                if result is not None:
+                    distance[id(fn)] = 0
+            if len(component) == 1:
+                continue
+
+            callers: Dict[int, List[FunctionSummary]] = {}
+            for fn in component:
+                for callee in self.callees(fn):
+                    if id(callee) in members:
+                        callers.setdefault(id(callee), []).append(fn)
+            frontier = [fn for fn in component if id(fn) in distance]
+            step = 0
+            while frontier:
+                step += 1
+                reached = []
+                for fn in frontier:
+                    for caller in callers.get(id(fn), []):
+                        if id(caller) not in distance:
+                            distance[id(caller)] = step
+                            reached.append(caller)
+                for fn in reached:
+                    callee = next(c for c in self.callees(fn) if distance.get(id(c)) == step - 1
+                                  and id(c) in members)
+                    sub = self._memo[id(callee)]
+                    self._memo[id(fn)] = ([_display_name(callee)] + sub[0], sub[1], sub[2])
+                frontier = reached
+
+    def blocking_path(self, fn: FunctionSummary) -> Optional[Tuple[List[str], BlockingCall, str]]:
+        """Return (call chain, blocking call, file) if fn may block, else None."""
+        if not self._solved:
+            self._solve()
+            self._solved = True
+        return self._memo.get(id(fn))
+
+    def async_blocking_paths(self) -> List[BlockingPath]:
+        paths = []
+        for fn in self.summaries:
+            if not fn.is_async:
+                continue
+            found = self.blocking_path(fn)
+            if found is not None:
+                chain, call, call_file = found
+                paths.append(BlockingPath(fn, chain, call, call_file))
+        return paths
+
+
+def _display_name(fn: FunctionSummary) -> str:
+    return f"{fn.owner}::{fn.name}" if fn.owner else fn.name
+
+
+def analyze_crate(root: Path, cache_path: Optional[Path] = None,
+                  walk_stats: Optional[WalkStats] = None) -> Tuple[List[BlockingPath], SummaryCache]:
+    """Summarize every .rs file under root and report blocking async fns."""
+    cache = SummaryCache(cache_path)
+    summaries: List[FunctionSummary] = []
+    seen: Set[str] = set()
+
+    for rust_file in iter_source_files(root, stats=walk_stats):
+        rel_path = rust_file.relative_to(root).as_posix()
+        content = read_source_text(rust_file)
+        summaries.extend(cache.summaries_for(rel_path, content))
+        seen.add(rel_path)
+
+    cache.save(seen)
+    paths = CallGraph(summaries).async_blocking_paths()
+    paths.sort(key=lambda p: (p.function.file, p.function.line))
+    return paths, cache
+
+
+def generate_report(paths: List[BlockingPath], crate_name: str,
+                    walk_stats: Optional[WalkStats] = None) -> str:
+    """Generate markdown report."""
+    report = [f"# Async Blocking Analysis: {crate_name}\n"]
+
+    direct = [p for p in paths if not p.chain]
+    transitive = [p for p in paths if p.chain]
+
+    report.append("## Summary\n")
+    report.append(f"- Async fns blocking directly: {len(direct)} 🔴")
+    report.append(f"- Async fns blocking via helpers: {len(transitive)} 🔴\n")
+
+    if walk_stats is not None:
+        report.append("## Files\n")
+        report.extend(walk_stats.report_lines())
+        report.append("")
+
+    if direct:
+        report.append("## 🔴 Direct Blocking Calls\n")
+        for p in direct:
+            report.append(f"**{p.function.file}:{p.call.line}** `async fn {_display_name(p.function)}` "
+                          f"calls `{p.call.label}`")
+            report.append(f"```rust\n{p.call.code}\n```\n")
+
+    if transitive:
+        report.append("## 🔴 Blocking Through Helpers\n")
+        for p in transitive:
+            chain = ' → '.join([_display_name(p.function)] + p.chain + [p.call.label])
+            report.append(f"**{p.function.file}:{p.function.line}** `{chain}`")
+            report.append(f"- blocking call at {p.call_file}:{p.call.line}")
+            report.append(f"```rust\n{p.call.code}\n```\n")
+
+    report.append("## Fixes\n")
+    report.append("1. Wrap blocking helpers in `tokio::task::spawn_blocking`")
+    report.append("2. Use `tokio::fs`, `tokio::net` and `tokio::process` equivalents")
+    report.append("3. Use the async `reqwest::Client` instead of `reqwest::blocking`")
+    report.append("4. Replace `std::thread::sleep` with `tokio::time::sleep(..).await`\n")
+
+    return '\n'.join(report)
+
+
+def baseline_key(p: BlockingPath):
+    if not p.chain:
+        return 'blocking_direct', p.call.line, p.call.code
+    return 'blocking_via_helper', p.function.line, ' -> '.join(p.chain + [p.call.label])
+
+
+def apply_baseline(gate: BaselineGate, root: Path, paths: List[BlockingPath]) -> List[BlockingPath]:
+    """Run each file's paths (sorted by file) through the baseline gate."""
+    kept: List[BlockingPath] = []
+    start = 0
+    while start < len(paths):
+        end = start
+        while end < len(paths) and paths[end].function.file == paths[start].function.file:
+            end += 1
+        rel_path = paths[start].function.file
+        kept.extend(gate.apply(rel_path, root / rel_path, paths[start:end]))
+        start = end
+    return kept
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: blocking_analyzer.py <crate_dir> [--no-cache] [--baseline FILE [--update-baseline]]")
+        sys.exit(1)
+
+    parser = argparse.ArgumentParser(prog="blocking_analyzer.py")
+    parser.add_argument("root", type=Path)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--baseline", metavar="FILE", type=Path,
+                        help="Report only blocking paths missing from this baseline")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Record the current blocking paths into --baseline instead of reporting")
+    args = parser.parse_args()
+
+    root = args.root
+    if not root.is_dir():
+        print(f"Error: {root} not found")
+        sys.exit(1)
+    if args.update_baseline and not args.baseline:
+        print("Error: --update-baseline needs --baseline FILE")
+        sys.exit(1)
+
+    cache_path = None if args.no_cache else root / DEFAULT_CACHE
+    walk_stats = WalkStats()
+    paths, _cache = analyze_crate(root, cache_path, walk_stats)
+
+    if args.baseline:
+        try:
+            gate = BaselineGate(args.baseline, "async-blocking", baseline_key, update=args.update_baseline)
+        except (OSError, BaselineError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        paths = apply_baseline(gate, root, paths)
+        if gate.update:
+            print(gate.finish())
+            return
+    print(generate_report(paths, root.resolve().name, walk_stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,8 @@ Rust Project Analyzer
 Analyzes Cargo.toml and project structure for best practices.
 """
 
-import re
 import sys
-import tomllib
+import time
 from pathlib import Path
 from dataclasses import dataclass
 from typing import List, Dict, Optional
@@ -41,6 +40,7 @@ class Suggestion:
 
 def parse_cargo_toml(path: Path) -> tuple:
     """Parse Cargo.toml and extract information."""
+    import tomllib  # only needed once a Cargo.toml is found
     content = path.read_text()
     data = tomllib.loads(content)
 
@@ -279,15 +279,38 @@ def generate_report(root: Path) -> str:
     return '\n'.join(report)
 
 
+def watch_main(root: Path, polling: bool = False) -> None:
+    """Re-print the report whenever a Cargo.toml under root is saved."""
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'scripts'))
+    from analysis.watch import watch
+
+    print(generate_report(root))
+
+    def on_change(paths):
+        started = time.perf_counter()
+        report = generate_report(root)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"\n--- {time.strftime('%H:%M:%S')} re-analyzed in {elapsed:.1f} ms ---\n")
+        print(report)
+
+    watch(root, on_change, suffixes=('Cargo.toml',), polling=polling,
+          on_start=lambda kind: print(f"Watching {root} ({kind}), Ctrl-C to stop"))
+
+
 def main():
-    if len(sys.argv) < 2:
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if not args:
         path = Path('.')
     else:
-        path = Path(sys.argv[1])
+        path = Path(args[0])
 
     if path.is_file():
         path = path.parent
 
+    if '--watch' in sys.argv[1:]:
+        watch_main(path, '--poll' in sys.argv[1:])
+        return
+
     print(generate_report(path))
 
 
@@ -4,13 +4,33 @@ Rust Error Handling Analyzer
 Analyzes Rust code for error handling patterns and suggests improvements.
 """
 
-import re
+import argparse
+import time
 import sys
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from enum import Enum
 from typing import List, Tuple, Optional
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'scripts'))
+from analysis.baseline import BaselineError, BaselineGate  # noqa: E402
+from analysis.budget import ScanOutcome, bounded_scan  # noqa: E402
+from analysis.hotspots import HotspotAggregator  # noqa: E402
+from analysis.history import FindingRow, FindingsHistory, HistoryError, current_commit, record, rules_salt  # noqa: E402
+from analysis.incremental import IncrementalAnalysis  # noqa: E402
+from analysis.reader import SourceBuffer, decode_line  # noqa: E402
+from analysis.render import ReportParts, render_sections  # noqa: E402
+from analysis.rulepack import load_rule_pack  # noqa: E402
+from analysis.sampling import SampleError, draw, estimate_totals, format_estimate, parse_sample, score_interval  # noqa: E402
+from analysis.sampling import report_lines as sample_lines  # noqa: E402
+from analysis.shards import PartialWriter, ShardError, merge_partials, parse_shard, select_shard  # noqa: E402
+from analysis.statements import StatementIndex, ends_statement  # noqa: E402
+from analysis.store import FindingStore, severity_counts  # noqa: E402
+from analysis.watch import LiveResults, diff_findings, watch  # noqa: E402
+from analysis.walker import WalkStats, iter_source_files  # noqa: E402
+
+RULE_PACK_PATH = Path(__file__).resolve().parent.parent / 'assets' / 'error-rules.yaml'
+
 
 class ErrorPattern(Enum):
     UNWRAP = "unwrap"
@@ -23,7 +43,13 @@ class ErrorPattern(Enum):
     UNREACHABLE = "unreachable"
 
 
-@dataclass
+@dataclass(frozen=True)
+class CustomPattern:
+    """Pattern for rule-pack rules that have no ErrorPattern member."""
+    value: str
+
+
+@dataclass(slots=True)
 class Finding:
     line_number: int
     pattern: ErrorPattern
@@ -32,106 +58,183 @@ class Finding:
     severity: str  # "info", "warning", "error"
 
 
+_rule_pack = None
+
+
+def get_rule_pack():
+    """Load (once) the compiled rules from assets/error-rules.yaml."""
+    global _rule_pack
+    if _rule_pack is None:
+        _rule_pack = load_rule_pack(RULE_PACK_PATH)
+    return _rule_pack
+
+
+def _pattern_for(rule_id: str):
+    try:
+        return ErrorPattern(rule_id)
+    except ValueError:
+        return CustomPattern(rule_id)
+
+
 def analyze_rust_file(content: str) -> List[Finding]:
     """Analyze Rust code for error handling patterns."""
+    return analyze_buffer(SourceBuffer.from_text(content))
+
+
+def analyze_buffer(buf: SourceBuffer, first: int = 1) -> List[Finding]:
+    """
+    Analyze a (memory-mapped) source buffer, decoding only candidate lines.
+    `first` is the line number of the buffer's first line.
+    """
     findings = []
-    lines = content.split('\n')
+    pack = get_rule_pack()
 
-    for i, line in enumerate(lines, 1):
-        stripped = line.strip()
+    candidates = pack.iter_candidates(buf.data)
+    if candidates is None:
+        candidates = _all_lines(buf)
 
-        # Check for .unwrap() usage
-        if '.unwrap()' in line and not stripped.startswith('//'):
-            findings.append(Finding(
-                line_number=i,
-                pattern=ErrorPattern.UNWRAP,
-                code_snippet=stripped[:80],
-                suggestion="Consider using `?` operator or `unwrap_or_default()` for safer error handling",
-                severity="warning"
-            ))
+    index = None
 
-        # Check for .expect() usage
-        if re.search(r'\.expect\s*\(', line) and not stripped.startswith('//'):
-            findings.append(Finding(
-                line_number=i,
-                pattern=ErrorPattern.EXPECT,
-                code_snippet=stripped[:80],
-                suggestion="Good: expect() provides context. Ensure message is descriptive.",
-                severity="info"
-            ))
+    def statement():
+        # Only files with a chain split over lines pay for the full decode.
+        nonlocal index
+        if ends_statement(line):
+            return None
+        if index is None:
+            index = StatementIndex.from_text(buf.text(), first)
+        return index.span(i)
 
-        # Check for ? operator (positive pattern)
-        if re.search(r'\?\s*[;}\)]', line):
+    base = first - 1
+    for i, start, end in candidates:
+        i += base
+        line = decode_line(buf.data[start:end])
+        for rule, match in pack.match_line(line, statement=statement):
             findings.append(Finding(
                 line_number=i,
-                pattern=ErrorPattern.QUESTION_MARK,
-                code_snippet=stripped[:80],
-                suggestion="Good: Using ? operator for error propagation",
-                severity="info"
+                pattern=_pattern_for(rule.id),
+                code_snippet=line.strip()[:80],
+                suggestion=rule.format_suggestion(i, match),
+                severity=rule.severity
             ))
 
-        # Check for panic!() macro
-        if 'panic!' in line and not stripped.startswith('//'):
-            findings.append(Finding(
-                line_number=i,
-                pattern=ErrorPattern.PANIC,
-                code_snippet=stripped[:80],
-                suggestion="Consider returning Result<T, E> instead of panicking",
-                severity="error"
-            ))
+    return findings
 
-        # Check for map_err usage (positive pattern)
-        if '.map_err(' in line:
-            findings.append(Finding(
-                line_number=i,
-                pattern=ErrorPattern.MAP_ERR,
-                code_snippet=stripped[:80],
-                suggestion="Good: Converting error types with map_err",
-                severity="info"
-            ))
 
-        # Check for ok_or usage
-        if '.ok_or(' in line or '.ok_or_else(' in line:
-            findings.append(Finding(
-                line_number=i,
-                pattern=ErrorPattern.OK_OR,
-                code_snippet=stripped[:80],
-                suggestion="Good: Converting Option to Result",
-                severity="info"
-            ))
+def _all_lines(buf: SourceBuffer):
+    """(line number, start, end) for every line, when no prefilter applies."""
+    offset = 0
+    for i, raw in enumerate(buf.lines(), 1):
+        yield i, offset, offset + len(raw.rstrip(b'\n'))
+        offset += len(raw)
 
-    return findings
+
+def analyze_path(path: Path) -> List[Finding]:
+    """Analyze a file on disk without decoding it as a whole."""
+    with SourceBuffer.open(path) as buf:
+        return analyze_buffer(buf)
+
+
+def scan_region(text: str, first: int, last: int, state: int) -> Tuple[List[Finding], bytes]:
+    """Incremental scanner: rules see up to one statement, so statement ends are restart points."""
+    codes = StatementIndex.from_text(text, first).restart_codes()[:last - first + 1]
+    return analyze_buffer(SourceBuffer.from_text(text), first), codes
+
+
+def moved_finding(f: Finding, delta: int) -> Optional[Finding]:
+    """`f` shifted by `delta` lines, or None if its suggestion names its line."""
+    rule = get_rule_pack().by_id.get(f.pattern.value)
+    if rule is not None and rule.mentions_line:
+        return None
+    return replace(f, line_number=f.line_number + delta)
+
+
+def analyze_incrementally(content: str) -> IncrementalAnalysis[Finding]:
+    """Findings of an editor buffer, updated per edit with `.apply(TextEdit(...))`."""
+    return IncrementalAnalysis(content, scan_region, lambda f: f.line_number, moved_finding)
+
+
+SEVERITIES = ("error", "warning", "info")
+PENALTIES = {"error": 10, "warning": 5, "info": 0}  # score points per finding
+
+
+def score_from_counts(counts) -> int:
+    return max(0, 100 - sum(PENALTIES[s] * counts[s] for s in SEVERITIES))
 
 
-def generate_report(findings: List[Finding], filename: str) -> str:
+def error_handling_score(findings: List[Finding]) -> int:
+    return score_from_counts(severity_counts(findings))
+
+
+def summary_line(findings: List[Finding]) -> str:
+    counts = severity_counts(findings)
+    return (f"Errors: {counts['error']} | Warnings: {counts['warning']} | Info: {counts['info']} | "
+            f"Score: {error_handling_score(findings)}/100")
+
+
+ICONS = {"error": "🔴", "warning": "🟡", "info": "🟢"}
+
+
+def render_finding(f: Finding) -> str:
+    """Markdown block of one finding."""
+    return (f"### {ICONS[f.severity]} Line {f.line_number}: {f.pattern.value}\n\n"
+            f"```rust\n{f.code_snippet}\n```\n"
+            f"**Suggestion:** {f.suggestion}\n")
+
+
+def generate_report(findings: List[Finding], filename: str,
+                    walk_stats: Optional[WalkStats] = None,
+                    baselined: Optional[int] = None,
+                    outcome: Optional[ScanOutcome] = None,
+                    hotspots: Optional[HotspotAggregator] = None) -> str:
     """Generate a markdown report of findings."""
+    return report_parts(findings, filename, walk_stats, baselined, outcome, hotspots).text()
+
+
+def report_parts(findings: List[Finding], filename: str,
+                 walk_stats: Optional[WalkStats] = None,
+                 baselined: Optional[int] = None,
+                 outcome: Optional[ScanOutcome] = None,
+                 hotspots: Optional[HotspotAggregator] = None,
+                 jobs: int = 1) -> ReportParts:
+    """The report of `generate_report`, with the findings rendered on `jobs` processes."""
     report = [f"# Error Handling Analysis: {filename}\n"]
 
+    if outcome is not None and outcome.incomplete:
+        report.append("## ⚠️ Incomplete\n")
+        report.extend(outcome.report_lines())
+        report.append("")
+
     # Summary
-    errors = [f for f in findings if f.severity == "error"]
-    warnings = [f for f in findings if f.severity == "warning"]
-    infos = [f for f in findings if f.severity == "info"]
+    counts = severity_counts(findings)
 
     report.append("## Summary\n")
-    report.append(f"- Errors: {len(errors)}")
-    report.append(f"- Warnings: {len(warnings)}")
-    report.append(f"- Info: {len(infos)}\n")
+    report.append(f"- Errors: {counts['error']}")
+    report.append(f"- Warnings: {counts['warning']}")
+    report.append(f"- Info: {counts['info']}")
+    if baselined is not None:
+        report.append(f"- Baselined (suppressed): {baselined}")
+    report.append("")
+
+    if walk_stats is not None:
+        report.append("## Files\n")
+        report.extend(walk_stats.report_lines())
+        report.append("")
 
     # Score
-    score = 100 - (len(errors) * 10) - (len(warnings) * 5)
-    score = max(0, score)
+    score = error_handling_score(findings)
     report.append(f"**Error Handling Score: {score}/100**\n")
 
+    if hotspots is not None:
+        report.extend(hotspots.report_lines(score_from_counts))
+
+    parts = ReportParts(report)
+
     # Detailed findings
     if findings:
-        report.append("## Findings\n")
-        for f in findings:
-            icon = {"error": "🔴", "warning": "🟡", "info": "🟢"}[f.severity]
-            report.append(f"### {icon} Line {f.line_number}: {f.pattern.value}\n")
-            report.append(f"```rust\n{f.code_snippet}\n```")
-            report.append(f"**Suggestion:** {f.suggestion}\n")
+        parts.sections.append(("## Findings\n", render_sections(findings, render_finding, jobs=jobs)[None]))
 
     # Recommendations
+    report = parts.tail
     report.append("## Best Practices\n")
     report.append("1. Prefer `?` operator over `.unwrap()`")
     report.append("2. Use `.expect()` with descriptive messages")
@@ -139,34 +242,296 @@ def generate_report(findings: List[Finding], filename: str) -> str:
     report.append("4. Use `anyhow` for application-level errors")
     report.append("5. Handle all error cases explicitly\n")
 
+    return parts
+
+
+def generate_sample_report(filename: str, strata, seed: int, counts, outcome: ScanOutcome) -> str:
+    """Markdown report of a --sample run: estimated counts and score with 95% intervals."""
+    report = [f"# Error Handling Analysis: {filename} (sampled)\n"]
+
+    if outcome.incomplete:
+        report.append("## ⚠️ Incomplete\n")
+        report.extend(outcome.report_lines())
+        report.append("")
+
+    report.append("## Sample\n")
+    report.extend(sample_lines(strata, seed, len(counts)))
+    report.append("")
+
+    estimates = estimate_totals(strata, counts, SEVERITIES)
+    report.append("## Estimated Summary\n")
+    report.append(f"- Errors: {format_estimate(estimates['error'])}")
+    report.append(f"- Warnings: {format_estimate(estimates['warning'])}")
+    report.append(f"- Info: {format_estimate(estimates['info'])}")
+    report.append("")
+
+    score = score_interval(score_from_counts, estimates)
+    report.append(f"**Estimated Error Handling Score: {format_estimate(score, '/100')}**\n")
     return '\n'.join(report)
 
 
+def finding_to_dict(f: Finding) -> dict:
+    return {'line': f.line_number, 'pattern': f.pattern.value, 'code': f.code_snippet,
+            'suggestion': f.suggestion, 'severity': f.severity}
+
+
+def finding_row(f: Finding) -> tuple:
+    """FindingStore row; the snippet is re-read from the source when reporting."""
+    return f.line_number, f.pattern.value, f.severity, f.suggestion, f.code_snippet
+
+
+def make_finding(line: int, rule: str, severity: str, suggestion: str, snippet: str) -> Finding:
+    return Finding(line_number=line, pattern=_pattern_for(rule), code_snippet=snippet,
+                   suggestion=suggestion, severity=severity)
+
+
+def new_store() -> FindingStore:
+    return FindingStore(make_finding, snippet_width=80)
+
+
+def finding_from_dict(d: dict) -> Finding:
+    return Finding(
+        line_number=d['line'],
+        pattern=_pattern_for(d['pattern']),
+        code_snippet=d['code'],
+        suggestion=d['suggestion'],
+        severity=d['severity']
+    )
+
+
+def baseline_key(f: Finding):
+    """Baseline fingerprint key; good patterns (info) are never baselined."""
+    if f.severity == "info":
+        return None
+    return f.pattern.value, f.line_number, f.code_snippet
+
+
+def watch_main(root: Path, polling: bool = False) -> None:
+    """Re-analyze only saved .rs files and print a live summary until Ctrl-C."""
+    live = LiveResults(root, analyze_path)
+    live.scan()
+    print(f"{root}: {len(live.results)} files | {summary_line(live.findings())}")
+
+    def on_change(paths):
+        started = time.perf_counter()
+        changes = live.update(paths)
+        if not changes:
+            return
+        elapsed = (time.perf_counter() - started) * 1000
+        stamp = time.strftime('%H:%M:%S')
+        for rel, old, new in changes:
+            added, removed = diff_findings(old, new, lambda f: (f.pattern.value, f.code_snippet))
+            state = "removed" if new is None else f"{len(new)} findings"
+            print(f"[{stamp}] {rel}: {state} (+{len(added)} -{len(removed)})")
+            for f in added:
+                if f.severity != "info":
+                    print(f"  + Line {f.line_number} [{f.pattern.value}] {f.code_snippet}")
+        print(f"  {summary_line(live.findings())} ({len(changes)} file(s) in {elapsed:.1f} ms)")
+
+    watch(root, on_change, suffixes=('.rs',), polling=polling,
+          on_start=lambda kind: print(f"Watching {root} ({kind}), Ctrl-C to stop"))
+
+
+def sample_main(path: Path, title: str, files, sample: Tuple, seed: int, jobs: int,
+                file_timeout: Optional[float], budget: Optional[float]) -> None:
+    """Analyze a stratified sample of the files and print estimates for the whole tree."""
+    strata = draw(select_shard(files, path, None), path, *sample, seed)
+    counts = {}
+    outcome = bounded_scan(
+        [picked for stratum in strata for picked in stratum.sample], analyze_path,
+        jobs=jobs, file_timeout=file_timeout, budget=budget,
+        sink=lambda rust_file, rel, findings: counts.__setitem__(rel, severity_counts(findings)))
+    print(generate_sample_report(title, strata, seed, counts, outcome))
+
+
+def merge_main(partials: List[str]) -> None:
+    """Combine --shard partial results into the single-node report."""
+    try:
+        title, files, walk_stats = merge_partials(partials, "error-handling")
+    except (ShardError, OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    findings = [finding_from_dict(d) for _path, records in files for d in records]
+    print(generate_report(findings, title, walk_stats))
+
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: error_analyzer.py <rust_file.rs>")
-        print("       error_analyzer.py <directory>")
+        print("       error_analyzer.py <directory> [--shard i/N] [-o part.jsonl]")
+        print("       error_analyzer.py <path> --record history.db [--commit SHA]")
+        print("       error_analyzer.py merge <part.jsonl>...")
+        print("       error_analyzer.py <directory> --watch [--poll]")
+        print("       error_analyzer.py <directory> --sample N|P% [--seed S]")
+        print("       error_analyzer.py <directory> --hotspots N")
+        print("       error_analyzer.py <directory> --report-dir DIR [--page-size N]")
         sys.exit(1)
 
-    path = Path(sys.argv[1])
-
-    if path.is_file():
-        content = path.read_text()
-        findings = analyze_rust_file(content)
-        report = generate_report(findings, path.name)
-        print(report)
-    elif path.is_dir():
-        all_findings = []
-        for rust_file in path.rglob("*.rs"):
-            content = rust_file.read_text()
-            findings = analyze_rust_file(content)
-            all_findings.extend(findings)
-        report = generate_report(all_findings, str(path))
-        print(report)
-    else:
+    if sys.argv[1] == 'merge':
+        merge_main(sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(prog="error_analyzer.py")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--shard", metavar="I/N",
+                        help="Analyze only shard I of N and write a partial result")
+    parser.add_argument("-o", "--output", default="-",
+                        help="Partial result file for --shard (default: stdout)")
+    parser.add_argument("--record", metavar="DB", type=Path,
+                        help="Store findings in a SQLite history database instead of printing a report")
+    parser.add_argument("--commit", help="Commit to record under (default: git HEAD)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Watch a directory and re-analyze files as they are saved")
+    parser.add_argument("--poll", action="store_true", help="With --watch, poll instead of using inotify")
+    parser.add_argument("--max-errors", type=int, metavar="N",
+                        help="Stop after N error-level findings and exit with status 1")
+    parser.add_argument("--budget", type=float, metavar="SECONDS",
+                        help="Report partial results, flagged incomplete, after this much time")
+    parser.add_argument("--file-timeout", type=float, default=30.0, metavar="SECONDS",
+                        help="Give up on a single file after this long (default: 30)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Worker processes")
+    parser.add_argument("--baseline", metavar="FILE", type=Path,
+                        help="Report only findings missing from this baseline")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Record the current findings into --baseline instead of reporting")
+    parser.add_argument("--sample", metavar="N|P%",
+                        help="Analyze a stratified random sample of N files (or P%%) and estimate the totals")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for --sample (default: 0)")
+    parser.add_argument("--hotspots", type=int, metavar="N",
+                        help="Summarize findings per crate and rank the N worst files and functions")
+    parser.add_argument("--report-dir", metavar="DIR", type=Path,
+                        help="Write the report as DIR/index.md plus pages of --page-size findings")
+    parser.add_argument("--page-size", type=int, default=1000, metavar="N",
+                        help="Findings per page with --report-dir (default: 1000)")
+    args = parser.parse_args()
+
+    path = args.path
+    if not path.exists():
         print(f"Error: {path} not found")
         sys.exit(1)
 
+    try:
+        shard = parse_shard(args.shard) if args.shard else None
+    except ShardError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    try:
+        sample = parse_sample(args.sample) if args.sample else None
+    except SampleError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if sample is not None and (shard is not None or args.record or args.watch or args.baseline
+                               or args.max_errors is not None):
+        print("Error: --sample cannot be combined with --shard, --record, --watch, --baseline or --max-errors")
+        sys.exit(1)
+
+    if args.hotspots is not None:
+        if args.hotspots < 1 or not path.is_dir():
+            print("Error: --hotspots needs a directory and N >= 1")
+            sys.exit(1)
+        if sample is not None or shard is not None or args.record or args.watch or args.update_baseline:
+            print("Error: --hotspots cannot be combined with --sample, --shard, --record, --watch or --update-baseline")
+            sys.exit(1)
+
+    if args.report_dir is not None:
+        if args.page_size < 1:
+            print("Error: --page-size must be at least 1")
+            sys.exit(1)
+        if sample is not None or shard is not None or args.record or args.watch or args.update_baseline:
+            print("Error: --report-dir cannot be combined with --sample, --shard, --record, --watch or --update-baseline")
+            sys.exit(1)
+
+    if args.watch:
+        if not path.is_dir():
+            print("Error: --watch needs a directory")
+            sys.exit(1)
+        watch_main(path, args.poll)
+        return
+
+    gate = None
+    if args.update_baseline and not args.baseline:
+        print("Error: --update-baseline needs --baseline FILE")
+        sys.exit(1)
+    if args.baseline and (args.record or (args.update_baseline and shard is not None)):
+        print("Error: --baseline cannot be combined with --record, --update-baseline with --shard")
+        sys.exit(1)
+    if args.baseline:
+        try:
+            gate = BaselineGate(args.baseline, "error-handling", baseline_key, update=args.update_baseline)
+        except (OSError, BaselineError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+    title = path.name if path.is_file() else str(path)
+    walk_stats = WalkStats() if path.is_dir() else None
+    files = iter_source_files(path, stats=walk_stats)
+
+    if args.record:
+        if shard is not None:
+            print("Error: --record cannot be combined with --shard")
+            sys.exit(1)
+        try:
+            commit = args.commit or current_commit(path)
+            with FindingsHistory(args.record) as db:
+                run = record(db, "error-handling", path if path.is_dir() else path.parent, title, commit,
+                             select_shard(files, path, None), rules_salt(__file__, RULE_PACK_PATH),
+                             lambda p: [FindingRow(f.pattern.value, f.line_number, f.severity, f.code_snippet) for f in analyze_path(p)])
+        except HistoryError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"Recorded {commit[:12]}: {run.files} files, {run.files - run.reused} analyzed")
+        return
+
+    if sample is not None:
+        sample_main(path, title, files, sample, args.seed, args.jobs, args.file_timeout, args.budget)
+        return
+
+    if shard is not None:
+        writer = PartialWriter(args.output, "error-handling", title, shard)
+        for rust_file, rel in select_shard(files, path, shard):
+            findings = analyze_path(rust_file)
+            if gate is not None:
+                findings = gate.apply(rel, rust_file, findings)
+            writer.add_file(rel, [finding_to_dict(f) for f in findings])
+        writer.close(walk_stats)
+        return
+
+    if gate is not None and gate.update:
+        if args.max_errors is not None or args.budget is not None:
+            print("Error: --update-baseline needs a full scan (no --max-errors/--budget)")
+            sys.exit(1)
+        for rust_file, rel in select_shard(files, path, None):
+            gate.apply(rel, rust_file, analyze_path(rust_file))
+        print(gate.finish())
+        return
+
+    # Findings go into a columnar store as files finish, not a list of objects.
+    store = new_store()
+    hotspots = HotspotAggregator(path, PENALTIES, args.hotspots) if args.hotspots else None
+
+    def sink(rust_file, rel, findings):
+        store.add_file(rel, rust_file, map(finding_row, findings))
+        if hotspots is not None:
+            hotspots.add_file(rust_file, rel, [(f.line_number, f.severity) for f in findings])
+
+    outcome = bounded_scan(
+        select_shard(files, path, None), analyze_path,
+        jobs=args.jobs, file_timeout=args.file_timeout, budget=args.budget, max_hits=args.max_errors,
+        hits=lambda findings: sum(1 for f in findings if f.severity == "error"),
+        post=(lambda rust_file, rel, findings: gate.apply(rel, rust_file, findings)) if gate is not None else None,
+        sink=sink)
+    # Rendering reuses the analysis workers' count; findings are partitioned in one pass.
+    parts = report_parts(store, title, walk_stats, gate.suppressed if gate is not None else None,
+                         outcome, hotspots, jobs=args.jobs)
+    if args.report_dir is not None:
+        written = parts.write_pages(args.report_dir, args.page_size)
+        print(f"Wrote {args.report_dir / 'index.md'} and {len(written) - 1} page(s) of findings")
+    else:
+        parts.write(sys.stdout)
+    if args.max_errors is not None and outcome.hits >= args.max_errors:
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
@@ -5,13 +5,23 @@ Ownership Pattern Checker for Rust Code
 This script analyzes Rust code for common ownership patterns and issues.
 """
 
+import argparse
 import re
 import sys
+from pathlib import Path
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Set
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'scripts'))
+from analysis.baseline import BaselineError, BaselineGate, baseline_name  # noqa: E402
+from analysis.reader import read_source_text  # noqa: E402
+from analysis.rulepack import load_rule_pack  # noqa: E402
+from analysis.statements import StatementIndex, ends_statement  # noqa: E402
 
-@dataclass
+RULE_PACK_PATH = Path(__file__).resolve().parent.parent / 'assets' / 'ownership-rules.yaml'
+
+
+@dataclass(slots=True)
 class OwnershipIssue:
     line: int
     issue_type: str
@@ -19,85 +29,71 @@ class OwnershipIssue:
     suggestion: str
 
 
-def check_unnecessary_clone(code: str) -> List[OwnershipIssue]:
-    """Check for potentially unnecessary .clone() calls."""
-    issues = []
-    lines = code.split('\n')
+_rule_pack = None
 
-    for i, line in enumerate(lines, 1):
-        # Pattern: variable.clone() immediately passed to function
-        if '.clone()' in line:
-            # Check if it's passed to a function that could take reference
-            if re.search(r'\.clone\(\)\s*\)', line):
-                issues.append(OwnershipIssue(
-                    line=i,
-                    issue_type="UNNECESSARY_CLONE",
-                    message=f"Possible unnecessary clone on line {i}",
-                    suggestion="Consider passing a reference (&) instead of cloning"
-                ))
 
-    return issues
+def get_rule_pack():
+    """Load (once) the compiled rules from assets/ownership-rules.yaml."""
+    global _rule_pack
+    if _rule_pack is None:
+        _rule_pack = load_rule_pack(RULE_PACK_PATH)
+    return _rule_pack
 
 
-def check_move_in_loop(code: str) -> List[OwnershipIssue]:
-    """Check for potential move issues in loops."""
+def run_rule_pack(code: str, only: Optional[Set[str]] = None) -> List[OwnershipIssue]:
+    """Run the declarative rules over the code in one pass."""
+    pack = get_rule_pack()
     issues = []
     lines = code.split('\n')
 
     in_loop = False
-    loop_start = 0
-    loop_vars = set()
+    index = None
+
+    def statement():
+        # `.clone()` and its closing `)` may sit on different lines of a chain.
+        nonlocal index
+        if ends_statement(line):
+            return None
+        if index is None:
+            index = StatementIndex(lines)
+        return index.span(i)
 
     for i, line in enumerate(lines, 1):
-        # Detect loop start
+        # Same loop tracking as before: a loop header opens the context and
+        # the first closing brace ends it.
         if re.search(r'\b(for|while|loop)\b', line):
             in_loop = True
-            loop_start = i
-            # Extract variables used before loop
-
-        # Check for potential move inside loop
-        if in_loop and not line.strip().startswith('//'):
-            # Pattern: using a variable that might be moved
-            match = re.search(r'(\w+)\.into\(\)', line)
-            if match:
-                issues.append(OwnershipIssue(
-                    line=i,
-                    issue_type="MOVE_IN_LOOP",
-                    message=f"Potential move in loop on line {i}: {match.group(1)}",
-                    suggestion="Clone the value or use a reference"
-                ))
+
+        contexts = ('loop',) if in_loop else ()
+        for rule, match in pack.match_line(line, contexts, only, statement):
+            issues.append(OwnershipIssue(
+                line=i,
+                issue_type=rule.id,
+                message=rule.format_message(i, match),
+                suggestion=rule.format_suggestion(i, match)
+            ))
 
         if '}' in line and in_loop:
             in_loop = False
 
+    # Keep the report grouped by rule, as the per-check functions did.
+    issues.sort(key=lambda issue: pack.by_id[issue.issue_type].order)
     return issues
 
 
-def check_dangling_reference(code: str) -> List[OwnershipIssue]:
-    """Check for patterns that might create dangling references."""
-    issues = []
-    lines = code.split('\n')
+def check_unnecessary_clone(code: str) -> List[OwnershipIssue]:
+    """Check for potentially unnecessary .clone() calls."""
+    return run_rule_pack(code, {'UNNECESSARY_CLONE'})
 
-    for i, line in enumerate(lines, 1):
-        # Pattern: returning reference to local variable
-        if '-> &' in line or "-> &'" in line:
-            # Check next few lines for local variable creation
-            for j in range(i, min(i + 10, len(lines))):
-                if 'let ' in lines[j-1] and '&' in lines[j-1]:
-                    # Possible dangling reference
-                    pass
-
-    # Pattern: reference to temporary
-    for i, line in enumerate(lines, 1):
-        if re.search(r'&\s*\w+\s*::\s*new\s*\(', line):
-            issues.append(OwnershipIssue(
-                line=i,
-                issue_type="TEMP_REFERENCE",
-                message=f"Reference to temporary value on line {i}",
-                suggestion="Store the value in a variable first"
-            ))
 
-    return issues
+def check_move_in_loop(code: str) -> List[OwnershipIssue]:
+    """Check for potential move issues in loops."""
+    return run_rule_pack(code, {'MOVE_IN_LOOP'})
+
+
+def check_dangling_reference(code: str) -> List[OwnershipIssue]:
+    """Check for patterns that might create dangling references."""
+    return run_rule_pack(code, {'TEMP_REFERENCE'})
 
 
 def check_borrow_conflicts(code: str) -> List[OwnershipIssue]:
@@ -126,18 +122,22 @@ def check_borrow_conflicts(code: str) -> List[OwnershipIssue]:
 
 def analyze_rust_file(filepath: str) -> List[OwnershipIssue]:
     """Analyze a Rust file for ownership issues."""
-    with open(filepath, 'r') as f:
-        code = f.read()
+    return analyze_code(read_source_text(filepath))
 
+
+def analyze_code(code: str) -> List[OwnershipIssue]:
+    """Analyze Rust source text for ownership issues."""
     issues = []
-    issues.extend(check_unnecessary_clone(code))
-    issues.extend(check_move_in_loop(code))
-    issues.extend(check_dangling_reference(code))
+    issues.extend(run_rule_pack(code))
     issues.extend(check_borrow_conflicts(code))
 
     return issues
 
 
+def baseline_key(issue: OwnershipIssue):
+    return issue.issue_type, issue.line, None
+
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: python ownership_checker.py <rust_file.rs>")
@@ -148,9 +148,33 @@ def main():
         print("  - Borrow conflicts")
         sys.exit(1)
 
-    filepath = sys.argv[1]
+    parser = argparse.ArgumentParser(prog="ownership_checker.py")
+    parser.add_argument("filepath")
+    parser.add_argument("--baseline", metavar="FILE", type=Path,
+                        help="Report only issues missing from this baseline")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Record the current issues into --baseline instead of reporting")
+    args = parser.parse_args()
+    if args.update_baseline and not args.baseline:
+        print("Error: --update-baseline needs --baseline FILE")
+        sys.exit(1)
+
+    filepath = args.filepath
     issues = analyze_rust_file(filepath)
 
+    if args.baseline:
+        try:
+            gate = BaselineGate(args.baseline, "ownership-borrowing", baseline_key, update=args.update_baseline)
+        except (OSError, BaselineError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        issues = gate.apply(baseline_name(filepath), filepath, issues)
+        if gate.update:
+            print(gate.finish())
+            return
+        if gate.suppressed:
+            print(f"({gate.suppressed} baselined issue(s) suppressed)")
+
     if not issues:
         print(f"✓ No ownership issues found in {filepath}")
     else:
@@ -6,8 +6,6 @@ Category: containers
 
 import os
 import sys
-import yaml
-import json
 from pathlib import Path
 
 
@@ -26,6 +24,8 @@ def validate_config(config_path: str) -> dict:
     if not os.path.exists(config_path):
         return {"valid": False, "errors": ["Config file not found"]}
 
+    import yaml  # only needed when the skill has a config.yaml
+
     try:
         with open(config_path, 'r') as f:
             config = yaml.safe_load(f)
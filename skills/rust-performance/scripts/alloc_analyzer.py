@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Hot-Loop Allocation Detector for Rust Code
+
+This script finds heap allocations inside loop bodies - the most common
+source of avoidable CPU time in Rust services.
+"""
+
+import argparse
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'scripts'))
+from analysis.baseline import BaselineError, BaselineGate, baseline_name  # noqa: E402
+
+
+@dataclass
+class AllocationIssue:
+    line: int
+    issue_type: str
+    message: str
+    suggestion: str
+    loop_line: int
+
+
+# Allocating expressions worth flagging when evaluated once per iteration.
+ALLOCATORS = [
+    ('Vec::new()', re.compile(r'\bVec::(?:new|default)\(\)')),
+    ('vec![...]', re.compile(r'\bvec!\s*\[')),
+    ('String::new()', re.compile(r'\bString::(?:new|from)\(')),
+    ('format!', re.compile(r'\bformat!\s*\(')),
+    ('.to_string()', re.compile(r'\.to_string\(\)')),
+    ('.to_owned()', re.compile(r'\.to_owned\(\)')),
+    ('.collect()', re.compile(r'\.collect(?:::<[^>]*>+)?\(\)')),
+    ('.clone()', re.compile(r'\.clone\(\)')),
+]
+
+LOOP_KEYWORD = re.compile(r'\b(?:for(?=\s)|while\b|loop\b)|\.for_each\s*\(')
+IN_KEYWORD = re.compile(r'(?<=\s)in\b')
+BOX_NEW = re.compile(r'\bBox::new\s*\(')
+GROWABLE_DECL = re.compile(
+    r'\blet\s+mut\s+(\w+)\s*(?::\s*[^=]{1,200})?=\s*'
+    r'(?:Vec::new\(\)|Vec::default\(\)|vec!\s*\[\s*\]|String::new\(\))'
+)
+CAPACITY_DECL = re.compile(r'\blet\s+mut\s+(\w+)\s*(?::\s*[^=]{1,200})?=\s*\w+::with_capacity\(')
+GROWTH_CALL = re.compile(r'\b(\w+)\.(push|push_str|extend|extend_from_slice|insert)\s*\(')
+
+
+def strip_comments_and_strings(code: str) -> List[str]:
+    """
+    Blank out comments and string/char literal contents, keeping line breaks.
+
+    The result has the same number of lines as the input, so line numbers
+    computed on it map 1:1 to the source.
+    """
+    out = []
+    i = 0
+    n = len(code)
+    block_depth = 0
+
+    while i < n:
+        ch = code[i]
+        nxt = code[i + 1] if i + 1 < n else ''
+
+        if block_depth:
+            if ch == '*' and nxt == '/':
+                block_depth -= 1
+                i += 2
+            elif ch == '/' and nxt == '*':
+                block_depth += 1
+                i += 2
+            else:
+                if ch == '\n':
+                    out.append('\n')
+                i += 1
+            continue
+
+        if ch == '/' and nxt == '/':
+            end = code.find('\n', i)
+            i = n if end == -1 else end
+            continue
+        if ch == '/' and nxt == '*':
+            block_depth = 1
+            i += 2
+            continue
+
+        raw = re.match(r'b?r(#*)"', code[i:i + 260]) if ch in 'br' else None
+        if raw and (i == 0 or not (code[i - 1].isalnum() or code[i - 1] == '_')):
+            terminator = '"' + raw.group(1)
+            end = code.find(terminator, i + raw.end())
+            end = n if end == -1 else end + len(terminator)
+            out.append('""' + '\n' * code.count('\n', i, end))
+            i = end
+            continue
+
+        if ch == '"':
+            j = i + 1
+            while j < n and code[j] != '"':
+                j += 2 if code[j] == '\\' else 1
+            out.append('""' + '\n' * code.count('\n', i, j))
+            i = j + 1
+            continue
+
+        if ch == "'":
+            char_lit = re.match(r"'(?:\\(?:u\{[0-9a-fA-F]+\}|x[0-9a-fA-F]{2}|.)|[^\\'\n])'", code[i:i + 12])
+            if char_lit:
+                out.append("' '")
+                i += char_lit.end()
+                continue
+
+        out.append(ch)
+        i += 1
+
+    return ''.join(out).split('\n')
+
+
+def loop_heads(line: str) -> List[int]:
+    """
+    Columns where a loop header starts: `while`, `loop`, `.for_each(`, and
+    `for` followed (after at least `for x`) by an `in` keyword.
+
+    A single `for\\s+.+?\\s+in\\b` regex rescans the rest of the line from
+    every `for` that has no `in` after it; here each `for` is paired with the
+    next `in` from one precomputed, forward-only list.
+    """
+    ins = [m.start() for m in IN_KEYWORD.finditer(line)]
+    heads = []
+    pos = 0
+    k = 0
+    while True:
+        match = LOOP_KEYWORD.search(line, pos)
+        if match is None:
+            return heads
+        start = match.start()
+        if match.group() == 'for':
+            # `for` + whitespace + at least one pattern character + whitespace
+            while k < len(ins) and ins[k] < start + 6:
+                k += 1
+            if k == len(ins):
+                pos = match.end()
+                continue
+            heads.append(start)
+            pos = ins[k] + 2
+        else:
+            heads.append(start)
+            pos = match.end()
+
+
+def find_loop_regions(lines: List[str]) -> List[Optional[Tuple[int, int, int]]]:
+    """
+    Map each (sanitized) line to the part of it that runs inside a loop body.
+
+    Returns, per line, `(start_column, loop_line, nesting)` for the innermost
+    loop whose body covers the line, or None when the line is outside loops.
+    Loop bodies are tracked by brace depth, so nested blocks (`if`, `match`)
+    inside a loop stay attributed to it until the loop's closing brace.
+    """
+    regions: List[Optional[Tuple[int, int, int]]] = []
+    depth = 0
+    loop_stack: List[Tuple[int, int]] = []  # (body brace depth, loop line)
+    pending_loop: Optional[int] = None
+
+    for i, line in enumerate(lines, 1):
+        region = (0, loop_stack[-1][1], len(loop_stack)) if loop_stack else None
+
+        heads = loop_heads(line)
+        head_idx = 0
+        for col, ch in enumerate(line):
+            while head_idx < len(heads) and heads[head_idx] <= col:
+                pending_loop = i
+                head_idx += 1
+            if ch == '{':
+                depth += 1
+                if pending_loop is not None:
+                    loop_stack.append((depth, pending_loop))
+                    pending_loop = None
+                    if region is None:
+                        region = (col + 1, loop_stack[-1][1], len(loop_stack))
+                    else:
+                        region = (region[0], region[1], max(region[2], len(loop_stack)))
+            elif ch == '}':
+                while loop_stack and loop_stack[-1][0] >= depth:
+                    loop_stack.pop()
+                depth = max(0, depth - 1)
+            elif ch == ';':
+                # `.for_each(|x| f(x));` never opened a body
+                pending_loop = None
+
+        regions.append(region)
+
+    return regions
+
+
+def check_allocation_in_loop(lines: List[str], regions) -> List[AllocationIssue]:
+    """Check for allocating expressions evaluated on every loop iteration."""
+    issues = []
+
+    for i, (line, region) in enumerate(zip(lines, regions), 1):
+        if region is None:
+            continue
+        start, loop_line, nesting = region
+        body = line[start:]
+
+        found = [label for label, pattern in ALLOCATORS if pattern.search(body)]
+        if found:
+            where = f"loop at line {loop_line}" + (f" (nesting {nesting})" if nesting > 1 else "")
+            issues.append(AllocationIssue(
+                line=i,
+                issue_type="ALLOC_IN_LOOP",
+                message=f"Allocation in {where}: {', '.join(found)}",
+                suggestion="Hoist the allocation out of the loop and reuse it (`clear()`), "
+                           "or borrow instead of cloning",
+                loop_line=loop_line
+            ))
+
+    return issues
+
+
+def check_growth_without_capacity(lines: List[str], regions) -> List[AllocationIssue]:
+    """Check for Vec/String declared without capacity and then grown in a loop."""
+    issues = []
+    growable: Dict[str, int] = {}
+    reported = set()
+
+    for i, (line, region) in enumerate(zip(lines, regions), 1):
+        for match in CAPACITY_DECL.finditer(line):
+            growable.pop(match.group(1), None)
+        for match in GROWABLE_DECL.finditer(line):
+            # Declared inside the loop it grows in -> already an ALLOC_IN_LOOP
+            if region is None or match.start() < region[0]:
+                growable[match.group(1)] = i
+            else:
+                growable.pop(match.group(1), None)
+
+        if region is None:
+            continue
+        for match in GROWTH_CALL.finditer(line[region[0]:]):
+            name = match.group(1)
+            decl_line = growable.get(name)
+            if decl_line is None or (name, decl_line) in reported:
+                continue
+            reported.add((name, decl_line))
+            issues.append(AllocationIssue(
+                line=i,
+                issue_type="GROWTH_WITHOUT_CAPACITY",
+                message=f"`{name}` (declared line {decl_line}) grows with "
+                        f"`.{match.group(2)}()` in loop at line {region[1]}",
+                suggestion=f"Pre-size with `with_capacity(n)` or `{name}.reserve(n)` before the loop",
+                loop_line=region[1]
+            ))
+
+    return issues
+
+
+def check_box_in_loop(lines: List[str], regions) -> List[AllocationIssue]:
+    """Check for Box::new inside loop bodies."""
+    issues = []
+
+    for i, (line, region) in enumerate(zip(lines, regions), 1):
+        if region is not None and BOX_NEW.search(line[region[0]:]):
+            issues.append(AllocationIssue(
+                line=i,
+                issue_type="BOX_IN_LOOP",
+                message=f"Heap allocation with Box::new in loop at line {region[1]}",
+                suggestion="Store values inline (enum, generics, arena, or `Vec<T>`) "
+                           "instead of boxing per iteration",
+                loop_line=region[1]
+            ))
+
+    return issues
+
+
+def analyze_source(code: str) -> List[AllocationIssue]:
+    """Analyze Rust source text for allocations in loops."""
+    lines = strip_comments_and_strings(code)
+    regions = find_loop_regions(lines)
+
+    issues = []
+    issues.extend(check_allocation_in_loop(lines, regions))
+    issues.extend(check_growth_without_capacity(lines, regions))
+    issues.extend(check_box_in_loop(lines, regions))
+    issues.sort(key=lambda issue: issue.line)
+
+    return issues
+
+
+def analyze_rust_file(filepath: str) -> List[AllocationIssue]:
+    """Analyze a Rust file for allocations in loops."""
+    with open(filepath, 'r') as f:
+        code = f.read()
+
+    return analyze_source(code)
+
+
+def baseline_key(issue: AllocationIssue):
+    return issue.issue_type, issue.line, None
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python alloc_analyzer.py <rust_file.rs>")
+        print("\nThis tool checks for allocations in loop bodies:")
+        print("  - Vec::new() / String::new() / format! / .to_string()")
+        print("  - .collect() and .clone() per iteration")
+        print("  - Vec/String growth without with_capacity")
+        print("  - Box::new in loops")
+        sys.exit(1)
+
+    parser = argparse.ArgumentParser(prog="alloc_analyzer.py")
+    parser.add_argument("filepath")
+    parser.add_argument("--baseline", metavar="FILE", type=Path,
+                        help="Report only issues missing from this baseline")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Record the current issues into --baseline instead of reporting")
+    args = parser.parse_args()
+    if args.update_baseline and not args.baseline:
+        print("Error: --update-baseline needs --baseline FILE")
+        sys.exit(1)
+
+    filepath = args.filepath
+    issues = analyze_rust_file(filepath)
+
+    if args.baseline:
+        try:
+            gate = BaselineGate(args.baseline, "rust-performance", baseline_key, update=args.update_baseline)
+        except (OSError, BaselineError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        issues = gate.apply(baseline_name(filepath), filepath, issues)
+        if gate.update:
+            print(gate.finish())
+            return
+        if gate.suppressed:
+            print(f"({gate.suppressed} baselined issue(s) suppressed)")
+
+    if not issues:
+        print(f"✓ No loop allocations found in {filepath}")
+    else:
+        print(f"Found {len(issues)} potential issue(s) in {filepath}:\n")
+        for issue in issues:
+            print(f"Line {issue.line}: [{issue.issue_type}]")
+            print(f"  {issue.message}")
+            print(f"  Suggestion: {issue.suggestion}\n")
+
+
+if __name__ == "__main__":
+    main()
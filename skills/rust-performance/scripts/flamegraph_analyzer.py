@@ -0,0 +1,582 @@
+#!/usr/bin/env python3
+"""
+Rust Flamegraph Profile Analyzer
+Aggregates folded stack files (`perf script | stackcollapse-perf.pl`,
+`cargo flamegraph` intermediate output) into per-function self/total time
+and diffs two profiles to show which functions grew.
+"""
+
+import argparse
+import re
+import sys
+from array import array
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+OTHER_SYMBOL = "[other]"
+DEFAULT_MAX_SYMBOLS = 200_000
+
+
+# ---------------------------------------------------------------------------
+# Demangling
+# ---------------------------------------------------------------------------
+
+_LEGACY_ESCAPES = {
+    "$SP$": "@", "$BP$": "*", "$RF$": "&", "$LT$": "<", "$GT$": ">",
+    "$LP$": "(", "$RP$": ")", "$C$": ",",
+}
+_LEGACY_ESCAPE_RE = re.compile(r'\$(?:SP|BP|RF|LT|GT|LP|RP|C|u[0-9a-f]{1,6})\$')
+_LEGACY_HASH_RE = re.compile(r'^h[0-9a-f]{16}$')
+_LLVM_SUFFIX_RE = re.compile(r'\.llvm\.\d+$')
+
+_V0_BASIC_TYPES = {
+    'a': 'i8', 'b': 'bool', 'c': 'char', 'd': 'f64', 'e': 'str', 'f': 'f32',
+    'h': 'u8', 'i': 'isize', 'j': 'usize', 'l': 'i32', 'm': 'u32',
+    'n': 'i128', 'o': 'u128', 's': 'i16', 't': 'u16', 'u': '()', 'v': '...',
+    'x': 'i64', 'y': 'u64', 'z': '!', 'p': '_',
+}
+
+
+def _unescape_legacy(ident: str) -> str:
+    def repl(match: re.Match) -> str:
+        token = match.group(0)
+        if token in _LEGACY_ESCAPES:
+            return _LEGACY_ESCAPES[token]
+        return chr(int(token[2:-1], 16))
+
+    if ident.startswith('_$'):
+        ident = ident[1:]
+    return _LEGACY_ESCAPE_RE.sub(repl, ident).replace('..', '::')
+
+
+def demangle_legacy(symbol: str) -> Optional[str]:
+    """Demangle a legacy (`_ZN...E`) Rust symbol, dropping the hash suffix."""
+    if symbol.startswith('__ZN'):
+        symbol = symbol[1:]
+    if not symbol.startswith('_ZN'):
+        return None
+    symbol = _LLVM_SUFFIX_RE.sub('', symbol)
+
+    parts = []
+    pos = 3
+    while pos < len(symbol) and symbol[pos] != 'E':
+        start = pos
+        while pos < len(symbol) and symbol[pos].isdigit():
+            pos += 1
+        if start == pos:
+            return None
+        length = int(symbol[start:pos])
+        ident = symbol[pos:pos + length]
+        if len(ident) != length:
+            return None
+        parts.append(ident)
+        pos += length
+    if pos >= len(symbol) or not parts:
+        return None
+
+    if len(parts) > 1 and _LEGACY_HASH_RE.match(parts[-1]):
+        parts.pop()
+    return '::'.join(_unescape_legacy(p) for p in parts)
+
+
+class _V0Demangler:
+    """Recursive-descent parser for the Rust v0 mangling scheme (`_R...`)."""
+
+    def __init__(self, mangled: str):
+        self.s = mangled
+        self.pos = 0
+        self.depth = 0
+
+    def peek(self) -> str:
+        return self.s[self.pos] if self.pos < len(self.s) else ''
+
+    def next(self) -> str:
+        if self.pos >= len(self.s):
+            raise ValueError("unexpected end of symbol")
+        ch = self.s[self.pos]
+        self.pos += 1
+        return ch
+
+    def eat(self, ch: str) -> bool:
+        if self.peek() == ch:
+            self.pos += 1
+            return True
+        return False
+
+    def base62(self) -> int:
+        if self.eat('_'):
+            return 0
+        value = 0
+        while True:
+            ch = self.next()
+            if ch == '_':
+                return value + 1
+            if ch.isdigit():
+                digit = ord(ch) - ord('0')
+            elif 'a' <= ch <= 'z':
+                digit = 10 + ord(ch) - ord('a')
+            elif 'A' <= ch <= 'Z':
+                digit = 36 + ord(ch) - ord('A')
+            else:
+                raise ValueError(f"invalid base-62 digit {ch!r}")
+            value = value * 62 + digit
+
+    def opt_base62(self, tag: str) -> int:
+        return self.base62() + 1 if self.eat(tag) else 0
+
+    def decimal(self) -> int:
+        start = self.pos
+        while self.peek().isdigit():
+            self.pos += 1
+        if start == self.pos:
+            raise ValueError("expected decimal number")
+        return int(self.s[start:self.pos])
+
+    def ident(self) -> str:
+        is_punycode = self.eat('u')
+        length = self.decimal()
+        self.eat('_')
+        raw = self.s[self.pos:self.pos + length]
+        if len(raw) != length:
+            raise ValueError("identifier overruns symbol")
+        self.pos += length
+        if is_punycode:
+            ascii_part, _, encoded = raw.rpartition('_')
+            try:
+                return (ascii_part + '-' + encoded if ascii_part else encoded).encode().decode('punycode')
+            except UnicodeError:
+                return raw
+        return raw
+
+    def backref(self, parse) -> str:
+        target = self.base62()
+        if target >= self.pos - 1:
+            raise ValueError("forward backref")
+        saved = self.pos
+        self.pos = target
+        try:
+            return parse()
+        finally:
+            self.pos = saved
+
+    def enter(self) -> None:
+        self.depth += 1
+        if self.depth > 200:
+            raise ValueError("symbol nests too deeply")
+
+    def path(self) -> str:
+        self.enter()
+        try:
+            tag = self.next()
+            if tag == 'C':
+                self.opt_base62('s')
+                return self.ident()
+            if tag == 'M':
+                self.opt_base62('s')
+                self.path()
+                return f"<{self.type()}>"
+            if tag == 'X':
+                self.opt_base62('s')
+                self.path()
+                self_ty = self.type()
+                return f"<{self_ty} as {self.path()}>"
+            if tag == 'Y':
+                self_ty = self.type()
+                return f"<{self_ty} as {self.path()}>"
+            if tag == 'N':
+                ns = self.next()
+                parent = self.path()
+                disambiguator = self.opt_base62('s')
+                name = self.ident()
+                if ns == 'C':
+                    return f"{parent}::{{closure#{disambiguator}}}"
+                if ns == 'S':
+                    return f"{parent}::{{shim:{name}#{disambiguator}}}"
+                if ns.isupper():
+                    return f"{parent}::{{{ns}:{name}#{disambiguator}}}"
+                return f"{parent}::{name}" if name else parent
+            if tag == 'I':
+                base = self.path()
+                args = []
+                while not self.eat('E'):
+                    args.append(self.generic_arg())
+                return f"{base}::<{', '.join(args)}>"
+            if tag == 'B':
+                return self.backref(self.path)
+            raise ValueError(f"invalid path tag {tag!r}")
+        finally:
+            self.depth -= 1
+
+    def generic_arg(self) -> str:
+        if self.eat('L'):
+            self.base62()
+            return "'_"
+        if self.eat('K'):
+            return self.const()
+        return self.type()
+
+    def const(self) -> str:
+        if self.eat('p'):
+            return '_'
+        if self.eat('B'):
+            return self.backref(self.const)
+        ty = self.type()
+        negative = self.eat('n')
+        start = self.pos
+        while self.peek() and self.peek() != '_':
+            self.pos += 1
+        digits = self.s[start:self.pos]
+        self.next()
+        if ty == 'bool':
+            return 'true' if digits == '1' else 'false'
+        if ty == 'char':
+            return repr(chr(int(digits or '0', 16)))
+        value = int(digits or '0', 16)
+        return f"{'-' if negative else ''}{value}"
+
+    def binder(self) -> None:
+        self.opt_base62('G')
+
+    def type(self) -> str:
+        self.enter()
+        try:
+            tag = self.next()
+            if tag in _V0_BASIC_TYPES:
+                return _V0_BASIC_TYPES[tag]
+            if tag == 'R' or tag == 'Q':
+                if self.peek() == 'L':
+                    self.next()
+                    self.base62()
+                return ('&' if tag == 'R' else '&mut ') + self.type()
+            if tag == 'P' or tag == 'O':
+                return ('*const ' if tag == 'P' else '*mut ') + self.type()
+            if tag == 'A':
+                inner = self.type()
+                return f"[{inner}; {self.const()}]"
+            if tag == 'S':
+                return f"[{self.type()}]"
+            if tag == 'T':
+                items = []
+                while not self.eat('E'):
+                    items.append(self.type())
+                return f"({', '.join(items)}{',' if len(items) == 1 else ''})"
+            if tag == 'F':
+                self.binder()
+                unsafe = 'unsafe ' if self.eat('U') else ''
+                abi = ''
+                if self.eat('K'):
+                    abi = 'extern "C" ' if self.eat('C') else f'extern "{self.ident()}" '
+                params = []
+                while not self.eat('E'):
+                    params.append(self.type())
+                ret = self.type()
+                suffix = '' if ret == '()' else f" -> {ret}"
+                return f"{unsafe}{abi}fn({', '.join(params)}){suffix}"
+            if tag == 'D':
+                self.binder()
+                bounds = []
+                while not self.eat('E'):
+                    bound = self.path()
+                    while self.eat('p'):
+                        name = self.ident()
+                        bound += f"<{name} = {self.type()}>"
+                    bounds.append(bound)
+                if self.eat('L'):
+                    self.base62()
+                return 'dyn ' + ' + '.join(bounds)
+            if tag == 'B':
+                return self.backref(self.type)
+            self.pos -= 1
+            return self.path()
+        finally:
+            self.depth -= 1
+
+    def symbol(self) -> str:
+        if self.peek().isdigit():
+            self.decimal()
+        return self.path()
+
+
+def demangle_v0(symbol: str) -> Optional[str]:
+    """Demangle a Rust v0 (`_R...`) symbol; returns None if it does not parse."""
+    if symbol.startswith('__R'):
+        symbol = symbol[1:]
+    if not symbol.startswith('_R'):
+        return None
+    symbol = _LLVM_SUFFIX_RE.sub('', symbol)
+    try:
+        return _V0Demangler(symbol[2:]).symbol()
+    except (ValueError, RecursionError):
+        return None
+
+
+def demangle(symbol: str) -> str:
+    """Demangle a Rust symbol (v0 or legacy); other frames pass through."""
+    if symbol.startswith(('_R', '__R')):
+        return demangle_v0(symbol) or symbol
+    if symbol.startswith(('_ZN', '__ZN')):
+        return demangle_legacy(symbol) or symbol
+    return symbol
+
+
+# ---------------------------------------------------------------------------
+# Aggregation
+# ---------------------------------------------------------------------------
+
+class SymbolTable:
+    """
+    Interns demangled symbol names into dense integer ids.
+
+    Sample counters live in flat `array`s indexed by id, so memory grows with
+    the number of distinct functions rather than with the size of the profile.
+    Once `max_symbols` is reached, unseen frames are folded into `[other]`.
+    """
+
+    def __init__(self, max_symbols: int = DEFAULT_MAX_SYMBOLS):
+        self.max_symbols = max_symbols
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self._raw_ids: Dict[str, int] = {}
+        self.self_samples = array('q')
+        self.total_samples = array('q')
+        self.other_id = self._add(OTHER_SYMBOL)
+
+    def _add(self, name: str) -> int:
+        sym_id = len(self.names)
+        self.names.append(name)
+        self.ids[name] = sym_id
+        self.self_samples.append(0)
+        self.total_samples.append(0)
+        return sym_id
+
+    def intern(self, raw_frame: str) -> int:
+        sym_id = self._raw_ids.get(raw_frame)
+        if sym_id is not None:
+            return sym_id
+        if len(self._raw_ids) >= self.max_symbols:
+            return self.other_id
+
+        name = demangle(raw_frame)
+        sym_id = self.ids.get(name)
+        if sym_id is None:
+            sym_id = self._add(name)
+        self._raw_ids[raw_frame] = sym_id
+        return sym_id
+
+
+@dataclass
+class Profile:
+    source: str
+    symbols: SymbolTable
+    total: int
+    stacks: int
+    malformed: int
+
+    def samples(self, name: str) -> Tuple[int, int]:
+        sym_id = self.symbols.ids.get(name)
+        if sym_id is None:
+            return 0, 0
+        return self.symbols.self_samples[sym_id], self.symbols.total_samples[sym_id]
+
+
+def iter_folded_lines(path: Path) -> Iterable[str]:
+    """Yield folded-stack lines one at a time without loading the file."""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if line:
+                yield line
+
+
+def load_profile(lines: Iterable[str], source: str = "<stdin>",
+                 max_symbols: int = DEFAULT_MAX_SYMBOLS) -> Profile:
+    """Aggregate folded stacks (`frame;frame;frame count`) into self/total time."""
+    symbols = SymbolTable(max_symbols)
+    self_samples = symbols.self_samples
+    total_samples = symbols.total_samples
+    total = stacks = malformed = 0
+
+    for line in lines:
+        stack, _, count_str = line.rpartition(' ')
+        try:
+            count = int(count_str)
+        except ValueError:
+            malformed += 1
+            continue
+        if not stack:
+            malformed += 1
+            continue
+
+        frame_ids = [symbols.intern(frame) for frame in stack.split(';') if frame]
+        if not frame_ids:
+            malformed += 1
+            continue
+
+        self_samples[frame_ids[-1]] += count
+        # Recursive frames count once toward a function's total time.
+        for sym_id in set(frame_ids):
+            total_samples[sym_id] += count
+        total += count
+        stacks += 1
+
+    return Profile(source, symbols, total, stacks, malformed)
+
+
+def top_symbols(profile: Profile, key: str, limit: int) -> List[Tuple[str, int, int]]:
+    """Return the `limit` heaviest symbols by 'self' or 'total' samples."""
+    table = profile.symbols
+    counts = table.self_samples if key == 'self' else table.total_samples
+    order = sorted(range(len(table.names)), key=counts.__getitem__, reverse=True)
+    return [
+        (table.names[i], table.self_samples[i], table.total_samples[i])
+        for i in order[:limit] if counts[i] > 0
+    ]
+
+
+@dataclass
+class SymbolDelta:
+    name: str
+    base_pct: float
+    new_pct: float
+    base_samples: int
+    new_samples: int
+
+    @property
+    def delta_pct(self) -> float:
+        return self.new_pct - self.base_pct
+
+
+def diff_profiles(base: Profile, new: Profile, key: str = 'total') -> List[SymbolDelta]:
+    """Compare two profiles by share of samples, largest growth first."""
+    def share(samples: int, profile: Profile) -> float:
+        return 100.0 * samples / profile.total if profile.total else 0.0
+
+    index = 1 if key == 'total' else 0
+    deltas = []
+    for name in set(base.symbols.ids) | set(new.symbols.ids):
+        base_samples = base.samples(name)[index]
+        new_samples = new.samples(name)[index]
+        if base_samples == 0 and new_samples == 0:
+            continue
+        deltas.append(SymbolDelta(
+            name=name,
+            base_pct=share(base_samples, base),
+            new_pct=share(new_samples, new),
+            base_samples=base_samples,
+            new_samples=new_samples,
+        ))
+
+    deltas.sort(key=lambda d: d.delta_pct, reverse=True)
+    return deltas
+
+
+# ---------------------------------------------------------------------------
+# Reports
+# ---------------------------------------------------------------------------
+
+def _pct(samples: int, total: int) -> str:
+    return f"{100.0 * samples / total:.2f}%" if total else "0.00%"
+
+
+def _short(name: str, width: int = 100) -> str:
+    return name if len(name) <= width else name[:width - 3] + '...'
+
+
+def generate_report(profile: Profile, limit: int = 20) -> str:
+    """Generate a markdown report of the hottest functions."""
+    report = [f"# Flamegraph Analysis: {profile.source}\n"]
+
+    report.append("## Summary\n")
+    report.append(f"- Samples: {profile.total}")
+    report.append(f"- Stacks: {profile.stacks}")
+    report.append(f"- Distinct functions: {len(profile.symbols.names) - 1}")
+    if profile.malformed:
+        report.append(f"- Malformed lines skipped: {profile.malformed}")
+    other_total = profile.symbols.total_samples[profile.symbols.other_id]
+    if other_total:
+        report.append(f"- Folded into `{OTHER_SYMBOL}` (symbol limit reached): {other_total}")
+    report.append("")
+
+    report.append("## 🔥 Hottest Functions (self time)\n")
+    report.append("| Self | Total | Function |")
+    report.append("|------|-------|----------|")
+    for name, self_n, total_n in top_symbols(profile, 'self', limit):
+        report.append(f"| {_pct(self_n, profile.total)} | {_pct(total_n, profile.total)} | `{_short(name)}` |")
+
+    report.append("\n## 📚 Heaviest Call Paths (total time)\n")
+    report.append("| Total | Self | Function |")
+    report.append("|-------|------|----------|")
+    for name, self_n, total_n in top_symbols(profile, 'total', limit):
+        report.append(f"| {_pct(total_n, profile.total)} | {_pct(self_n, profile.total)} | `{_short(name)}` |")
+
+    report.append("\n## Next Steps\n")
+    report.append("1. Start with high *self* time - that is where CPU is spent")
+    report.append("2. High *total* but low *self* means the cost is in callees")
+    report.append("3. Look for allocation (`alloc::`, `malloc`) and hashing in the hot list")
+    report.append("4. Re-profile with `--release` and `debug = true` for accurate frames\n")
+
+    return '\n'.join(report)
+
+
+def generate_diff_report(base: Profile, new: Profile, limit: int = 20) -> str:
+    """Generate a markdown report of functions whose share of samples changed."""
+    deltas = diff_profiles(base, new)
+    grew = [d for d in deltas if d.delta_pct > 0][:limit]
+    shrank = [d for d in reversed(deltas) if d.delta_pct < 0][:limit]
+
+    report = [f"# Flamegraph Diff: {base.source} → {new.source}\n"]
+    report.append("## Summary\n")
+    report.append(f"- Baseline samples: {base.total}")
+    report.append(f"- New samples: {new.total}")
+    report.append(f"- Functions grown: {sum(1 for d in deltas if d.delta_pct > 0)}")
+    report.append(f"- Functions shrunk: {sum(1 for d in deltas if d.delta_pct < 0)}\n")
+
+    if grew:
+        report.append("## 🔴 Grew (total time)\n")
+        report.append("| Δ | Before | After | Function |")
+        report.append("|---|--------|-------|----------|")
+        for d in grew:
+            report.append(f"| +{d.delta_pct:.2f}pp | {d.base_pct:.2f}% | {d.new_pct:.2f}% | `{_short(d.name)}` |")
+
+    if shrank:
+        report.append("\n## 🟢 Shrank (total time)\n")
+        report.append("| Δ | Before | After | Function |")
+        report.append("|---|--------|-------|----------|")
+        for d in shrank:
+            report.append(f"| {d.delta_pct:.2f}pp | {d.base_pct:.2f}% | {d.new_pct:.2f}% | `{_short(d.name)}` |")
+
+    report.append("")
+    return '\n'.join(report)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Analyze folded stack profiles (cargo flamegraph / perf + stackcollapse)")
+    parser.add_argument("profile", help="Folded stack file ('-' for stdin)")
+    parser.add_argument("--diff", metavar="BASELINE",
+                        help="Compare against a baseline folded stack file")
+    parser.add_argument("--top", type=int, default=20, help="Rows per table (default: 20)")
+    parser.add_argument("--max-symbols", type=int, default=DEFAULT_MAX_SYMBOLS,
+                        help="Distinct frames to track before folding into [other]")
+    args = parser.parse_args()
+
+    def load(name: str) -> Profile:
+        if name == '-':
+            return load_profile((l.rstrip('\n') for l in sys.stdin), "<stdin>", args.max_symbols)
+        path = Path(name)
+        if not path.is_file():
+            print(f"Error: {path} not found")
+            sys.exit(1)
+        return load_profile(iter_folded_lines(path), path.name, args.max_symbols)
+
+    profile = load(args.profile)
+    if args.diff:
+        print(generate_diff_report(load(args.diff), profile, args.top))
+    else:
+        print(generate_report(profile, args.top))
+
+
+if __name__ == "__main__":
+    main()
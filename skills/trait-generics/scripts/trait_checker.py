@@ -4,14 +4,27 @@ Rust Trait Implementation Checker
 Analyzes Rust code for trait implementations and suggests improvements.
 """
 
+import argparse
 import re
 import sys
 from pathlib import Path
 from dataclasses import dataclass
-from typing import List, Dict, Set
+from typing import List, Dict, Optional, Set
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'scripts'))
+from analysis.baseline import BaselineError, BaselineGate, baseline_name  # noqa: E402
+from analysis.reader import read_source_text  # noqa: E402
 
-@dataclass
+STRUCT_DEF = re.compile(r'^\s*(?:pub\s+)?struct\s+(\w+)')
+ENUM_DEF = re.compile(r'^\s*(?:pub\s+)?enum\s+(\w+)')
+TYPE_DEF = re.compile(r'^\s*(?:pub\s+)?(?:struct|enum)\s+(\w+)')
+# The lazy `<.*?>` spans nested generics (`impl<T: Into<U>>`); it stays linear
+# because the pattern is anchored and each `>` it tries is followed only by
+# `\s+\w+\s+for`, which stops at the next non-word character.
+IMPL_FOR = re.compile(r'^\s*impl(?:<.*?>)?\s+(\w+)\s+for\s+(\w+)')
+
+
+@dataclass(slots=True)
 class TraitInfo:
     name: str
     line_number: int
@@ -19,7 +32,7 @@ class TraitInfo:
     is_derived: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class Suggestion:
     line_number: int
     type_name: str
@@ -27,6 +40,14 @@ class Suggestion:
     priority: str  # "high", "medium", "low"
 
 
+@dataclass(slots=True)
+class TraitAnalysis:
+    types: List[tuple]  # (line, "struct" | "enum", name)
+    derives: Dict[str, Set[str]]
+    impls: List[TraitInfo]
+    suggestions: List[Suggestion]
+
+
 def find_structs_and_enums(content: str) -> List[tuple]:
     """Find all struct and enum definitions."""
     types = []
@@ -34,45 +55,52 @@ def find_structs_and_enums(content: str) -> List[tuple]:
 
     for i, line in enumerate(lines, 1):
         # Match struct definitions
-        struct_match = re.match(r'\s*(?:pub\s+)?struct\s+(\w+)', line)
+        struct_match = STRUCT_DEF.match(line)
         if struct_match:
             types.append((i, 'struct', struct_match.group(1)))
 
         # Match enum definitions
-        enum_match = re.match(r'\s*(?:pub\s+)?enum\s+(\w+)', line)
+        enum_match = ENUM_DEF.match(line)
         if enum_match:
             types.append((i, 'enum', enum_match.group(1)))
 
     return types
 
 
+def derive_list(line: str):
+    """
+    Contents of the first `#[derive(...)]` on a line, or None. Found with
+    `str.find` rather than a lazy regex, which rescans the rest of the line
+    from every `#[derive(` that has no closing `)]`.
+    """
+    start = line.find('#[derive(')
+    if start == -1:
+        return None
+    end = line.find(')]', start + 9)
+    if end == -1:
+        return None
+    return line[start + 9:end]
+
+
 def find_derives(content: str) -> Dict[str, Set[str]]:
     """Find all derive macros and their associated types."""
     derives = {}
-    lines = content.split('\n')
-
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-
-        # Check for derive attribute
-        derive_match = re.search(r'#\[derive\((.*?)\)\]', line)
-        if derive_match:
-            traits = [t.strip() for t in derive_match.group(1).split(',')]
-
-            # Find the type this applies to
-            j = i + 1
-            while j < len(lines):
-                type_match = re.match(r'\s*(?:pub\s+)?(?:struct|enum)\s+(\w+)', lines[j])
-                if type_match:
-                    type_name = type_match.group(1)
-                    derives[type_name] = set(traits)
-                    break
-                if lines[j].strip() and not lines[j].strip().startswith('#'):
-                    break
-                j += 1
-
-        i += 1
+    # A derive applies to the next struct/enum if only blank lines and other
+    # attributes come between; the nearest derive above the type wins.
+    pending = None
+
+    for line in content.split('\n'):
+        if pending is not None:
+            type_match = TYPE_DEF.match(line)
+            if type_match:
+                derives[type_match.group(1)] = set(pending)
+                pending = None
+            elif line.strip() and not line.strip().startswith('#'):
+                pending = None
+
+        derive_args = derive_list(line)
+        if derive_args is not None:
+            pending = [t.strip() for t in derive_args.split(',')]
 
     return derives
 
@@ -84,7 +112,7 @@ def find_impl_blocks(content: str) -> List[TraitInfo]:
 
     for i, line in enumerate(lines, 1):
         # Match impl blocks: impl Trait for Type
-        impl_match = re.match(r'\s*impl(?:<.*?>)?\s+(\w+)\s+for\s+(\w+)', line)
+        impl_match = IMPL_FOR.match(line)
         if impl_match:
             impls.append(TraitInfo(
                 name=impl_match.group(1),
@@ -152,14 +180,24 @@ def generate_suggestions(types: List[tuple], derives: Dict[str, Set[str]], impls
     return suggestions
 
 
-def generate_report(content: str, filename: str) -> str:
-    """Generate analysis report."""
+def analyze_content(content: str) -> TraitAnalysis:
+    """Find types, derives and trait impls in Rust source text and suggest missing traits."""
     types = find_structs_and_enums(content)
     derives = find_derives(content)
     impls = find_impl_blocks(content)
-    suggestions = generate_suggestions(types, derives, impls)
+    return TraitAnalysis(types, derives, impls, generate_suggestions(types, derives, impls))
+
+
+def generate_report(content: str, filename: str, analysis: Optional[TraitAnalysis] = None,
+                    suppressed: Optional[int] = None) -> str:
+    """Generate analysis report (of `analysis`, e.g. with baselined suggestions removed, if given)."""
+    if analysis is None:
+        analysis = analyze_content(content)
+    types, derives, impls, suggestions = analysis.types, analysis.derives, analysis.impls, analysis.suggestions
 
     report = [f"# Trait Analysis: {filename}\n"]
+    if suppressed:
+        report.append(f"({suppressed} baselined suggestion(s) suppressed)\n")
 
     # Summary
     report.append("## Types Found\n")
@@ -204,18 +242,47 @@ def generate_report(content: str, filename: str) -> str:
     return '\n'.join(report)
 
 
+def baseline_key(suggestion: Suggestion):
+    # The message names the type and the missing trait; it stands in for the snippet.
+    return 'trait_suggestion', suggestion.line_number, suggestion.message
+
+
 def main():
     if len(sys.argv) < 2:
-        print("Usage: trait_checker.py <rust_file.rs>")
+        print("Usage: trait_checker.py <rust_file.rs> [--baseline FILE [--update-baseline]]")
+        sys.exit(1)
+
+    parser = argparse.ArgumentParser(prog="trait_checker.py")
+    parser.add_argument("filepath", type=Path)
+    parser.add_argument("--baseline", metavar="FILE", type=Path,
+                        help="Report only suggestions missing from this baseline")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Record the current suggestions into --baseline instead of reporting")
+    args = parser.parse_args()
+    if args.update_baseline and not args.baseline:
+        print("Error: --update-baseline needs --baseline FILE")
         sys.exit(1)
 
-    path = Path(sys.argv[1])
-    if path.is_file():
-        content = path.read_text()
-        print(generate_report(content, path.name))
-    else:
+    path = args.filepath
+    if not path.is_file():
         print(f"Error: {path} not found")
         sys.exit(1)
+    content = read_source_text(path)
+    analysis = analyze_content(content)
+
+    suppressed = None
+    if args.baseline:
+        try:
+            gate = BaselineGate(args.baseline, "trait-generics", baseline_key, update=args.update_baseline)
+        except (OSError, BaselineError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        analysis.suggestions = gate.apply(baseline_name(path), path, analysis.suggestions)
+        if gate.update:
+            print(gate.finish())
+            return
+        suppressed = gate.suppressed
+    print(generate_report(content, path.name, analysis, suppressed))
 
 
 if __name__ == "__main__":